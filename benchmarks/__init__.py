@@ -0,0 +1 @@
+"""Micro-benchmarks for the controller's hot paths (run with ``python -m``)."""
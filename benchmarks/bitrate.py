@@ -0,0 +1,127 @@
+"""Video frame age on a slow link: fixed camera settings vs. adaptive bitrate.
+
+Starts ``mock_camera_server.py`` behind an emulated link of
+``--bandwidth`` kB/s and reads its stream with MjpegCapture, once with
+the firmware's fixed setting (VGA, quality 12) and once with a
+BitrateController targeting ``--target`` ms. Reports frame age (relative
+to the best case seen, as the controller measures it), received frame
+rate and throughput, plus every adjustment the controller made.
+
+    python -m benchmarks.bitrate [--bandwidth 150] [--target 300] [--duration 30]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks.loadtest import ROOT, free_port, git_version, summarize
+from rover.bitrate import BitrateController, FrameAge, control_url
+from rover.mjpeg import MjpegCapture
+
+
+class MockCamera:
+    """mock_camera_server.py running in a subprocess for one scenario."""
+
+    def __init__(self, *options):
+        self.port = free_port()
+        self.url = f"http://localhost:{self.port}/stream"
+        self.process = subprocess.Popen(
+            [sys.executable, "-u", os.path.join(ROOT, "mock_camera_server.py"),
+             "--port", str(self.port), *map(str, options)],
+            cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        )
+        line = self.process.stdout.readline()  # Printed once it is listening
+        if "streaming" not in line:
+            self.close()
+            raise RuntimeError(f"Mock camera failed to start: {line.strip()}")
+
+    def close(self):
+        self.process.terminate()
+        self.process.wait(5)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def run_scenario(url, args, adaptive):
+    capture = MjpegCapture(url)
+    capture.start()
+    controller = None
+    if adaptive:
+        controller = BitrateController(capture, control_url(url), args.target,
+                                       expected_fps=args.fps)
+        controller.start()
+    age = FrameAge()
+    ages = []
+    last = None
+    started = time.perf_counter()
+    frames, nbytes = capture.frames_received, capture.bytes_received
+    while time.perf_counter() - started < args.duration:
+        await asyncio.sleep(0.05)
+        timing = capture.last_frame_timing
+        if timing is not None and timing != last:
+            ages.append(age.update(*timing))
+            last = timing
+    elapsed = time.perf_counter() - started
+    result = {
+        "age_ms": summarize(ages),
+        # The second half shows where the controller settled
+        "settled_age_ms": summarize(ages[len(ages) // 2:]),
+        "fps": round((capture.frames_received - frames) / elapsed, 2),
+        "kbps": round((capture.bytes_received - nbytes) * 8 / 1000 / elapsed, 1),
+    }
+    if controller is not None:
+        controller.stop()
+        result["final_setting"] = controller.describe()
+        result["adjustments"] = [
+            {"t": round(t - controller.adjustments[0][0], 2), "from": controller.describe(old),
+             "to": controller.describe(new), "reason": reason}
+            for t, old, new, reason in controller.adjustments
+        ]
+    capture.stop()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bandwidth", type=float, default=150, help="emulated link in kB/s")
+    parser.add_argument("--buffer", type=float, default=64, help="link send buffer in kB")
+    parser.add_argument("--fps", type=float, default=25.0, help="camera frame rate")
+    parser.add_argument("--target", type=float, default=300, help="target frame age in ms")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--output", help="write the JSON results here (default: stdout)")
+    args = parser.parse_args()
+
+    results = {
+        "version": git_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+    }
+    for name, adaptive in (("fixed", False), ("adaptive", True)):
+        with MockCamera("--bandwidth", args.bandwidth, "--buffer", args.buffer,
+                        "--fps", args.fps) as camera:
+            results[name] = asyncio.run(run_scenario(camera.url, args, adaptive))
+        run = results[name]
+        print(f"{name}: settled age p50 {run['settled_age_ms']['p50']} ms, "
+              f"p95 {run['settled_age_ms']['p95']} ms, "
+              f"{run['fps']} fps, {run['kbps']} kbit/s", file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
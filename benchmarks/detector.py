@@ -0,0 +1,112 @@
+"""Detector latency and throughput per backend on recorded frames.
+
+Runs every requested backend (and thread count) over the same frames -
+a mission recording segment, any video file or a directory of images -
+and reports per-frame latency percentiles and frames per second, so the
+fastest option for a machine can be picked with --detector.
+
+    python -m benchmarks.detector recordings/mission-.../segment_000.avi \\
+        [--backends ultralytics,onnx,onnx-int8,openvino,openvino-int8] [--threads 1,4]
+
+A backend whose runtime or model file is missing is reported as an error
+and skipped. Results are written as JSON, like benchmarks.loadtest.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from benchmarks.loadtest import git_version, summarize
+from rover.backends import detector_loader, read_frames
+
+
+def run_backend(loader, frames, imgsz, conf):
+    started = time.perf_counter()
+    model = loader()
+    load_s = time.perf_counter() - started
+    latencies = []
+    detections = 0
+    started = time.perf_counter()
+    for frame in frames:
+        t0 = time.perf_counter()
+        results = model(frame, verbose=False, imgsz=imgsz, conf=conf)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        detections += sum(len(result.boxes) for result in results)
+    elapsed = time.perf_counter() - started
+    return {
+        "load_s": round(load_s, 2),
+        "latency_ms": summarize(latencies),
+        "fps": round(len(frames) / elapsed, 2),
+        "detections_per_frame": round(detections / len(frames), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("frames", help="video file or directory of images")
+    parser.add_argument("--limit", type=int, default=200, help="frames to use (default 200)")
+    parser.add_argument("--backends", default="ultralytics,onnx,openvino",
+                        help="comma separated; add -int8 for the quantized variant")
+    parser.add_argument("--threads", default="0",
+                        help="comma separated thread counts (0 = backend default)")
+    parser.add_argument("--yolo-model", default="yolov8n.pt")
+    parser.add_argument("--onnx-model", default="yolov8n.onnx",
+                        help="exported model for onnx (openvino too, unless --openvino-model)")
+    parser.add_argument("--openvino-model", help="OpenVINO IR .xml (default: --onnx-model)")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--conf", type=float, default=0.25)
+    parser.add_argument("--output", help="write the JSON results here (default: stdout)")
+    args = parser.parse_args()
+
+    frames = read_frames(args.frames, args.limit)
+    if not frames:
+        raise SystemExit(f"No frames in {args.frames}")
+    models = {
+        "ultralytics": args.yolo_model,
+        "onnx": args.onnx_model,
+        "openvino": args.openvino_model or args.onnx_model,
+    }
+    warmup_shape = frames[0].shape
+
+    runs = []
+    for spec in args.backends.split(","):
+        backend, _, variant = spec.partition("-")
+        for threads in (int(t) for t in args.threads.split(",")):
+            run = {"backend": spec, "threads": threads or None}
+            try:
+                loader = detector_loader(backend, models.get(backend), threads or None,
+                                         int8=variant == "int8", calibration=args.frames,
+                                         warmup_shape=warmup_shape)
+                run.update(run_backend(loader, frames, args.imgsz, args.conf))
+            except Exception as e:  # Missing runtime, model file, ...
+                run["error"] = f"{type(e).__name__}: {e}"
+            runs.append(run)
+            summary = run.get("error") or (f"p50 {run['latency_ms']['p50']} ms, "
+                                           f"{run['fps']} fps")
+            print(f"{spec} threads={threads or 'default'}: {summary}", file=sys.stderr)
+
+    measured = [run for run in runs if "error" not in run]
+    results = {
+        "version": git_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": vars(args),
+        "frames": len(frames),
+        "frame_shape": list(frames[0].shape),
+        "runs": runs,
+        "fastest": max(measured, key=lambda run: run["fps"], default=None),
+    }
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""Sharing camera frames with CPU-heavy consumers: threads, a queue, or the frame bus.
+
+A capture thread produces ``--fps`` frames of ``--size`` while the
+asyncio loop (standing in for the GUI) runs and N consumers each spend
+``--work`` ms of pure-Python work (holding the GIL, like result
+post-processing) on every frame they take:
+
+* threads - consumers are threads in this process, reading the frame
+  directly;
+* queue - consumers are processes fed through multiprocessing queues
+  (every frame pickled and copied per consumer);
+* bus - consumers are processes reading views of a rover.framebus
+  FrameBus (one copy into shared memory, none per consumer).
+
+Reports event-loop lag, the producer's per-frame publish cost, and per
+consumer the processed frame rate and frame age when work starts.
+
+    python -m benchmarks.framebus [--consumers 3] [--work 20] [--duration 5]
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import platform
+import queue
+import sys
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.loadtest import git_version, loop_lag, summarize
+from rover.framebus import FrameBus
+
+
+def busy(frame, ms):
+    """Pure-Python work on ``frame`` for ``ms`` milliseconds of this thread's CPU time."""
+    end = time.thread_time() + ms / 1000
+    sample = frame[::32, ::32, 0]
+    total = 0
+    while time.thread_time() < end:
+        total += sum(sample.ravel().tolist())
+    return total
+
+
+def report(ages, processed, elapsed):
+    return {"fps": round(processed / elapsed, 2), "age_ms": summarize(ages)}
+
+
+def thread_consumer(latest, stop, work, results):
+    ages, processed, seq = [], 0, 0
+    started = time.perf_counter()
+    while not stop.is_set():
+        current = latest[0]
+        if current is None or current[0] == seq:
+            time.sleep(0.002)
+            continue
+        seq, timestamp, frame = current
+        ages.append((time.monotonic() - timestamp) * 1000)
+        busy(frame, work)
+        processed += 1
+    results.append(report(ages, processed, time.perf_counter() - started))
+
+
+def queue_consumer(frames, stop, work, results):
+    ages, processed = [], 0
+    started = time.perf_counter()
+    while not stop.is_set():
+        try:
+            _, timestamp, frame = frames.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        ages.append((time.monotonic() - timestamp) * 1000)
+        busy(frame, work)
+        processed += 1
+    results.put(report(ages, processed, time.perf_counter() - started))
+
+
+def bus_consumer(name, stop, work, results):
+    bus = FrameBus.attach(name)
+    ages, processed, seq, torn = [], 0, 0, 0
+    started = time.perf_counter()
+    while not stop.is_set():
+        latest = bus.wait(seq, timeout=0.1)
+        if latest is None:
+            continue
+        seq, timestamp, frame = latest
+        ages.append((time.monotonic() - timestamp) * 1000)
+        busy(frame, work)
+        processed += 1
+        torn += not bus.valid(seq)
+    del frame, latest
+    result = report(ages, processed, time.perf_counter() - started)
+    result["overwritten_during_work"] = torn
+    results.put(result)
+    bus.close()
+
+
+class Producer(threading.Thread):
+    """Camera stand-in: ``publish(seq, timestamp, frame)`` at a fixed rate."""
+
+    def __init__(self, publish, fps, shape):
+        super().__init__(daemon=True)
+        self.publish = publish
+        self.interval = 1.0 / fps
+        self.frames = [np.random.default_rng(i).integers(0, 255, shape, dtype=np.uint8)
+                       for i in range(4)]
+        self.publish_ms = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        seq = 0
+        deadline = time.monotonic()
+        while not self.stopped.is_set():
+            seq += 1
+            started = time.perf_counter()
+            self.publish(seq, time.monotonic(), self.frames[seq % len(self.frames)])
+            self.publish_ms.append((time.perf_counter() - started) * 1000)
+            deadline += self.interval
+            self.stopped.wait(max(0.0, deadline - time.monotonic()))
+
+
+async def run_scenario(mode, args):
+    shape = (args.size[1], args.size[0], 3)
+    context = multiprocessing.get_context("spawn")
+    bus = None
+    if mode == "threads":
+        latest, stop, results = [None], threading.Event(), []
+        consumers = [threading.Thread(target=thread_consumer, args=(latest, stop, args.work,
+                                                                     results), daemon=True)
+                     for _ in range(args.consumers)]
+
+        def publish(seq, timestamp, frame):
+            latest[0] = (seq, timestamp, frame)
+    elif mode == "queue":
+        stop, results = context.Event(), context.Queue()
+        queues = [context.Queue(maxsize=2) for _ in range(args.consumers)]
+        consumers = [context.Process(target=queue_consumer, args=(q, stop, args.work, results))
+                     for q in queues]
+
+        def publish(seq, timestamp, frame):
+            for q in queues:
+                try:
+                    q.put_nowait((seq, timestamp, frame))
+                except queue.Full:
+                    pass  # A slow consumer skips frames
+    else:
+        bus = FrameBus.create(max_shape=shape)
+        stop, results = context.Event(), context.Queue()
+        consumers = [context.Process(target=bus_consumer, args=(bus.name, stop, args.work,
+                                                                 results))
+                     for _ in range(args.consumers)]
+
+        def publish(seq, timestamp, frame):
+            bus.put(frame, timestamp)
+
+    for consumer in consumers:
+        consumer.start()
+    await asyncio.sleep(1.0 if mode != "threads" else 0)  # Let the processes start
+    producer = Producer(publish, args.fps, shape)
+    producer.start()
+    lag = []
+    lag_task = asyncio.ensure_future(loop_lag(lag))
+    await asyncio.sleep(args.duration)
+    lag_task.cancel()
+    producer.stopped.set()
+    producer.join()
+    stop.set()
+    for consumer in consumers:
+        consumer.join(5)
+    if mode == "queue":
+        for q in queues:
+            q.cancel_join_thread()  # Frames nobody will read must not block exit
+    if mode == "threads":
+        consumed = results
+    else:
+        consumed = [results.get(timeout=5) for _ in consumers]
+    if bus is not None:
+        bus.close()
+    return {
+        "loop_lag_ms": summarize(lag),
+        "publish_ms": summarize(producer.publish_ms),
+        "consumer_fps": [c["fps"] for c in consumed],
+        "consumer_age_ms": summarize([c["age_ms"]["p50"] for c in consumed if c["age_ms"]]),
+        "consumers": consumed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--consumers", type=int, default=3)
+    parser.add_argument("--work", type=float, default=20.0,
+                        help="ms of GIL-holding work per consumed frame")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--size", type=int, nargs=2, default=(640, 480),
+                        metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--output", help="write the JSON results here (default: stdout)")
+    args = parser.parse_args()
+
+    results = {
+        "version": git_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+    }
+    for mode in ("threads", "queue", "bus"):
+        results[mode] = asyncio.run(run_scenario(mode, args))
+        run = results[mode]
+        print(f"{mode}: loop lag p95 {run['loop_lag_ms']['p95']} ms, publish p50 "
+              f"{run['publish_ms']['p50']} ms, consumers {run['consumer_fps']} fps",
+              file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
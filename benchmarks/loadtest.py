@@ -0,0 +1,302 @@
+"""Load test of the controller against the simulating mock rover.
+
+Starts ``mock_rover_server.py`` in a subprocess for each scenario and
+drives it with the real RoverController:
+
+* command latency - submit to ack, through the command scheduler;
+* telemetry throughput - the highest pushed rate the client keeps up
+  with (>= 95% received, p95 message age and event-loop lag in bounds);
+* UI frame times - telemetry refresh ticks and video paints of an
+  offscreen RoverGUI (skipped when PyQt5 is not installed).
+
+Results are written as JSON so runs of different versions can be diffed.
+
+    python -m benchmarks.loadtest [--output results.json] [--latency 20 --jitter 5 --drop 0.01]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from rover.controller import RoverController
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+class Simulator:
+    """mock_rover_server.py running in a subprocess for one scenario."""
+
+    def __init__(self, *options):
+        self.port = free_port()
+        self.url = f"ws://localhost:{self.port}"
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "mock_rover_server.py"),
+             "--port", str(self.port), "--quiet", *map(str, options)],
+            cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+        )
+        line = self.process.stdout.readline()  # Printed once it is listening
+        if "running" not in line:
+            self.close()
+            raise RuntimeError(f"Simulator failed to start: {line.strip()}")
+
+    def close(self):
+        self.process.terminate()
+        self.process.wait(5)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def summarize(samples):
+    """Percentiles of a list of milliseconds (None when there are none)."""
+    if not samples:
+        return None
+    values = np.asarray(samples, dtype=np.float64)
+    return {
+        "n": int(values.size),
+        "mean": round(float(values.mean()), 3),
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+        "p99": round(float(np.percentile(values, 99)), 3),
+        "max": round(float(values.max()), 3),
+    }
+
+
+async def connect(url, protocol):
+    controller = RoverController(url, protocol=protocol)
+    controller.start()
+    if not await controller.wait_connected(5):
+        await controller.close()
+        raise RuntimeError(f"Could not connect to {url}")
+    return controller
+
+
+async def loop_lag(samples, interval=0.01):
+    """Record how late a periodic sleep wakes up (ms), until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        samples.append((loop.time() - expected) * 1000)
+
+
+async def command_latency(url, protocol, count, interval):
+    """Submit-to-ack latency of commands sent through the scheduler."""
+    controller = await connect(url, protocol)
+    acks = asyncio.Queue()
+    handle = controller.handle_message
+
+    def on_message(message):
+        if isinstance(message, str) and message.startswith('{"ack"'):
+            acks.put_nowait(time.perf_counter())
+        else:
+            handle(message)
+
+    controller.connection.on_message = on_message
+    directions = ("forward", "left", "backward", "right")
+    latencies = []
+    lost = 0
+    for i in range(count):
+        started = time.perf_counter()
+        controller.move(directions[i % len(directions)])
+        try:
+            acked = await asyncio.wait_for(acks.get(), 1.0)
+        except asyncio.TimeoutError:
+            lost += 1
+        else:
+            latencies.append((acked - started) * 1000)
+        # Stay under the scheduler's rate limit so it does not add waiting
+        await asyncio.sleep(max(0.0, interval - (time.perf_counter() - started)))
+    await controller.close()
+    return {"commands": count, "lost": lost, "latency_ms": summarize(latencies)}
+
+
+async def telemetry_run(url, protocol, rate, duration):
+    """Receive pushed telemetry for ``duration`` seconds at ``rate`` Hz."""
+    controller = await connect(url, protocol)
+    handle = controller.handle_message
+    ages = []
+
+    def on_message(message):
+        handle(message)
+        # Sample the age of every 20th JSON message (bin1 carries no time)
+        if isinstance(message, str) and controller.telemetry.messages % 20 == 0:
+            ts = json.loads(message).get("ts")
+            if ts is not None:
+                ages.append((time.time() - ts) * 1000)
+
+    controller.connection.on_message = on_message
+    lag = []
+    lag_task = asyncio.ensure_future(loop_lag(lag))
+    await asyncio.sleep(0.5)  # Let the stream settle
+    first = controller.telemetry.messages
+    started = time.perf_counter()
+    await asyncio.sleep(duration)
+    received = controller.telemetry.messages - first
+    elapsed = time.perf_counter() - started
+    lag_task.cancel()
+    await controller.close()
+    return {
+        "rate_hz": rate,
+        "received_hz": round(received / elapsed, 1),
+        "ratio": round(received / (rate * elapsed), 3),
+        "age_ms": summarize(ages),
+        "loop_lag_ms": summarize(lag),
+    }
+
+
+def sustained(run, max_age_ms, max_lag_ms):
+    ok = run["ratio"] >= 0.95
+    if run["age_ms"] is not None:
+        ok = ok and run["age_ms"]["p95"] <= max_age_ms
+    return ok and run["loop_lag_ms"]["p95"] <= max_lag_ms
+
+
+def ui_frame_times(url, telemetry_rate, duration):
+    """Refresh-tick and video-paint times of an offscreen RoverGUI."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    try:
+        from PyQt5.QtCore import QTimer
+        from PyQt5.QtWidgets import QApplication
+        from qasync import QEventLoop
+    except ImportError as e:
+        return {"skipped": str(e)}
+    sys.path.insert(0, ROOT)
+    from main import RoverGUI
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    loop = QEventLoop(app)
+    asyncio.set_event_loop(loop)
+    gui = RoverGUI(url=url, camera_source=None)
+    gui.resize(1280, 800)
+    gui.show()
+
+    ticks, tick_intervals, paints = [], [], []
+    refresh = gui.refresh_telemetry
+    last_tick = [None]
+
+    def timed_refresh():
+        started = time.perf_counter()
+        if last_tick[0] is not None:
+            tick_intervals.append((started - last_tick[0]) * 1000)
+        last_tick[0] = started
+        refresh()
+        ticks.append((time.perf_counter() - started) * 1000)
+
+    gui.telemetry_timer.timeout.disconnect()
+    gui.telemetry_timer.timeout.connect(timed_refresh)
+
+    frame = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+
+    def paint_frame():
+        started = time.perf_counter()
+        gui.camera_view.set_frame(frame)
+        gui.camera_view.repaint()  # Synchronous, so the paint is timed too
+        paints.append((time.perf_counter() - started) * 1000)
+
+    camera_timer = QTimer()
+    camera_timer.timeout.connect(paint_frame)
+    camera_timer.start(33)
+    loop.call_later(duration + 1.0, loop.stop)
+    with loop:
+        loop.run_forever()
+        camera_timer.stop()
+        gui.close()
+    return {
+        "telemetry_rate_hz": telemetry_rate,
+        "messages_received": gui.controller.telemetry.messages,
+        "refresh_tick_ms": summarize(ticks),
+        "refresh_interval_ms": summarize(tick_intervals),
+        "video_frame_ms": summarize(paints),
+    }
+
+
+def git_version():
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=ROOT,
+                              capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write the JSON results here (default: stdout)")
+    parser.add_argument("--protocol", choices=("auto", "json"), default="json",
+                        help="json (default) lets the telemetry test measure message age")
+    parser.add_argument("--latency", type=float, default=0, help="simulated one-way delay, ms")
+    parser.add_argument("--jitter", type=float, default=0, help="simulated jitter, ms")
+    parser.add_argument("--drop", type=float, default=0, help="simulated loss probability")
+    parser.add_argument("--commands", type=int, default=200)
+    parser.add_argument("--rates", default="100,500,1000,2000,5000",
+                        help="comma separated telemetry rates to try, in Hz")
+    parser.add_argument("--duration", type=float, default=3.0,
+                        help="seconds per telemetry rate and for the UI test")
+    parser.add_argument("--max-age", type=float, default=100.0,
+                        help="p95 telemetry age (ms) above which a rate counts as lagging")
+    parser.add_argument("--max-lag", type=float, default=20.0,
+                        help="p95 event-loop lag (ms) above which a rate counts as lagging")
+    parser.add_argument("--ui-rate", type=float, default=500,
+                        help="telemetry rate during the UI test, in Hz")
+    parser.add_argument("--skip-ui", action="store_true")
+    args = parser.parse_args()
+    network = ["--latency", args.latency, "--jitter", args.jitter, "--drop", args.drop]
+
+    results = {
+        "version": git_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+    }
+
+    with Simulator("--ack", *network) as sim:
+        results["command_latency"] = asyncio.run(
+            command_latency(sim.url, args.protocol, args.commands, interval=0.05)
+        )
+    print(f"command latency: {results['command_latency']['latency_ms']}", file=sys.stderr)
+
+    runs = []
+    for rate in (float(r) for r in args.rates.split(",")):
+        with Simulator("--rate", rate, *network) as sim:
+            run = asyncio.run(telemetry_run(sim.url, args.protocol, rate, args.duration))
+        run["sustained"] = sustained(run, args.max_age, args.max_lag)
+        runs.append(run)
+        print(f"telemetry {rate:g} Hz: received {run['received_hz']} Hz, "
+              f"sustained={run['sustained']}", file=sys.stderr)
+    results["telemetry"] = runs
+    results["max_sustained_rate_hz"] = max(
+        (run["rate_hz"] for run in runs if run["sustained"]), default=None
+    )
+
+    if not args.skip_ui:
+        with Simulator("--rate", args.ui_rate, *network) as sim:
+            results["ui"] = ui_frame_times(sim.url, args.ui_rate, args.duration)
+        print(f"ui: {results['ui']}", file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
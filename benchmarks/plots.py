@@ -0,0 +1,78 @@
+"""Cost of one trend-plot redraw over a full telemetry history.
+
+Fills a TelemetryState history with 30 minutes of 100 Hz telemetry and
+times what each plot tick does: the window query, downsampling to about
+two points per pixel (min/max and LTTB) and painting the polylines.
+
+    python -m benchmarks.plots [--minutes 30] [--rate 100] [--width 400]
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtGui import QColor
+
+from rover.telemetry import TelemetryState
+from rover.timeseries import downsample
+from widgets import TimeSeriesPlot
+
+
+def best_ms(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=30)
+    parser.add_argument("--rate", type=float, default=100, help="telemetry messages per second")
+    parser.add_argument("--width", type=int, default=400, help="plot width in pixels")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    samples = int(args.minutes * 60 * args.rate)
+    telemetry = TelemetryState(history=samples)
+    rng = np.random.default_rng(0)
+    started = time.perf_counter()
+    for i in range(samples):
+        t = i / args.rate
+        telemetry.update_fields(100 - t / 60, 10 * np.sin(t / 7) + rng.normal(),
+                                5 * np.cos(t / 3) + rng.normal(), 90)
+    append_us = (time.perf_counter() - started) / samples * 1e6
+    end = samples / args.rate
+    start = end - args.minutes * 60
+    telemetry.history.times[:] = np.arange(samples) / args.rate  # Synthetic clock
+    print(f"{samples} samples, update_fields + history append {append_us:.1f} us/message")
+
+    points = args.width * 2
+    query = best_ms(lambda: telemetry.history.window(start, end), args.repeat)
+    times, values = telemetry.history.window(start, end)
+    print(f"window query      {query:7.2f} ms")
+    for method in ("minmax", "lttb"):
+        ms = best_ms(lambda: downsample(times, values[:, 1], points, method), args.repeat)
+        kept = len(downsample(times, values[:, 1], points, method)[0])
+        print(f"{method:<6} downsample {ms:7.2f} ms -> {kept} points")
+
+    app = QApplication([])  # noqa: F841 - widgets need an application
+    plot = TimeSeriesPlot("Pitch / roll")
+    plot.resize(args.width + plot.MARGIN_LEFT + plot.MARGIN, 120)
+    series = [("pitch", QColor(90, 170, 255), *downsample(times, values[:, 1], points)),
+              ("roll", QColor(255, 170, 60), *downsample(times, values[:, 2], points))]
+    plot.set_series(start, end, series)
+
+    def paint():
+        plot.grab()
+
+    print(f"paint (2 series)  {best_ms(paint, args.repeat):7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
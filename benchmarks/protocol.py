@@ -0,0 +1,82 @@
+"""Bytes on the wire and decode cost: JSON vs the bin1 binary protocol.
+
+    python -m benchmarks.protocol [--messages 100000]
+"""
+import argparse
+import json
+import random
+import time
+
+from rover.protocol import BinaryCodec, JsonCodec, decode_command, decode_telemetry, encode_telemetry
+from rover.telemetry import TelemetryState
+
+
+def sample_telemetry(count):
+    rng = random.Random(0)
+    return [
+        {"battery": rng.randint(0, 100),
+         "imu": {"pitch": round(rng.uniform(-15, 15), 2),
+                 "roll": round(rng.uniform(-10, 10), 2)},
+         "arm": rng.randint(0, 180)}
+        for _ in range(count)
+    ]
+
+
+def sample_commands(count):
+    rng = random.Random(1)
+    choices = [
+        lambda: {"cmd": "move", "dir": rng.choice(["forward", "left", "stop"]), "speed": 1},
+        lambda: {"cmd": "arm", "joint": 1, "angle": rng.randint(0, 180)},
+        lambda: {"cmd": "camera", "angle": rng.randint(-90, 90)},
+    ]
+    return [rng.choice(choices)() for _ in range(count)]
+
+
+def per_message_us(func, items):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return (time.perf_counter() - start) / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=100000)
+    args = parser.parse_args()
+
+    telemetry = sample_telemetry(args.messages)
+    json_frames = [json.dumps(t) for t in telemetry]
+    binary_frames = [
+        encode_telemetry(i, t["battery"], t["imu"]["pitch"], t["imu"]["roll"], t["arm"])
+        for i, t in enumerate(telemetry)
+    ]
+
+    # Decode as the client does: into the telemetry store
+    state = TelemetryState()
+    json_us = per_message_us(lambda m: state.update(json.loads(m)), json_frames)
+    binary_us = per_message_us(
+        lambda m: state.update_fields(*decode_telemetry(m)[1:]), binary_frames
+    )
+    json_bytes = sum(len(m.encode()) for m in json_frames) / len(json_frames)
+    binary_bytes = sum(len(m) for m in binary_frames) / len(binary_frames)
+    print(f"telemetry ({args.messages} messages)")
+    print(f"  json : {json_bytes:5.1f} B/msg, decode {json_us:5.2f} us/msg")
+    print(f"  bin1 : {binary_bytes:5.1f} B/msg, decode {binary_us:5.2f} us/msg")
+
+    commands = sample_commands(args.messages)
+    json_codec, binary_codec = JsonCodec(), BinaryCodec()
+    json_encoded = [json_codec.encode_command(c) for c in commands]
+    binary_encoded = [binary_codec.encode_command(c) for c in commands]
+    json_bytes = sum(len(m.encode()) for m in json_encoded) / len(commands)
+    binary_bytes = sum(len(m) for m in binary_encoded) / len(commands)
+    print(f"commands ({args.messages} messages)")
+    print(f"  json : {json_bytes:5.1f} B/msg, encode "
+          f"{per_message_us(json_codec.encode_command, commands):5.2f} us/msg, decode "
+          f"{per_message_us(json.loads, json_encoded):5.2f} us/msg")
+    print(f"  bin1 : {binary_bytes:5.1f} B/msg, encode "
+          f"{per_message_us(binary_codec.encode_command, commands):5.2f} us/msg, decode "
+          f"{per_message_us(decode_command, binary_encoded):5.2f} us/msg")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Many observers on one rover: direct connections vs. the relay hub.
+
+Starts ``mock_rover_server.py`` pushing telemetry and connects N
+observers (real RoverControllers) either straight to it - every one a
+separate session the rover has to serve, as with the firmware's
+broadcast - or to a RelayHub holding the only rover session. One
+observer drives through the relay at 10 Hz (with remote control on) and
+every other one tries a command, which must be refused.
+
+Reports per-observer receive rates, telemetry age at the observers and
+event-loop lag, plus the relay's drop and authority counters.
+
+    python -m benchmarks.relay [--observers 50] [--rate 50] [--duration 10]
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+
+from benchmarks.loadtest import Simulator, free_port, git_version, loop_lag, summarize
+from rover.controller import RoverController
+from rover.relay import RelayHub
+
+
+def observe(controller, ages):
+    """Sample the age of every 10th JSON telemetry message into ``ages``."""
+    handle = controller.handle_message
+
+    def on_message(message):
+        handle(message)
+        if isinstance(message, str) and controller.telemetry.messages % 10 == 0:
+            ts = json.loads(message).get("ts")
+            if ts is not None:
+                ages.append((time.time() - ts) * 1000)
+
+    controller.connection.on_message = on_message
+
+
+async def connect_all(url, count, protocol):
+    controllers = [RoverController(url, protocol=protocol, deadman=0) for _ in range(count)]
+    for controller in controllers:
+        controller.start()
+    connected = await asyncio.gather(*(c.wait_connected(10) for c in controllers))
+    if not all(connected):
+        raise RuntimeError(f"Only {sum(connected)}/{count} observers connected to {url}")
+    return controllers
+
+
+async def drive(controller, stop):
+    directions = ("forward", "left", "backward", "right")
+    sent = 0
+    while not stop.is_set():
+        controller.move(directions[sent % len(directions)])
+        sent += 1
+        await asyncio.sleep(0.1)
+    controller.stop()
+    return sent + 1
+
+
+async def run_scenario(url, args, relay):
+    hub = upstream = None
+    if relay:
+        upstream = RoverController(url, protocol=args.protocol)
+        upstream.start()
+        if not await upstream.wait_connected(5):
+            raise RuntimeError(f"Could not connect to {url}")
+        hub = RelayHub(upstream, "localhost", free_port(), remote_control=True,
+                       queue_size=args.queue_size)
+        await hub.start()
+        url = f"ws://localhost:{hub.port}"
+
+    observers = await connect_all(url, args.observers, args.protocol)
+    ages = []
+    for controller in observers:
+        observe(controller, ages)
+    lag = []
+    lag_task = asyncio.ensure_future(loop_lag(lag))
+    await asyncio.sleep(0.5)  # Let the streams settle
+
+    stop = asyncio.Event()
+    driver = asyncio.ensure_future(drive(observers[0], stop)) if relay else None
+    if relay:
+        await asyncio.sleep(0.2)  # The driver claims authority first
+        for controller in observers[1:]:
+            controller.move("forward")
+    first = [c.telemetry.messages for c in observers]
+    started = time.perf_counter()
+    await asyncio.sleep(args.duration)
+    elapsed = time.perf_counter() - started
+    received = [(c.telemetry.messages - n) / elapsed for c, n in zip(observers, first)]
+    stop.set()
+    commands = await driver if driver is not None else 0
+    await asyncio.sleep(0.3)  # Let the final stop go out
+    lag_task.cancel()
+
+    result = {
+        "observers": args.observers,
+        "rover_sessions": 1 if relay else args.observers,
+        "received_hz": summarize(received),
+        "ratio_min": round(min(received) / args.rate, 3),
+        "age_ms": summarize(ages),
+        "loop_lag_ms": summarize(lag),
+    }
+    if relay:
+        result["relay"] = hub.stats()
+        result["driver_commands"] = commands
+        result["upstream_commands_sent"] = upstream.commands.sent
+    for controller in observers:
+        await controller.close()
+    if relay:
+        await hub.close()
+        await upstream.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--observers", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=50, help="rover telemetry rate in Hz")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--protocol", choices=("auto", "json"), default="json",
+                        help="json (default) lets the observers measure message age")
+    parser.add_argument("--queue-size", type=int, default=16,
+                        help="relay messages kept per client before dropping the oldest")
+    parser.add_argument("--latency", type=float, default=0, help="simulated one-way delay, ms")
+    parser.add_argument("--output", help="write the JSON results here (default: stdout)")
+    args = parser.parse_args()
+
+    results = {
+        "version": git_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+    }
+    for name, relay in (("direct", False), ("relay", True)):
+        with Simulator("--rate", args.rate, "--latency", args.latency) as sim:
+            results[name] = asyncio.run(run_scenario(sim.url, args, relay))
+        run = results[name]
+        print(f"{name}: {run['rover_sessions']} rover sessions, p50 "
+              f"{run['received_hz']['p50']} Hz per observer, age p95 "
+              f"{run['age_ms']['p95'] if run['age_ms'] else '--'} ms", file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Per-frame cost of getting a camera frame onto the screen.
+
+Compares the previous QLabel path (cvtColor, QImage copy, QPixmap,
+SmoothTransformation rescale) with VideoView's path (one cv2.resize into a
+reused buffer, a zero-copy QImage and a plain drawImage).
+
+    python -m benchmarks.render [--display 1024x768] [--frames 200]
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import cv2
+import numpy as np
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPixmap, QPainter
+
+from rover.render import FrameScaler
+
+
+def legacy_render(frame, width, height, painter):
+    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    h, w, _ = rgb_frame.shape
+    q_image = QImage(rgb_frame.data, w, h, 3 * w, QImage.Format_RGB888).copy()
+    pixmap = QPixmap.fromImage(q_image).scaled(
+        width, height, Qt.IgnoreAspectRatio, Qt.SmoothTransformation
+    )
+    painter.drawPixmap(0, 0, pixmap)
+
+
+def make_buffered_render():
+    scaler = FrameScaler()
+
+    def buffered_render(frame, width, height, painter):
+        scaled = scaler.scale(frame, width, height)
+        image = QImage(scaled.data, width, height, scaled.strides[0],
+                       QImage.Format_BGR888)
+        painter.drawImage(0, 0, image)
+
+    return buffered_render
+
+
+def time_path(render, frames, width, height):
+    target = QImage(width, height, QImage.Format_RGB32)
+    painter = QPainter(target)
+    render(frames[0], width, height, painter)  # Warm up caches/allocations
+    start = time.perf_counter()
+    for frame in frames:
+        render(frame, width, height, painter)
+    elapsed = time.perf_counter() - start
+    painter.end()
+    return elapsed / len(frames) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--display", default="1024x768",
+                        help="on-screen size of the camera view, WxH")
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+    width, height = (int(v) for v in args.display.lower().split("x"))
+
+    app = QApplication([])  # noqa: F841 - QPixmap needs an application
+    rng = np.random.default_rng(0)
+    print(f"display {width}x{height}, {args.frames} frames per run")
+    for src_width, src_height in ((640, 480), (1280, 720)):
+        # A few distinct frames so nothing is served from a cache
+        frames = [rng.integers(0, 256, (src_height, src_width, 3), dtype=np.uint8)
+                  for _ in range(4)]
+        frames = (frames * (args.frames // len(frames) + 1))[:args.frames]
+        legacy = time_path(legacy_render, frames, width, height)
+        buffered = time_path(make_buffered_render(), frames, width, height)
+        print(f"{src_width}x{src_height}: legacy {legacy:6.2f} ms/frame, "
+              f"buffered {buffered:6.2f} ms/frame ({legacy / buffered:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
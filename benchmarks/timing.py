@@ -0,0 +1,218 @@
+"""Timing of repeated drive commands and mission steps, with and without load.
+
+Drives the mock rover with held-key moves every 100 ms, the old way (an
+interval loop, like the QTimer it replaces) and with rover.ticker's
+deadline-based Ticker, then runs a short mission. Each runs once on an
+idle process and once while the detector is working and the event loop
+does per-frame video work, and reports when commands actually went out:
+
+* jitter - deviation of each interval between sends from 100 ms;
+* drift - how far the last send is from where the 100 ms grid puts it;
+* mission lateness - step execution time vs. its scheduled time.
+
+    python -m benchmarks.timing [--duration 5] [--detector onnx --detector-model yolov8n.onnx]
+
+When the detector cannot be loaded (runtime or model missing) the load
+falls back to a synthetic one - a thread doing pure-Python work (GIL
+contention, like result post-processing) and ``--frame-work`` ms of busy
+work per 33 ms video tick on the loop - and the results say so.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.loadtest import Simulator, connect, git_version, summarize
+from rover.backends import BACKENDS, detector_loader
+from rover.detection import DetectionWorker
+from rover.mission import Mission
+from rover.ticker import Ticker
+
+INTERVAL = 0.1
+
+
+class Load:
+    """Detector inference on a thread plus per-frame work on the event loop."""
+
+    def __init__(self, args):
+        self.args = args
+        self.kind = None
+        self.note = None
+        self.worker = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._handle = None
+        self.frame = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+
+    async def start(self):
+        loader = detector_loader(self.args.detector, self.args.detector_model)
+        self.worker = DetectionWorker(loader)
+        self.worker.start()
+        while self.worker.status == "loading":
+            await asyncio.sleep(0.1)
+        if self.worker.status == "ready":
+            self.kind = f"detector ({self.args.detector})"
+        else:
+            self.note = f"detector unavailable: {self.worker.last_error}"
+            self.worker.stop()
+            self.worker = None
+            self.kind = "synthetic"
+            self._thread = threading.Thread(target=self._python_work, daemon=True)
+            self._thread.start()
+        self._tick()
+
+    def _python_work(self):
+        while not self._stop.is_set():
+            sum(i * i for i in range(20000))  # Holds the GIL, like Python post-processing
+
+    def _tick(self):
+        # What update_camera does on the GUI loop: hand the frame over, then draw
+        started = time.perf_counter()
+        if self.worker is not None:
+            self.worker.submit(self.frame, time.monotonic())
+        while (time.perf_counter() - started) * 1000 < self.args.frame_work:
+            pass
+        self._handle = asyncio.get_running_loop().call_later(0.033, self._tick)
+
+    def stop(self):
+        if self._handle is not None:
+            self._handle.cancel()
+        self._stop.set()
+        if self.worker is not None:
+            self.worker.stop()
+
+
+async def interval_loop(callback, stop):
+    """The old approach: sleep a fixed interval after each tick."""
+    while not stop.is_set():
+        await asyncio.sleep(INTERVAL)
+        callback()
+
+
+def send_times(controller):
+    """Record when each move command is handed to the WebSocket."""
+    times = []
+    send = controller.connection.send
+
+    async def timed_send(msg):
+        if msg.get("cmd") == "move" and msg.get("dir") != "stop":
+            times.append(time.monotonic())
+        await send(msg)
+
+    controller.connection.send = timed_send
+    return times
+
+
+def analyze(times):
+    times = np.asarray(times)
+    if len(times) < 2:
+        return None
+    intervals = np.diff(times) * 1000
+    grid = times[0] + np.arange(len(times)) * INTERVAL
+    return {
+        "sends": int(len(times)),
+        "jitter_ms": summarize(list(np.abs(intervals - INTERVAL * 1000))),
+        "drift_ms": round(float((times[-1] - grid[-1]) * 1000), 2),
+    }
+
+
+async def hold_keys(url, method, duration):
+    controller = await connect(url, "auto")
+    times = send_times(controller)
+
+    def tick():
+        controller.drive_keys({"forward"})
+
+    stop = asyncio.Event()
+    if method == "ticker":
+        ticker = Ticker(tick, INTERVAL)
+        ticker.start()
+        await asyncio.sleep(duration)
+        ticker.stop()
+    else:
+        task = asyncio.ensure_future(interval_loop(tick, stop))
+        await asyncio.sleep(duration)
+        stop.set()
+        await task
+    controller.stop()
+    await asyncio.sleep(0.2)
+    await controller.close()
+    return analyze(times)
+
+
+async def mission_run(url, duration):
+    controller = await connect(url, "auto")
+    mission = Mission(controller)
+    legs = max(1, int(duration // 2))
+    for i in range(legs):
+        mission.drive("forward" if i % 2 == 0 else "backward", 1.5).arm(60 + 10 * i)
+        mission.wait(0.2).center_camera().wait(0.3)
+    mission.flag()
+    report = await mission.run()
+    await asyncio.sleep(0.2)
+    await controller.close()
+    return report
+
+
+async def run_all(url, args, loaded):
+    load = None
+    if loaded:
+        load = Load(args)
+        await load.start()
+    try:
+        result = {
+            "interval_loop": await hold_keys(url, "interval", args.duration),
+            "ticker": await hold_keys(url, "ticker", args.duration),
+            "mission": await mission_run(url, args.duration),
+        }
+    finally:
+        if load is not None:
+            load.stop()
+    if load is not None:
+        result["load"] = load.kind
+        if load.note:
+            result["load_note"] = load.note
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per run")
+    parser.add_argument("--detector", choices=BACKENDS, default="ultralytics")
+    parser.add_argument("--detector-model", metavar="PATH")
+    parser.add_argument("--frame-work", type=float, default=8.0,
+                        help="ms of per-frame work on the event loop while loaded")
+    parser.add_argument("--output", help="write the JSON results here (default: stdout)")
+    args = parser.parse_args()
+
+    results = {
+        "version": git_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": vars(args),
+    }
+    for name, loaded in (("idle", False), ("detection", True)):
+        with Simulator("--rate", 50) as sim:
+            results[name] = asyncio.run(run_all(sim.url, args, loaded))
+        run = results[name]
+        print(f"{name}: jitter p95 interval loop {run['interval_loop']['jitter_ms']['p95']} ms "
+              f"(drift {run['interval_loop']['drift_ms']} ms), ticker "
+              f"{run['ticker']['jitter_ms']['p95']} ms (drift {run['ticker']['drift_ms']} ms), "
+              f"mission late p95 {run['mission']['late_ms']['p95']} ms", file=sys.stderr)
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,36 @@
 import sys
+import time
+import argparse
+LAUNCH_TIME = time.perf_counter()  # Taken before the heavy imports below
 import asyncio
-import json
+import os
 import cv2
-import websockets
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton, QLabel,
     QSlider, QFileDialog, QGridLayout, QHBoxLayout, QStyle,
-    QGroupBox, QFrame, QScrollArea, QSizePolicy
+    QGroupBox, QStackedWidget, QButtonGroup, QShortcut
 )
-from PyQt5.QtCore import Qt, QSize, QTimer, QRectF, QDateTime
-from PyQt5.QtGui import QImage, QPixmap, QIcon, QPainter, QColor, QFont, QPalette
+from PyQt5.QtCore import Qt, QTimer, QRectF
+from PyQt5.QtGui import QPainter, QColor, QFont, QPalette, QKeySequence
 from qasync import QEventLoop
-from ultralytics import YOLO
+
+from rover.backends import BACKENDS, detector_loader
+from rover.bitrate import BitrateController, control_url
+from rover.capture import create_capture
+from rover.connection import DEFAULT_URL
+from rover.controller import RoverController
+from rover.detection import DetectionConfig, DetectionWorker
+from rover.fleet import Fleet, parse_rover_spec
+from rover.framebus import FrameBus
+from rover.gamepad import DriveStreamer, open_gamepad
+from rover.logline import format_log_line
+from rover.metrics import LoopLagMonitor, Metrics, MetricsServer, format_hud
+from rover.relay import RelayHub
+from rover.startup import StartupTimer
+from rover.ticker import Ticker
+from rover.timeseries import downsample, event_rate
+from rover.video import VideoRecorder
+from widgets import LogView, PredictionView, TimeSeriesPlot, VideoView
 
 
 class CircularProgress(QLabel):
@@ -20,13 +39,20 @@ class CircularProgress(QLabel):
         self.setFixedSize(120, 120)  # Larger size for better visibility
         self.battery_percentage = 0
         self.setStyleSheet("background: transparent;")
+        self.metrics = Metrics()  # Replaced by the GUI's registry
 
     def set_battery_percentage(self, percentage):
         """Set the battery percentage and update the display."""
+        if percentage == self.battery_percentage:
+            return  # Nothing to repaint
         self.battery_percentage = percentage
         self.update()
 
     def paintEvent(self, event):
+        with self.metrics.time("battery_paint_ms"):
+            self._paint()
+
+    def _paint(self):
         """Custom paint event to draw the circular progress bar."""
         painter = QPainter(self)
         painter.setRenderHint(QPainter.Antialiasing)
@@ -61,39 +87,119 @@ class CircularProgress(QLabel):
 
 
 class RoverGUI(QWidget):
-    def __init__(self):
+    def __init__(self, url=DEFAULT_URL, camera_source=0, ui_refresh_hz=20,
+                 protocol="auto", record_path=None, replay_path=None,
+                 replay_speed=1.0, video_dir="recordings", startup=None,
+                 controller=None, detector_factory=DetectionWorker,
+                 gamepad=None, gamepad_rate=20.0, adaptive_video=None,
+                 camera_control=None, frame_bus_name=None):
         super().__init__()
         self.setWindowTitle("x0 Rover Controller (to the moon team)")
-        self.ws = None
+        # All rover logic (link, command queue, telemetry store, flight
+        # recording) lives in the Qt-free controller; this widget only
+        # presents it and turns user input into controller calls
+        if controller is None:
+            controller = RoverController(url, protocol=protocol, record_path=record_path)
+        self.controller = controller
+        self.controller.on_log = self.log
+        self.controller.on_connected = self.on_connected
+        self.controller.on_link_lost = self.on_link_lost
+        self.startup = startup if startup is not None else StartupTimer()
+        
+        # Replay of a flight recording in place of a live rover connection
+        self.replay_path = replay_path
+        self.replay_speed = replay_speed
+        
+        # Mission video is encoded on its own thread; each recording gets a
+        # directory under video_dir
+        self.video_dir = video_dir
+        self.video_recorder = None
+        
+        # Telemetry history: the append-only view keeps the newest lines itself
+        self.max_logs = 500
         
         # First initialize UI
         self.init_ui()
         
         # Clear any existing camera
-        self.cap = None
+        self.camera_source = camera_source
+        self.capture = None
+        self.last_frame = None
+
+        # Optional closed loop on the ESP32-CAM's frame size and JPEG quality
+        # (target frame age in ms); see rover/bitrate.py
+        self.adaptive_video = adaptive_video
+        self.camera_control = camera_control
+        self.bitrate = None
+
+        # Every captured frame is also published on a shared-memory bus of
+        # this name for analysis processes; it is created at the first frame,
+        # when the camera's full frame size is known
+        self.frame_bus_name = frame_bus_name
+        self.frame_bus = None
+        self.frame_bus_warned = False
         
-        # Initialize webcam with a delay to ensure UI is ready
-        QTimer.singleShot(1000, self.initialize_camera)
+        # Initialize webcam once the event loop is running; opening the device
+        # happens on the capture thread, so there is no need to wait longer
+        QTimer.singleShot(0, self.initialize_camera)
 
         QTimer.singleShot(0, self.start_async_connection)
 
-        # Default speed values
-        self.speed_factor = 1
-        self.last_telemetry = {}
+        # Telemetry is stored on arrival (by the controller) and drawn on a fixed
+        # refresh tick, so a fast telemetry stream cannot flood the GUI thread
+        # with repaints
+        self.logged_messages = 0
+        self.last_message_log = 0.0
+        self.telemetry_timer = QTimer()
+        self.telemetry_timer.timeout.connect(self.refresh_telemetry)
+        self.telemetry_timer.start(int(1000 / ui_refresh_hz))
+
+        # The trend plots read the telemetry/command history rings on their own,
+        # slower tick and only while visible; see update_plots
+        self.plot_timer = QTimer()
+        self.plot_timer.timeout.connect(self.update_plots)
+        self.plot_timer.start(200)
 
         # Keyboard controls
         self.pressed_keys = set()
-        self.movement_timer = QTimer()
-        self.movement_timer.timeout.connect(self.handle_movement_keys)
-        self.movement_timer.start(100)
+        # Held keys are re-sent on monotonic deadlines rather than by a QTimer,
+        # whose ticks slip whenever the loop is busy with video or telemetry
+        self.key_ticker = Ticker(self.handle_movement_keys, 0.1,
+                                 metrics=self.controller.metrics, name="key_drive")
         self.setFocusPolicy(Qt.StrongFocus)
 
-        # Initialize YOLO model with verbose=False to prevent terminal printing
-        self.model = YOLO('yolov8n.pt', verbose=False)
+        # Optional analog driving: the stick is streamed as drive commands
+        # alongside the keyboard (see rover/gamepad.py)
+        self.gamepad = gamepad
+        self.gamepad_rate = gamepad_rate
+        self.drive_streamer = None
+
+        # The YOLO detector is loaded on first use by a background worker
+        # (see toggle_detection); inference also runs on that worker's thread
+        # so the video stays at camera rate. In fleet mode the factory hands
+        # out feeds of one shared, batched worker instead.
+        self.detector_factory = detector_factory
+        self.detector = None
         self.detection_enabled = False
+        self.detector_timer = QTimer()
+        self.detector_timer.timeout.connect(self.check_detector_status)
+
+        self.stats_timer = QTimer()
+        self.stats_timer.timeout.connect(self.update_stats)
+        self.stats_timer.start(1000)
 
-        self.telemetry_logs = []  # Add this to store logs
-        self.max_logs = 50  # Keep last 50 logs
+        # Instrumentation shares the controller's registry; timings are only
+        # taken while the HUD is shown or the metrics are exported
+        self.metrics = self.controller.metrics
+        self.camera_view.metrics = self.metrics
+        self.battery_widget.metrics = self.metrics
+        self.frames_displayed = 0
+        self._register_metrics()
+        self.loop_lag = LoopLagMonitor(self.metrics)
+        self.hud_timer = QTimer()
+        self.hud_timer.timeout.connect(self.update_hud)
+
+        self.startup.mark("ui_ready")
 
     def init_ui(self):
         # Main layout
@@ -127,11 +233,18 @@ class RoverGUI(QWidget):
         self.battery_label = QLabel("Battery: --%")
         self.imu_label = QLabel("Orientation: --")
         self.arm_label = QLabel("Arm Position: --")
+        self.link_label = QLabel("Link: connecting")
+        self.command_stats_label = QLabel("Commands: --")
         
-        for label in [self.battery_label, self.imu_label, self.arm_label]:
+        for label in [self.battery_label, self.imu_label, self.arm_label,
+                      self.link_label, self.command_stats_label]:
             label.setStyleSheet("font-size: 12px;")
             battery_layout.addWidget(label)
         
+        # Predicted pose ahead of the delayed telemetry/video
+        self.prediction_view = PredictionView()
+        battery_layout.addWidget(self.prediction_view)
+        
         battery_group.setLayout(battery_layout)
         left_panel.addWidget(battery_group)
 
@@ -284,6 +397,18 @@ class RoverGUI(QWidget):
         media_layout.addWidget(self.screenshot_btn)
         media_layout.addWidget(self.take_photo_btn)
         media_layout.addWidget(self.detection_btn)
+        
+        self.record_video_btn = QPushButton("Record Video (V)")
+        self.record_video_btn.setCheckable(True)
+        self.record_video_btn.setIcon(self.style().standardIcon(QStyle.SP_MediaPlay))
+        self.record_video_btn.clicked.connect(self.toggle_video_recording)
+        media_layout.addWidget(self.record_video_btn)
+        
+        self.hud_btn = QPushButton("Performance HUD (H)")
+        self.hud_btn.setCheckable(True)
+        self.hud_btn.setIcon(self.style().standardIcon(QStyle.SP_ComputerIcon))
+        self.hud_btn.clicked.connect(self.toggle_hud)
+        media_layout.addWidget(self.hud_btn)
         media_group.setLayout(media_layout)
         left_panel.addWidget(media_group)
 
@@ -297,46 +422,57 @@ class RoverGUI(QWidget):
         camera_layout = QVBoxLayout()
         camera_layout.setContentsMargins(0, 0, 0, 0)  # Remove margins
         
-        self.camera_label = QLabel("Initializing camera...")
-        self.camera_label.setMinimumSize(640, 480)  # Changed from setFixedSize to setMinimumSize
-        self.camera_label.setAlignment(Qt.AlignCenter)
-        self.camera_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)  # Allow expansion
-        self.camera_label.setStyleSheet("""
-            QLabel {
-                border: 2px solid #444;
-                border-radius: 5px;
-                background: #222;
-                color: #fff;
-            }
-        """)
+        self.camera_view = VideoView("Initializing camera...")
+        self.camera_view.setMinimumSize(640, 480)
+        
+        camera_layout.addWidget(self.camera_view, 1)  # Added stretch factor
         
-        camera_layout.addWidget(self.camera_label, 1)  # Added stretch factor
+        self.capture_stats_label = QLabel("Camera: --")
+        self.capture_stats_label.setStyleSheet("font-size: 11px; color: #aaa;")
+        camera_layout.addWidget(self.capture_stats_label)
         camera_group.setLayout(camera_layout)
-        right_panel.addWidget(camera_group, 70)
+        right_panel.addWidget(camera_group, 55)
+
+        # Trend plots over a selectable window
+        trends_group = QGroupBox("Trends")
+        trends_layout = QVBoxLayout()
+        window_layout = QHBoxLayout()
+        window_layout.addWidget(QLabel("Window:"))
+        self.plot_window = 60.0
+        self.plot_window_buttons = QButtonGroup(self)
+        for label, seconds in (("1 min", 60), ("5 min", 300), ("30 min", 1800)):
+            btn = QPushButton(label)
+            btn.setCheckable(True)
+            btn.setChecked(seconds == self.plot_window)
+            btn.clicked.connect(lambda _, seconds=seconds: self.set_plot_window(seconds))
+            self.plot_window_buttons.addButton(btn)
+            window_layout.addWidget(btn)
+        window_layout.addStretch()
+        trends_layout.addLayout(window_layout)
+        self.attitude_plot = TimeSeriesPlot("Pitch / roll (°)")
+        self.battery_plot = TimeSeriesPlot("Battery (%)", y_range=(0, 100))
+        self.command_plot = TimeSeriesPlot("Commands / s")
+        plots_layout = QHBoxLayout()
+        for plot in (self.attitude_plot, self.battery_plot, self.command_plot):
+            plots_layout.addWidget(plot)
+        trends_layout.addLayout(plots_layout)
+        trends_group.setLayout(trends_layout)
+        right_panel.addWidget(trends_group, 20)
 
         # Detailed telemetry
         telemetry_group = QGroupBox("Telemetry History")
         telemetry_layout = QVBoxLayout()
         
-        self.telemetry_label = QLabel("Waiting for telemetry data...")
-        self.telemetry_label.setWordWrap(True)
-        self.telemetry_label.setStyleSheet("""
-            font-family: monospace;
-            background: #222;
-            padding: 10px;
-            border-radius: 5px;
-            font-size: 11px;
-            line-height: 1.2;
-        """)
-        
-        # Add scroll area for telemetry with better styling
-        scroll = QScrollArea()
-        scroll.setWidget(self.telemetry_label)
-        scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("""
-            QScrollArea {
+        self.telemetry_view = LogView(self.max_logs)
+        self.telemetry_view.setPlaceholderText("Waiting for telemetry data...")
+        self.telemetry_view.setStyleSheet("""
+            QPlainTextEdit {
+                font-family: monospace;
+                background: #222;
+                padding: 10px;
                 border: none;
-                background: transparent;
+                border-radius: 5px;
+                font-size: 11px;
             }
             QScrollBar:vertical {
                 border: none;
@@ -354,9 +490,9 @@ class RoverGUI(QWidget):
             }
         """)
         
-        telemetry_layout.addWidget(scroll)
+        telemetry_layout.addWidget(self.telemetry_view)
         telemetry_group.setLayout(telemetry_layout)
-        right_panel.addWidget(telemetry_group, 30)
+        right_panel.addWidget(telemetry_group, 25)
 
         # Apply styles
         self.apply_styles()
@@ -378,7 +514,7 @@ class RoverGUI(QWidget):
                                           stop:0 #666, stop:1 #555);
             }
         """)
-        btn.clicked.connect(lambda: self.send_cmd("move", {"dir": direction}))
+        btn.clicked.connect(lambda: self.controller.move(direction))
         return btn
 
     def create_speed_button(self, text, speed_type):
@@ -444,160 +580,275 @@ class RoverGUI(QWidget):
         """)
 
     def initialize_camera(self):
-        """Initialize the webcam"""
-        if self.cap is not None:
-            self.cap.release()
-        
-        self.cap = cv2.VideoCapture(0)
-        if self.cap.isOpened():
-            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)  # Back to larger resolution
-            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)  # Back to larger resolution
-            self.telemetry_label.setText("Webcam initialized")
-            
-            # Start camera update timer
-            if hasattr(self, 'camera_timer'):
-                self.camera_timer.stop()
-            self.camera_timer = QTimer()
-            self.camera_timer.timeout.connect(self.update_camera)
-            self.camera_timer.start(30)
+        """Start the background capture thread for the camera source"""
+        if self.capture is not None:
+            self.capture.bus = None  # The bus takes a single writer
+            self.capture.stop()
+        if self.camera_source is None:
+            self.camera_view.set_message("No camera configured")
+            return
+        
+        self.capture = create_capture(self.camera_source, width=640, height=480)
+        self.capture.bus = self.frame_bus
+        self.capture.start()
+        self.log(f"Opening camera {self.camera_source}...")
+        if self.bitrate is not None:
+            self.bitrate.stop()
+            self.bitrate = None
+        if self.adaptive_video and hasattr(self.capture, "last_frame_timing"):
+            control = self.camera_control or control_url(self.camera_source)
+            self.bitrate = BitrateController(self.capture, control, self.adaptive_video,
+                                             metrics=self.metrics)
+            self.bitrate.on_log = self.log
+            self.bitrate.start()
+        elif self.adaptive_video:
+            self.log("Adaptive video needs an ESP32-CAM stream URL as the camera")
+        
+        # Poll the capture thread's latest-frame slot; this never blocks
+        if hasattr(self, 'camera_timer'):
+            self.camera_timer.stop()
+        self.camera_timer = QTimer()
+        self.camera_timer.timeout.connect(self.update_camera)
+        self.camera_timer.start(30)
+
+    def _register_metrics(self):
+        def detector():
+            return getattr(self.detector, "worker", self.detector)  # Fleet feeds share one
+
+        self.metrics.rate("capture_fps", lambda: self.capture.frames_captured)
+        self.metrics.rate("display_fps", lambda: self.frames_displayed)
+        self.metrics.rate("inference_fps", lambda: detector().frames_processed)
+        self.metrics.gauge("decode_ms", lambda: getattr(self.capture, "last_decode_ms", None))
+        self.metrics.gauge("inference_ms", lambda: detector().last_inference_ms)
+
+    def toggle_hud(self):
+        """Show or hide the performance overlay on the video"""
+        if self.hud_btn.isChecked():
+            self.metrics.enable("hud")
+            self.update_hud()
+            self.hud_timer.start(500)
         else:
-            self.telemetry_label.setText("Failed to open webcam")
-            self.camera_label.setText("No camera available")
+            self.metrics.disable("hud")
+            self.hud_timer.stop()
+            self.camera_view.set_overlay(None)
 
-    def update_camera(self):
-        """Update the camera feed"""
-        if self.cap is None or not self.cap.isOpened():
-            self.camera_label.setText("Camera not available")
+    def update_hud(self):
+        self.camera_view.set_overlay(format_hud(self.metrics.snapshot()))
+
+    def open_frame_bus(self, frame):
+        """Create the frame bus with slots for the camera's full-size frames"""
+        # A reduced-size MJPEG decode can be smaller than what comes later
+        width, height = getattr(self.capture, "source_size", None) or frame.shape[1::-1]
+        shape = (height, width) + frame.shape[2:]
+        try:
+            self.frame_bus = FrameBus.create(self.frame_bus_name, max_shape=shape)
+        except OSError as e:
+            self.log(f"Cannot create frame bus '{self.frame_bus_name}': {e}")
+            self.frame_bus_name = None
             return
+        self.capture.bus = self.frame_bus
+        self.log(f"Publishing {width}x{height} frames on frame bus '{self.frame_bus.name}'")
+
+    def update_stats(self):
+        """Refresh the camera and command counters once a second"""
+        bus = self.frame_bus
+        if bus is not None and bus.rejected and not self.frame_bus_warned:
+            self.frame_bus_warned = True
+            self.log(f"Frame bus: {bus.rejected} frame(s) of shape {bus.rejected_shape} "
+                     f"do not fit its {bus.slot_bytes}-byte slots and were not published")
+        if self.capture is not None:
+            stats = self.capture.stats()
+            self.capture_stats_label.setText(
+                f"Camera: {stats['status']} | Captured: {stats['captured']} | "
+                f"Dropped: {stats['dropped']}"
+            )
+        if self.video_recorder is not None:
+            stats = self.video_recorder.stats()
+            self.record_video_btn.setText(
+                f"Recording ({stats['status']}, {stats['written']} frames)"
+            )
+        
+        stats = self.controller.connection.stats()
+        rtt = f"{stats['rtt_ms']:.0f} ms" if stats["rtt_ms"] is not None else "--"
+        self.link_label.setText(f"Link: {stats['state']} | RTT {rtt}")
         
-        ret, frame = self.cap.read()
-        if not ret:
-            self.camera_label.setText("Failed to read camera frame")
+        stats = self.controller.commands.stats()
+        self.command_stats_label.setText(
+            f"Commands: {stats['sent']} sent, {stats['coalesced']} coalesced, "
+            f"{stats['avg_latency_ms']:.0f} ms avg queue latency"
+        )
+
+    def update_camera(self):
+        """Update the camera feed with the newest captured frame"""
+        with self.metrics.time("frame_ms"):
+            self._update_camera()
+
+    def _update_camera(self):
+        if self.capture is None or self.capture.status == "failed":
+            self.camera_view.set_message("No camera available")
             return
         
+        # Lets the MJPEG decoder use a reduced-size decode for small views
+        self.capture.set_display_size(self.camera_view.width(), self.camera_view.height())
+        latest = self.capture.slot.take()
+        if latest is None:
+            return  # No new frame since the last tick
+        _, timestamp, frame = latest
+        self.last_frame = frame
+        if self.frame_bus_name and self.frame_bus is None:
+            self.open_frame_bus(frame)
+        if self.startup.mark("first_frame"):
+            self.log_startup_milestone("first_frame")
+        
         try:
+            detections = None
             if self.detection_enabled:
-                results = self.model(frame, verbose=False)
-                for result in results:
-                    boxes = result.boxes
-                    for box in boxes:
-                        x1, y1, x2, y2 = map(int, box.xyxy[0])
-                        cls = int(box.cls[0])
-                        conf = float(box.conf[0])
-                        name = result.names[cls]
-                        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                        label = f'{name} {conf:.2f}'
-                        cv2.putText(frame, label, (x1, y1 - 10), 
-                                  cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-            
-            # Convert to RGB for Qt
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                # Hand the frame to the worker (it skips frames while busy) and
+                # draw the tracked boxes, moved along to this frame's time,
+                # until newer results arrive
+                self.detector.submit(frame, timestamp)
+                detections = self.detector.detections_at(timestamp)
             
-            # Create QImage
-            height, width, channel = rgb_frame.shape
-            bytes_per_line = 3 * width
-            q_image = QImage(rgb_frame.data, width, height, 
-                            bytes_per_line, QImage.Format_RGB888).copy()
+            # Scaled once into a reused buffer and painted without copies;
+            # boxes are drawn on that buffer, never on last_frame. Skipped
+            # while another rover is focused in fleet mode.
+            if self.camera_view.isVisible():
+                with self.metrics.time("render_ms"):
+                    self.camera_view.set_frame(frame, detections)
+                self.frames_displayed += 1
             
-            # Scale to fill the entire label
-            label_size = self.camera_label.size()
-            scaled_pixmap = QPixmap.fromImage(q_image).scaled(
-                label_size.width(),
-                label_size.height(),
-                Qt.IgnoreAspectRatio,
-                Qt.SmoothTransformation
-            )
-            
-            # Update the label
-            self.camera_label.setPixmap(scaled_pixmap)
+            # Published frames are never modified, so no copy is needed
+            if self.video_recorder is not None:
+                self.video_recorder.submit(frame, timestamp, detections)
             
         except Exception as e:
-            timestamp = QDateTime.currentDateTime().toString("hh:mm:ss")
-            error_log = f"\n[{timestamp}] Error: {str(e)}"
-            self.telemetry_logs.append(error_log)
-            combined_logs = "".join(reversed(self.telemetry_logs))
-            self.telemetry_label.setText(f"Telemetry History:\n{combined_logs}")
+            self.log(f"Error: {str(e)}")
+
+    def log(self, text):
+        """Add a timestamped line to the telemetry history (O(1), bounded)"""
+        self.telemetry_view.append_line(format_log_line(text))
 
     def start_async_connection(self):
-        asyncio.create_task(self.connect_websocket())
+        self.loop_lag.start()
+        self.key_ticker.start()
+        self.controller.start(connect=not self.replay_path)
+        if self.replay_path:
+            asyncio.ensure_future(self.controller.replay(self.replay_path, self.replay_speed))
+        elif self.gamepad is not None:
+            device = open_gamepad(self.gamepad)
+            self.drive_streamer = DriveStreamer(self.controller, device, rate=self.gamepad_rate)
+            self.drive_streamer.start()
+            self.log(f"Gamepad {device.name} streaming at {self.gamepad_rate:g} Hz")
 
-    async def connect_websocket(self):
-        try:
-            self.ws = await websockets.connect("ws://localhost:8765")
-            self.telemetry_label.setText("Connected to Rover!")
-            asyncio.create_task(self.receive_data())
-        except Exception as e:
-            self.telemetry_label.setText(f"Error connecting: {e}")
-
-    def send_cmd(self, cmd_type, data):
-        if self.ws:
-            # Apply speed factor to movement commands
-            if cmd_type == "move" and "speed" not in data:
-                data["speed"] = self.speed_factor
-                
-            msg = {"cmd": cmd_type}
-            msg.update(data)
-            asyncio.create_task(self.ws.send(json.dumps(msg)))
-
-    async def receive_data(self):
-        try:
-            while True:
-                message = await self.ws.recv()
-                telemetry = json.loads(message)
-                self.last_telemetry = telemetry
-                
-                # Silently update the widgets
-                battery = telemetry.get("battery", "--")
+    def on_connected(self):
+        if self.startup.mark("connected"):
+            self.log_startup_milestone("connected")
+
+    def on_link_lost(self):
+        """The controller already dropped queued commands; forget held keys"""
+        self.pressed_keys.clear()
+
+    def refresh_telemetry(self):
+        """Repaint the telemetry widgets whose values changed since last tick"""
+        with self.metrics.time("telemetry_refresh_ms"):
+            self._refresh_telemetry()
+
+    def _refresh_telemetry(self):
+        telemetry = self.controller.telemetry
+        changes = telemetry.take_changes()
+        values = telemetry.values
+        
+        if "battery" in changes:
+            battery = changes["battery"]
+            if isinstance(battery, (int, float)):
                 self.battery_widget.set_battery_percentage(battery)
-                self.battery_label.setText(f"Battery: {battery}%")
-                
-                imu = telemetry.get("imu", {})
-                pitch = imu.get("pitch", "--")
-                roll = imu.get("roll", "--")
-                self.imu_label.setText(f"Orientation: Pitch {pitch}°, Roll {roll}°")
-                
-                arm = telemetry.get("arm", "--")
-                self.arm_label.setText(f"Arm Position: {arm}°")
-                
-                # Add to telemetry history without printing
-                timestamp = QDateTime.currentDateTime().toString("hh:mm:ss")
-                log_entry = f"\n[{timestamp}] New telemetry data received"
-                self.telemetry_logs.append(log_entry)
-                
-                if len(self.telemetry_logs) > self.max_logs:
-                    self.telemetry_logs.pop(0)
-                
-                combined_logs = "".join(reversed(self.telemetry_logs))
-                self.telemetry_label.setText(f"Telemetry History:\n{combined_logs}")
-                
-        except Exception as e:
-            timestamp = QDateTime.currentDateTime().toString("hh:mm:ss")
-            error_log = f"\n[{timestamp}] Connection error: {str(e)}"
-            self.telemetry_logs.append(error_log)
-            combined_logs = "".join(reversed(self.telemetry_logs))
-            self.telemetry_label.setText(f"Telemetry History:\n{combined_logs}")
+            self.battery_label.setText(f"Battery: {battery}%")
+        
+        if "pitch" in changes or "roll" in changes:
+            pitch = values["pitch"] if values["pitch"] is not None else "--"
+            roll = values["roll"] if values["roll"] is not None else "--"
+            self.imu_label.setText(f"Orientation: Pitch {pitch}°, Roll {roll}°")
+        
+        if "arm" in changes:
+            self.arm_label.setText(f"Arm Position: {changes['arm']}°")
+        
+        self.refresh_prediction()
+        
+        # Summarize arrivals in the history at most once a second
+        now = time.monotonic()
+        received = telemetry.messages - self.logged_messages
+        if received and now - self.last_message_log >= 1.0:
+            self.log(f"New telemetry data received: {received} message(s)")
+            self.logged_messages = telemetry.messages
+            self.last_message_log = now
+
+    def set_plot_window(self, seconds):
+        self.plot_window = float(seconds)
+        self.update_plots()
+
+    def update_plots(self):
+        """Redraw the trend plots from the history rings (throttled, see plot_timer)"""
+        if not self.attitude_plot.isVisible():
+            return  # Minimized, or another rover's tile in fleet mode
+        with self.metrics.time("plot_ms"):
+            self._update_plots()
+
+    def _update_plots(self):
+        end = time.monotonic()
+        start = end - self.plot_window
+        points = self.attitude_plot.plot_width() * 2  # About two points per pixel
+        times, values = self.controller.telemetry.history.window(start, end)
+        battery, pitch, roll = values[:, 0], values[:, 1], values[:, 2]
+        self.attitude_plot.set_series(start, end, [
+            ("pitch", QColor(90, 170, 255), *downsample(times, pitch, points)),
+            ("roll", QColor(255, 170, 60), *downsample(times, roll, points)),
+        ])
+        self.battery_plot.set_series(start, end, [
+            ("battery", QColor(90, 200, 130), *downsample(times, battery, points)),
+        ])
+        # Commands are events: bin them into a rate, one bucket per ~4 pixels
+        sent, _ = self.controller.command_history.window(start, end)
+        buckets = max(10, self.command_plot.plot_width() // 4)
+        self.command_plot.set_series(start, end, [
+            ("sent", QColor(220, 220, 220), *event_rate(sent, start, end, buckets)),
+        ])
+
+    def refresh_prediction(self):
+        """Redraw the predicted pose (cheap; runs on the telemetry tick)"""
+        predictor = self.controller.predictor
+        if not self.controller.connected:
+            return
+        now = time.monotonic()
+        latency_ms = predictor.latency * 1000
+        text = f"Latency ~{latency_ms:.0f} ms | {predictor.in_flight} cmd(s) in flight"
+        if predictor.last_ack_rtt is not None:
+            text += f" | ack {predictor.last_ack_rtt:.0f} ms"
+        self.prediction_view.set_state(
+            predictor.displayed_pose(now), predictor.predicted_pose(now),
+            predictor.camera_angle, predictor.confirmed_camera_angle, text
+        )
 
     def arm_moved(self, value):
         self.lbl_arm.setText(f"Arm Angle: {value}°")
-        self.send_cmd("arm", {"joint": 1, "angle": value})
+        self.controller.set_arm(value)
 
     def drop_flag(self):
         """Handle the drop flag command."""
-        self.send_cmd("flag", {"action": "drop"})
-        self.telemetry_label.setText("Flag dropped!")
+        self.controller.drop_flag()
+        self.log("Flag dropped!")
 
     def set_normal_speed(self):
-        self.speed_factor = 1
+        self.controller.set_speed("normal")
         self.speed_display_label.setText("Current Speed: Normal")
         self.update_speed_buttons("normal")
 
     def set_object_speed(self):
-        self.speed_factor = 0.5
+        self.controller.set_speed("object")
         self.speed_display_label.setText("Current Speed: Object")
         self.update_speed_buttons("object")
 
     def set_fast_speed(self):
-        self.speed_factor = 2
+        self.controller.set_speed("fast")
         self.speed_display_label.setText("Current Speed: Fast")
         self.update_speed_buttons("fast")
 
@@ -645,9 +896,9 @@ class RoverGUI(QWidget):
             screenshot.save(filename)
 
     def take_photo(self):
-        """Capture a photo using the camera and save it."""
-        ret, frame = self.cap.read()
-        if ret:
+        """Save the most recent camera frame as a photo."""
+        if self.last_frame is not None:
+            frame = self.last_frame.copy()
             filename, _ = QFileDialog.getSaveFileName(
                 self, 
                 "Save Photo", 
@@ -657,21 +908,79 @@ class RoverGUI(QWidget):
             if filename:
                 cv2.imwrite(filename, frame)  # Save frame to file
         else:
-            self.telemetry_label.setText("Error capturing photo.")
+            self.log("Error capturing photo.")
+
+    def toggle_video_recording(self):
+        """Start or stop continuous mission video recording"""
+        if self.record_video_btn.isChecked():
+            directory = os.path.join(self.video_dir, time.strftime("mission-%Y%m%d-%H%M%S"))
+            # Share the flight recorder's clock so video and telemetry line up
+            recorder = self.controller.recorder
+            start_time = recorder.start_time if recorder is not None else None
+            self.video_recorder = VideoRecorder(directory, start_time=start_time)
+            self.video_recorder.start()
+            self.log(f"Recording video to {directory}")
+        elif self.video_recorder is not None:
+            recorder, self.video_recorder = self.video_recorder, None
+            # Flushing the last frames can take seconds; keep the GUI thread free
+            self.record_video_btn.setEnabled(False)
+            self.record_video_btn.setText("Finishing Video...")
+            stopped = asyncio.get_event_loop().run_in_executor(None, recorder.stop)
+            stopped.add_done_callback(lambda _: self.video_recording_stopped(recorder))
+
+    def video_recording_stopped(self, recorder):
+        """Report a finished recording once its writer thread is done"""
+        stats = recorder.stats()
+        self.record_video_btn.setText("Record Video (V)")
+        self.record_video_btn.setEnabled(True)
+        self.log(
+            f"Video recording stopped: {stats['written']} frames in "
+            f"{stats['segments']} segment(s), {stats['dropped']} dropped, "
+            f"{stats['skipped']} skipped"
+        )
 
     def toggle_detection(self):
         """Toggle object detection on/off"""
         self.detection_enabled = self.detection_btn.isChecked()
+        if self.detection_enabled and self.detector is None:
+            # First use: load and warm up the model in the background
+            self.detector = self.detector_factory()
+            self.detector.start()
+        if self.detector is not None:
+            if self.detection_enabled and self.detector.status == "loading":
+                self.detection_btn.setText("Loading Detector...")
+                self.detector_timer.start(200)
+            elif self.detection_enabled and self.detector.status == "failed":
+                # A shared detector that already failed: say so instead of
+                # silently detecting nothing
+                self.check_detector_status()
+            elif not self.detection_enabled:
+                self.detector.clear()
         status = "enabled" if self.detection_enabled else "disabled"
         
         # Add to telemetry history
-        timestamp = QDateTime.currentDateTime().toString("hh:mm:ss")
-        log_entry = f"\n[{timestamp}] Object detection {status}"
-        self.telemetry_logs.append(log_entry)
+        self.log(f"Object detection {status}")
+
+    def check_detector_status(self):
+        """Watch the background detector load and report when it is done"""
+        if self.detector.status == "loading":
+            return
+        self.detector_timer.stop()
+        self.detection_btn.setText("Toggle Detection (O)")
         
-        # Update display
-        combined_logs = "".join(reversed(self.telemetry_logs))
-        self.telemetry_label.setText(f"Telemetry History:\n{combined_logs}")
+        if self.detector.status == "ready":
+            self.log(f"Detector loaded in {self.detector.load_time:.1f}s")
+        else:
+            self.log(f"Detector failed to load: {self.detector.last_error}")
+            self.detector = None
+            self.detection_enabled = False
+            self.detection_btn.setChecked(False)
+
+    def log_startup_milestone(self, name):
+        """Add a startup timing line; the full report once fully started"""
+        self.log(f"Startup: {name} after {self.startup.marks[name]:.2f}s")
+        if self.startup.has("first_frame", "connected"):
+            self.log(f"Startup report: {self.startup.report()}")
 
     def keyPressEvent(self, event):
         """Handle key press events for movement controls."""
@@ -706,7 +1015,7 @@ class RoverGUI(QWidget):
         # Space for stop
         elif key == Qt.Key_Space:
             self.pressed_keys.clear()
-            self.send_cmd("move", {"dir": "stop"})
+            self.controller.stop()
         
         # F for flag drop
         elif key == Qt.Key_F:
@@ -716,13 +1025,21 @@ class RoverGUI(QWidget):
         elif key == Qt.Key_P:
             self.take_photo()
             
+        # V for video recording
+        elif key == Qt.Key_V:
+            self.record_video_btn.click()
+            
+        # H for the performance HUD
+        elif key == Qt.Key_H:
+            self.hud_btn.click()
+            
         # Change to 'O' key for toggling detection
         elif key == Qt.Key_O:
             self.detection_btn.click()  # Simulate button click to toggle detection
             
         # Escape to exit
         elif key == Qt.Key_Escape:
-            self.close()
+            self.window().close()
             
         # Camera control keys (R/T for up/down)
         elif key == Qt.Key_R:
@@ -748,75 +1065,278 @@ class RoverGUI(QWidget):
             self.pressed_keys.discard('left')
         elif key in (Qt.Key_D, Qt.Key_Right):
             self.pressed_keys.discard('right')
+        else:
+            # Not a movement key: leave any (gamepad) drive alone
+            event.accept()
+            return
             
         # If no movement keys are pressed, stop the rover
         if not self.pressed_keys:
-            self.send_cmd("move", {"dir": "stop"})
+            self.controller.stop()
+            if self.drive_streamer is not None:
+                self.drive_streamer.stopped_elsewhere()
             
         event.accept()
 
     def handle_movement_keys(self):
         """Handle continuous movement based on pressed keys."""
-        if not self.pressed_keys:
-            return
-            
-        # Determine primary direction based on pressed keys
-        if 'forward' in self.pressed_keys and 'left' in self.pressed_keys:
-            direction = "forward_left"
-        elif 'forward' in self.pressed_keys and 'right' in self.pressed_keys:
-            direction = "forward_right"
-        elif 'backward' in self.pressed_keys and 'left' in self.pressed_keys:
-            direction = "backward_left"
-        elif 'backward' in self.pressed_keys and 'right' in self.pressed_keys:
-            direction = "backward_right"
-        elif 'forward' in self.pressed_keys:
-            direction = "forward"
-        elif 'backward' in self.pressed_keys:
-            direction = "backward"
-        elif 'left' in self.pressed_keys:
-            direction = "left"
-        elif 'right' in self.pressed_keys:
-            direction = "right"
-        else:
-            direction = "stop"
-            
-        self.send_cmd("move", {"dir": direction})
+        self.controller.drive_keys(self.pressed_keys)
 
     def closeEvent(self, event):
         """Clean up resources when closing"""
-        if self.cap is not None:
-            self.cap.release()
-        if self.ws:
-            asyncio.get_event_loop().run_until_complete(self.ws.close())
+        if self.bitrate is not None:
+            self.bitrate.stop()
+        if self.capture is not None:
+            self.capture.bus = None
+            self.capture.stop()
+        if self.frame_bus is not None:
+            if self.capture is None or not self.capture.is_alive():
+                self.frame_bus.close()
+            # Otherwise the capture thread may still be inside put(); it is a
+            # daemon, and the resource tracker removes the block at exit
+        if self.detector is not None:
+            self.detector.stop()
+        if self.video_recorder is not None:
+            # Finished off the GUI thread; the loop waits for it when it closes
+            asyncio.get_event_loop().run_in_executor(None, self.video_recorder.stop)
+            self.video_recorder = None
+        if self.drive_streamer is not None:
+            self.drive_streamer.stop()
+        self.loop_lag.stop()
+        self.key_ticker.stop()
+        self.hud_timer.stop()
+        self.plot_timer.stop()
+        self.controller.close()
         event.accept()
 
     def camera_moved(self, value):
         """Handle camera angle changes"""
         self.lbl_camera.setText(f"Camera Angle: {value}°")
-        self.send_cmd("camera", {"angle": value})
+        self.controller.set_camera(value)
         
         # Add to telemetry history
-        timestamp = QDateTime.currentDateTime().toString("hh:mm:ss")
-        log_entry = f"\n[{timestamp}] Camera rotated to {value}°"
-        self.telemetry_logs.append(log_entry)
-        combined_logs = "".join(reversed(self.telemetry_logs))
-        self.telemetry_label.setText(f"Telemetry History:\n{combined_logs}")
+        self.log(f"Camera rotated to {value}°")
 
     def center_camera(self):
         """Center the camera (0 degrees)"""
         self.camera_slider.setValue(0)
-        self.send_cmd("camera", {"angle": 0})
+        self.controller.set_camera(0)
         
         # Add to telemetry history
-        timestamp = QDateTime.currentDateTime().toString("hh:mm:ss")
-        log_entry = f"\n[{timestamp}] Camera centered"
-        self.telemetry_logs.append(log_entry)
-        combined_logs = "".join(reversed(self.telemetry_logs))
-        self.telemetry_label.setText(f"Telemetry History:\n{combined_logs}")
+        self.log("Camera centered")
+
+
+class FleetWindow(QWidget):
+    """Tiled overview of several rovers with one focused control panel.
+
+    Every rover gets a full RoverGUI (kept in a stack, only the focused
+    one is shown) and a small live tile; clicking a tile or pressing
+    Alt+1..9 switches focus. All rovers share the fleet's one detector.
+    """
+
+    def __init__(self, fleet, ui_refresh_hz=20, video_dir="recordings", startup=None):
+        super().__init__()
+        self.setWindowTitle(f"x0 Rover Fleet ({len(fleet)} rovers)")
+        self.fleet = fleet
+        self.guis = []
+        self.tiles = []
+
+        layout = QHBoxLayout(self)
+        tile_column = QVBoxLayout()
+        layout.addLayout(tile_column, 15)
+        self.stack = QStackedWidget()
+        layout.addWidget(self.stack, 85)
+        self.tile_buttons = QButtonGroup(self)
+        self.tile_buttons.setExclusive(True)
+
+        for index, session in enumerate(fleet):
+            gui = RoverGUI(camera_source=session.camera_source, ui_refresh_hz=ui_refresh_hz,
+                           video_dir=os.path.join(video_dir, session.name),
+                           startup=startup, controller=session.controller,
+                           detector_factory=lambda name=session.name: fleet.detection_feed(name))
+            self.stack.addWidget(gui)
+            self.guis.append(gui)
+
+            view = VideoView(session.name)
+            view.setMinimumSize(160, 120)
+            button = QPushButton(f"{index + 1}. {session.name}")
+            button.setCheckable(True)
+            button.clicked.connect(lambda _, i=index: self.focus_rover(i))
+            self.tile_buttons.addButton(button, index)
+            tile_column.addWidget(view, 1)
+            tile_column.addWidget(button)
+            self.tiles.append((view, button))
+
+            if index < 9:
+                shortcut = QShortcut(QKeySequence(f"Alt+{index + 1}"), self)
+                shortcut.activated.connect(lambda i=index: self.focus_rover(i))
+
+        # Tiles are previews; a few updates a second is plenty
+        self.tile_timer = QTimer()
+        self.tile_timer.timeout.connect(self.update_tiles)
+        self.tile_timer.start(200)
+        self.focus_rover(0)
+
+    def focus_rover(self, index):
+        gui = self.guis[index]
+        self.stack.setCurrentWidget(gui)
+        self.tile_buttons.button(index).setChecked(True)
+        gui.setFocus()
+
+    def update_tiles(self):
+        """Refresh the preview tiles and their link/battery captions"""
+        for index, (gui, session) in enumerate(zip(self.guis, self.fleet)):
+            view, button = self.tiles[index]
+            battery = gui.controller.telemetry.values["battery"]
+            battery = f"{battery}%" if battery is not None else "--"
+            button.setText(f"{index + 1}. {session.name} | "
+                           f"{gui.controller.connection.state} | {battery}")
+            if gui.last_frame is None:
+                continue
+            detections = None
+            if gui.detection_enabled and gui.detector is not None:
+                _, detections = gui.detector.latest()
+            view.set_frame(gui.last_frame, detections)
+
+    def closeEvent(self, event):
+        for gui in self.guis:
+            gui.close()
+        self.fleet.close()
+        event.accept()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="x0 Rover Controller")
+    parser.add_argument(
+        "--ui-rate", type=float, default=20,
+        help="telemetry widget refresh rate in Hz (default 20)"
+    )
+    parser.add_argument(
+        "--url", default=DEFAULT_URL,
+        help=f"rover WebSocket endpoint (default {DEFAULT_URL})"
+    )
+    parser.add_argument(
+        "--protocol", choices=("auto", "json"), default="auto",
+        help="'auto' offers the compact binary protocol and falls back to JSON"
+    )
+    parser.add_argument(
+        "--record", metavar="FILE",
+        help="record all telemetry and commands to FILE"
+    )
+    parser.add_argument(
+        "--replay", metavar="FILE",
+        help="replay a recorded flight instead of connecting to the rover"
+    )
+    parser.add_argument(
+        "--replay-speed", type=float, default=1.0,
+        help="replay speed multiplier (0 = as fast as possible)"
+    )
+    parser.add_argument(
+        "--rover", metavar="[NAME=]URL[,CAMERA]", action="append", default=[],
+        help="fleet mode: one entry per rover (repeatable; overrides --url/--camera)"
+    )
+    parser.add_argument(
+        "--video-dir", default="recordings",
+        help="directory for mission video recordings (default 'recordings')"
+    )
+    parser.add_argument(
+        "--metrics-port", type=int,
+        help="serve metrics on http://127.0.0.1:PORT/metrics (Prometheus) and /metrics.json"
+    )
+    parser.add_argument(
+        "--relay-port", type=int,
+        help="let other clients observe this rover through ws://0.0.0.0:PORT "
+             "(single-rover mode; this GUI keeps control)"
+    )
+    parser.add_argument(
+        "--gamepad", metavar="DEVICE",
+        help="drive with a joystick, e.g. /dev/input/js0 ('virtual' for a dummy device)"
+    )
+    parser.add_argument(
+        "--gamepad-rate", type=float, default=20.0,
+        help="gamepad drive command rate in Hz (default 20)"
+    )
+    parser.add_argument(
+        "--detector", choices=BACKENDS, default="ultralytics",
+        help="inference backend (onnx/openvino run an exported YOLOv8 .onnx/.xml)"
+    )
+    parser.add_argument(
+        "--detector-model", metavar="PATH",
+        help="model file (default yolov8n.pt, or yolov8n.onnx for onnx/openvino)"
+    )
+    parser.add_argument(
+        "--detector-threads", type=int,
+        help="CPU threads for inference (default: the backend's choice)"
+    )
+    parser.add_argument(
+        "--detector-int8", action="store_true",
+        help="use an INT8-quantized copy of the model (onnx/openvino)"
+    )
+    parser.add_argument(
+        "--detector-calibration", metavar="VIDEO_OR_DIR",
+        help="frames for OpenVINO INT8 calibration (e.g. a mission recording)"
+    )
+    parser.add_argument(
+        "--det-size", type=int, default=640,
+        help="detector input size for full frames (default 640; smaller is faster)"
+    )
+    parser.add_argument(
+        "--det-classes", metavar="NAMES",
+        help="comma separated class names to detect (default: all)"
+    )
+    parser.add_argument(
+        "--det-conf", type=float, default=0.25,
+        help="detection confidence threshold (default 0.25)"
+    )
+    parser.add_argument(
+        "--det-iou", type=float, default=0.45,
+        help="detection NMS IoU threshold (default 0.45)"
+    )
+    parser.add_argument(
+        "--no-det-roi", action="store_true",
+        help="always run the detector on the full frame"
+    )
+    parser.add_argument(
+        "--no-det-track", action="store_true",
+        help="draw raw detections instead of tracked boxes (implies --no-det-roi)"
+    )
+    parser.add_argument(
+        "--camera", default="0",
+        help="camera device index, video file, or MJPEG stream URL "
+             "(e.g. http://192.168.1.100:81/stream for the ESP32-CAM)"
+    )
+    parser.add_argument(
+        "--adaptive-video", type=float, metavar="MS",
+        help="step the ESP32-CAM's frame size/quality to keep video under MS old"
+    )
+    parser.add_argument(
+        "--camera-control", metavar="URL",
+        help="camera control endpoint (default: derived from --camera, "
+             "e.g. http://192.168.1.100/control)"
+    )
+    parser.add_argument(
+        "--frame-bus", metavar="NAME",
+        help="publish camera frames in shared memory NAME for other processes "
+             "(see rover/framebus.py)"
+    )
+    # Anything not recognised here is left for Qt (e.g. -platform)
+    args, qt_args = parser.parse_known_args()
+    if args.relay_port and args.rover:
+        parser.error("--relay-port relays a single rover; use it without --rover")
+    if args.adaptive_video and args.rover:
+        parser.error("--adaptive-video controls a single camera; use it without --rover")
+    if args.frame_bus and args.rover:
+        parser.error("--frame-bus shares a single camera; use it without --rover")
+    if args.detector_int8 and args.detector == "ultralytics":
+        parser.error("--detector-int8 needs --detector onnx or openvino")
+    if args.camera.isdigit():
+        args.camera = int(args.camera)
+    return args, qt_args
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    args, qt_args = parse_args()
+    app = QApplication(sys.argv[:1] + qt_args)
     loop = QEventLoop(app)
     asyncio.set_event_loop(loop)
 
@@ -838,8 +1358,47 @@ if __name__ == "__main__":
     dark_palette.setColor(QPalette.HighlightedText, Qt.black)
     app.setPalette(dark_palette)
 
-    window = RoverGUI()
+    detection_config = DetectionConfig(
+        imgsz=args.det_size, roi_imgsz=min(320, args.det_size),
+        classes=args.det_classes.split(",") if args.det_classes else None,
+        conf=args.det_conf, iou=args.det_iou,
+        roi=not args.no_det_roi, track=not args.no_det_track,
+    )
+    load_detector = detector_loader(
+        args.detector, args.detector_model, args.detector_threads,
+        args.detector_int8, args.detector_calibration,
+    )
+    if args.rover:
+        fleet = Fleet(detector_loader=load_detector, detection_config=detection_config)
+        for index, spec in enumerate(args.rover):
+            name, url, camera = parse_rover_spec(spec, index)
+            fleet.add(name, url, camera, protocol=args.protocol)
+        window = FleetWindow(fleet, ui_refresh_hz=args.ui_rate, video_dir=args.video_dir,
+                             startup=StartupTimer(LAUNCH_TIME))
+    else:
+        window = RoverGUI(url=args.url, camera_source=args.camera, ui_refresh_hz=args.ui_rate,
+                          protocol=args.protocol, record_path=args.record,
+                          replay_path=args.replay, replay_speed=args.replay_speed,
+                          video_dir=args.video_dir, gamepad=args.gamepad,
+                          detector_factory=lambda: DetectionWorker(load_detector,
+                                                                   detection_config),
+                          gamepad_rate=args.gamepad_rate,
+                          adaptive_video=args.adaptive_video,
+                          camera_control=args.camera_control, frame_bus_name=args.frame_bus,
+                          startup=StartupTimer(LAUNCH_TIME))
     window.showMaximized()
 
+    if args.metrics_port:
+        if args.rover:
+            registries = {session.name: session.controller.metrics for session in fleet}
+        else:
+            registries = {"rover": window.controller.metrics}
+        metrics_server = MetricsServer(registries, port=args.metrics_port)
+        asyncio.ensure_future(metrics_server.start())
+    if args.relay_port:
+        # Observers connect here instead of adding load on the rover itself
+        relay = RelayHub(window.controller, port=args.relay_port)
+        asyncio.ensure_future(relay.start())
+
     with loop:
         loop.run_forever()
\ No newline at end of file
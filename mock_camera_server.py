@@ -0,0 +1,223 @@
+import argparse
+import asyncio
+import collections
+import glob
+import json
+import os
+import time
+import urllib.parse
+
+import cv2
+import numpy as np
+
+# Same boundary and part layout as the ESP32 CameraWebServer stream handler
+BOUNDARY = "123456789000000000000987654321"
+PART_HEADER = ("\r\n--" + BOUNDARY + "\r\n"
+               "Content-Type: image/jpeg\r\n"
+               "Content-Length: {length}\r\n"
+               "X-Timestamp: {timestamp:.6f}\r\n\r\n")
+
+# esp32-camera framesize_t values the firmware's /control accepts
+FRAME_SIZES = {5: (320, 240), 6: (400, 296), 7: (480, 320), 8: (640, 480), 9: (800, 600)}
+BOOT_SETTING = {"framesize": 8, "quality": 12}  # What espcam32.cpp configures
+
+
+class Camera:
+    """Source frames re-encoded at the current framesize/quality, like the sensor."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.images = [cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+                       for jpeg in frames]
+        self.settings = dict(BOOT_SETTING)
+        self._cache = {}
+
+    def set(self, var, value):
+        if var == "framesize" and value in FRAME_SIZES:
+            self.settings[var] = value
+        elif var == "quality" and 10 <= value <= 63:
+            self.settings[var] = value
+        else:
+            raise ValueError(f"{var}={value}")
+        print(f"Camera {var} set to {value}")
+
+    def jpeg(self, index):
+        index %= len(self.frames)
+        key = (index, self.settings["framesize"], self.settings["quality"])
+        if self.settings == BOOT_SETTING:
+            return self.frames[index]
+        if key not in self._cache:
+            width, height = FRAME_SIZES[key[1]]
+            image = cv2.resize(self.images[index], (width, height), interpolation=cv2.INTER_AREA)
+            # ESP quality runs 10 (best) to 63; map it onto OpenCV's 100-0 scale
+            quality = max(5, int(100 - 1.5 * key[2]))
+            ok, jpeg = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+            self._cache[key] = jpeg.tobytes()
+        return self._cache[key]
+
+
+def load_frames(frames_dir):
+    """Recorded JPEGs from a directory, replayed in name order."""
+    paths = sorted(glob.glob(os.path.join(frames_dir, "*.jpg")) +
+                   glob.glob(os.path.join(frames_dir, "*.jpeg")))
+    frames = []
+    for path in paths:
+        with open(path, "rb") as f:
+            frames.append(f.read())
+    return frames
+
+
+def synthetic_frames(count=60, width=640, height=480, quality=88):
+    """A moving test pattern, used when no recorded frames are given."""
+    frames = []
+    for i in range(count):
+        image = np.full((height, width, 3), 40, dtype=np.uint8)
+        x = int(i * (width - 80) / count)
+        cv2.rectangle(image, (x, height // 3), (x + 80, 2 * height // 3), (0, 200, 0), -1)
+        cv2.putText(image, f"frame {i}", (20, 40), cv2.FONT_HERSHEY_SIMPLEX, 1,
+                    (255, 255, 255), 2)
+        ok, jpeg = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        frames.append(jpeg.tobytes())
+    return frames
+
+
+def write_chunk(writer, data):
+    writer.write(b"%x\r\n" % len(data) + data + b"\r\n")
+
+
+def part(camera, index):
+    jpeg = camera.jpeg(index)
+    return PART_HEADER.format(length=len(jpeg), timestamp=time.time()).encode(), jpeg
+
+
+async def stream(writer, camera, fps, bandwidth, buffer_size):
+    writer.write(
+        b"HTTP/1.1 200 OK\r\n"
+        b"Content-Type: multipart/x-mixed-replace;boundary=" + BOUNDARY.encode() + b"\r\n"
+        b"Transfer-Encoding: chunked\r\n"
+        b"Access-Control-Allow-Origin: *\r\n\r\n"
+    )
+    if bandwidth:
+        await limited_stream(writer, camera, fps, bandwidth, buffer_size)
+        return
+    interval = 1.0 / fps
+    next_time = time.monotonic()
+    index = 0
+    while True:
+        header, jpeg = part(camera, index)
+        # The ESP32 sends boundary+headers and the JPEG as separate chunks
+        write_chunk(writer, header)
+        write_chunk(writer, jpeg)
+        await writer.drain()
+        index += 1
+        next_time += interval
+        await asyncio.sleep(max(0.0, next_time - time.monotonic()))
+
+
+async def limited_stream(writer, camera, fps, bandwidth, buffer_size):
+    """Stream through an emulated link of ``bandwidth`` bytes/s.
+
+    Frames are stamped when captured and wait in a send buffer of
+    ``buffer_size`` bytes, so a frame size/quality the link cannot carry
+    shows up as growing frame age; a frame is only captured when the
+    buffer has room, as the ESP32 blocks in send() when the socket is full.
+    """
+    queue = collections.deque()
+    buffered = 0
+
+    async def capture():
+        nonlocal buffered
+        interval = 1.0 / fps
+        next_time = time.monotonic()
+        index = 0
+        while True:
+            if buffered < buffer_size:
+                for chunk in part(camera, index):
+                    queue.append(chunk)
+                    buffered += len(chunk)
+                index += 1
+            next_time += interval
+            await asyncio.sleep(max(0.0, next_time - time.monotonic()))
+
+    capturing = asyncio.ensure_future(capture())
+    try:
+        sent_until = time.monotonic()
+        while True:
+            if not queue:
+                await asyncio.sleep(0.005)
+                sent_until = max(sent_until, time.monotonic())
+                continue
+            chunk = queue.popleft()
+            buffered -= len(chunk)
+            sent_until += len(chunk) / bandwidth
+            await asyncio.sleep(max(0.0, sent_until - time.monotonic()))
+            write_chunk(writer, chunk)
+            await writer.drain()
+    finally:
+        capturing.cancel()
+
+
+def respond(writer, status, body=b"", content_type="text/plain"):
+    writer.write(b"HTTP/1.1 %s\r\nContent-Type: %s\r\nContent-Length: %d\r\n"
+                 b"Access-Control-Allow-Origin: *\r\n\r\n"
+                 % (status.encode(), content_type.encode(), len(body)) + body)
+
+
+async def handle_connection(reader, writer, camera, args):
+    try:
+        request_line = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass  # Skip request headers
+        parts = request_line.decode("latin-1").split()
+        url = urllib.parse.urlsplit(parts[1] if len(parts) > 1 else "/")
+        path = url.path
+
+        if path.startswith("/stream"):
+            print("Stream client connected")
+            await stream(writer, camera, args.fps, args.bandwidth * 1000, args.buffer * 1000)
+        elif path.startswith("/capture"):
+            respond(writer, "200 OK", camera.jpeg(0), "image/jpeg")
+        elif path == "/control":
+            # Same interface as the CameraWebServer: /control?var=framesize&val=8
+            query = urllib.parse.parse_qs(url.query)
+            try:
+                camera.set(query["var"][0], int(query["val"][0]))
+                respond(writer, "200 OK")
+            except (KeyError, ValueError):
+                respond(writer, "500 Internal Server Error")
+        elif path == "/status":
+            respond(writer, "200 OK", json.dumps(camera.settings).encode(), "application/json")
+        else:
+            respond(writer, "404 Not Found")
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError):
+        print("Stream client disconnected")
+    finally:
+        writer.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Stand-in for the ESP32-CAM MJPEG server")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--fps", type=float, default=25.0)
+    parser.add_argument("--frames", help="directory of recorded .jpg frames to replay")
+    parser.add_argument("--bandwidth", type=float, default=0,
+                        help="emulate a link of this many kB/s (default: unlimited)")
+    parser.add_argument("--buffer", type=float, default=64,
+                        help="send buffer of the emulated link in kB")
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames) if args.frames else synthetic_frames()
+    if not frames:
+        raise SystemExit(f"No .jpg frames found in {args.frames}")
+    camera = Camera(frames)
+
+    server = await asyncio.start_server(
+        lambda r, w: handle_connection(r, w, camera, args), args.host, args.port
+    )
+    async with server:
+        print(f"Mock camera streaming at http://{args.host}:{args.port}/stream")
+        await server.serve_forever()
+
+asyncio.run(main())
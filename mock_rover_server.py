@@ -1,32 +1,319 @@
+"""Stand-in for the x0 rover firmware, usable as a network simulator.
+
+With no options it behaves like the original mock: every command is
+answered with one random telemetry message. Options turn it into a load
+and fault simulator:
+
+    python mock_rover_server.py --rate 200 --latency 30 --jitter 10 --drop 0.02 --ack --quiet
+
+``--rate`` pushes telemetry independently of commands, ``--trace`` plays
+back the telemetry of a flight recording instead of random values,
+``--latency``/``--jitter`` delay each direction, ``--drop`` loses messages
+and ``--ack`` confirms every command with its receive timestamp.
+
+Like the firmware, telemetry echoes the last applied command (``ack``,
+``ack_t``) and a client-configured deadman stops a move that is not
+refreshed in time.
+"""
+import argparse
 import asyncio
 import websockets
 import json
 import random
+import time
+
+from rover.protocol import (
+    BINARY_PROTOCOL, HEADER, ProtocolError, decode_command, decode_telemetry, encode_telemetry
+)
+from rover.recorder import TELEMETRY, read_records
 
 clients = set()
 
-async def handle_connection(websocket):
+
+def random_telemetry():
+    return {
+        "battery": random.randint(50, 100),
+        "imu": {"pitch": round(random.uniform(-5, 5), 2), "roll": round(random.uniform(-5, 5), 2)},
+        "temp": round(random.uniform(20, 30), 1),
+        "arm": {"joint1": random.randint(0, 180)}
+    }
+
+
+def load_trace(path):
+    """Telemetry of a flight recording as [(seconds since start, dict)]."""
+    _, records = read_records(path)
+    trace = []
+    for elapsed, kind, payload in records:
+        if kind != TELEMETRY:
+            continue
+        if isinstance(payload, bytes):
+            _, battery, pitch, roll, arm = decode_telemetry(payload)
+            payload = {"battery": battery, "imu": {"pitch": pitch, "roll": roll},
+                       "arm": {"joint1": arm}}
+        else:
+            payload = json.loads(payload)
+        trace.append((elapsed, payload))
+    return trace
+
+
+class SimulatedLink:
+    """One client session with the configured delay, jitter and loss.
+
+    Each direction is a queue drained in order, so delayed messages are
+    never reordered (the real link is TCP); a dropped message is simply
+    never delivered.
+    """
+
+    def __init__(self, websocket, args):
+        self.websocket = websocket
+        self.args = args
+        self.binary = False
+        self.telemetry_seq = 0
+        self.command_seq = 0
+        self.sent = 0
+        self.dropped = 0
+        self.commands = 0
+        self.last_seq = None  # Echoed in telemetry as "ack"
+        self.last_t = None
+        self.deadman_ms = 0  # 0 = disabled until the client asks for one
+        self.moving = False
+        self.last_move = 0.0
+        self.deadman_stops = 0
+        self._outbox = asyncio.Queue()
+        self._last_due = 0.0
+
+    def _due(self):
+        # Never earlier than the previous message: delay without reordering
+        delay = self.args.latency + random.uniform(-self.args.jitter, self.args.jitter)
+        self._last_due = max(self._last_due, time.monotonic() + max(delay, 0) / 1000)
+        return self._last_due
+
+    def _lost(self):
+        if self.args.drop and random.random() < self.args.drop:
+            self.dropped += 1
+            return True
+        return False
+
+    def send(self, message):
+        if self._lost():
+            return
+        self._outbox.put_nowait((self._due(), message))
+
+    async def _deliver(self):
+        while True:
+            due, message = await self._outbox.get()
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self.websocket.send(message)
+            self.sent += 1
+
+    def send_telemetry(self, telemetry):
+        arm = telemetry.get("arm")
+        arm = arm.get("joint1", 0) if isinstance(arm, dict) else arm or 0
+        if self.binary:
+            self.telemetry_seq += 1
+            self.send(encode_telemetry(
+                self.telemetry_seq, telemetry["battery"], telemetry["imu"]["pitch"],
+                telemetry["imu"]["roll"], arm, ack=self.last_seq
+            ))
+        else:
+            # Wall-clock send time lets clients measure telemetry age
+            telemetry = dict(telemetry, ts=round(time.time(), 6))
+            if self.last_seq is not None:
+                telemetry["ack"] = self.last_seq
+                telemetry["ack_t"] = self.last_t
+            self.send(json.dumps(telemetry))
+
+    async def _push_random(self):
+        # Send what is owed so far rather than one message per sleep, so high
+        # rates hold even though asyncio.sleep cannot tick every 0.1 ms
+        started = time.monotonic()
+        pushed = 0
+        while True:
+            await asyncio.sleep(min(1 / self.args.rate, 0.005))
+            owed = int((time.monotonic() - started) * self.args.rate) - pushed
+            for _ in range(owed):
+                self.send_telemetry(random_telemetry())
+            pushed += owed
+
+    async def _push_trace(self, trace):
+        while True:
+            started = time.monotonic()
+            for elapsed, telemetry in trace:
+                delay = started + elapsed - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self.send_telemetry(telemetry)
+            await asyncio.sleep(0.1)  # Then loop the trace
+
+    def handle(self, message, received):
+        """Process one command that has made it through the simulated link."""
+        seq = None
+        if isinstance(message, bytes):
+            try:
+                data = decode_command(message)
+                _, _, seq = HEADER.unpack_from(message)
+            except ProtocolError as e:
+                print(f"Bad binary command: {e}")
+                return
+            text = f"(binary) {data}"
+        else:
+            try:
+                data = json.loads(message)
+            except ValueError as e:
+                print(f"Bad JSON command: {e}")
+                return
+            if not isinstance(data, dict):
+                print(f"Ignoring non-object JSON command: {message}")
+                return
+            if data.get("cmd") == "ping":
+                # Heartbeat: echo the client's timestamp for RTT measurement
+                self.send(json.dumps({"pong": data.get("t")}))
+                return
+            text = message
+            seq = data.get("seq")
+        self.commands += 1
+        self.command_seq += 1
+        if seq is not None:
+            self.last_seq = seq
+            self.last_t = data.get("t")
+        if data.get("cmd") == "deadman":
+            self.deadman_ms = max(0, int(data.get("ms", 0)))
+        elif data.get("cmd") == "move":
+            self.moving = data.get("dir") != "stop"
+            self.last_move = time.monotonic()
+        elif data.get("cmd") == "drive":
+            self.moving = bool(data.get("throttle") or data.get("steering"))
+            self.last_move = time.monotonic()
+        if not self.args.quiet:
+            print(f"[{received:.6f}] Received from GUI: {text}")
+        if self.args.ack:
+            self.send(json.dumps({
+                "ack": self.command_seq if seq is None else seq,
+                "cmd": data.get("cmd"),
+                "rx": round(received, 6),
+            }))
+        if not self.args.rate and self.args.trace is None:
+            # Simulate a response (telemetry)
+            self.send_telemetry(random_telemetry())
+
+    async def _deadman(self):
+        while True:
+            await asyncio.sleep(0.02)
+            if (self.moving and self.deadman_ms and
+                    time.monotonic() - self.last_move > self.deadman_ms / 1000):
+                self.moving = False
+                self.deadman_stops += 1
+                print(f"Deadman: no move for {self.deadman_ms} ms, stopping")
+
+    def start_streaming(self, trace):
+        if trace:
+            return asyncio.ensure_future(self._push_trace(trace))
+        if self.args.rate:
+            return asyncio.ensure_future(self._push_random())
+        return None
+
+    async def run(self, trace):
+        inbox = asyncio.Queue()
+
+        async def process():
+            while True:
+                due, received, message = await inbox.get()
+                delay = due - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                self.handle(message, received)
+
+        tasks = [asyncio.ensure_future(self._deliver()), asyncio.ensure_future(process()),
+                 asyncio.ensure_future(self._deadman())]
+        stream = self.start_streaming(trace)
+        if stream is not None:
+            tasks.append(stream)
+        try:
+            async for message in self.websocket:
+                received = time.time()
+                data = hello(message)
+                if data is not None:
+                    # Protocol negotiation is never delayed or dropped: use
+                    # binary frames from here on if offered
+                    proto = data.get("proto")
+                    self.binary = isinstance(proto, list) and BINARY_PROTOCOL in proto
+                    reply = BINARY_PROTOCOL if self.binary else "json"
+                    await self.websocket.send(json.dumps({"proto": reply}))
+                    if not self.args.quiet:
+                        print(f"[{received:.6f}] Received from GUI: {message}")
+                    continue
+                if self._lost():
+                    continue
+                inbox.put_nowait((self._due(), received, message))
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def hello(message):
+    """The decoded message if it is a hello, else None (handled like any command)."""
+    if not isinstance(message, str) or '"hello"' not in message:
+        return None
+    try:
+        data = json.loads(message)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) and data.get("cmd") == "hello" else None
+
+
+async def handle_connection(websocket, args, trace):
     print("Client connected")
     clients.add(websocket)
+    link = SimulatedLink(websocket, args)
     try:
-        async for message in websocket:
-            print(f"Received from GUI: {message}")
-            # Simulate a response (telemetry)
-            response = {
-                "battery": random.randint(50, 100),
-                "imu": {"pitch": round(random.uniform(-5, 5), 2), "roll": round(random.uniform(-5, 5), 2)},
-                "temp": round(random.uniform(20, 30), 1),
-                "arm": {"joint1": random.randint(0, 180)}
-            }
-            await websocket.send(json.dumps(response))
+        await link.run(trace)
     except websockets.exceptions.ConnectionClosed:
-        print("Client disconnected")
+        pass
     finally:
         clients.remove(websocket)
+        print(f"Client disconnected ({link.commands} commands, {link.sent} messages sent, "
+              f"{link.dropped} dropped, {link.deadman_stops} deadman stops)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Stand-in for the x0 rover firmware")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--instances", type=int, default=1,
+                        help="simulate several rovers on consecutive ports")
+    parser.add_argument("--rate", type=float, default=0,
+                        help="push telemetry at this rate in Hz (default: only reply to commands)")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="push the telemetry of a flight recording at its recorded timing")
+    parser.add_argument("--latency", type=float, default=0,
+                        help="one-way delay in ms, applied in both directions")
+    parser.add_argument("--jitter", type=float, default=0,
+                        help="random +/- variation of the delay in ms")
+    parser.add_argument("--drop", type=float, default=0,
+                        help="probability of losing each message (0-1)")
+    parser.add_argument("--ack", action="store_true",
+                        help='confirm every command with {"ack": seq, "cmd": ..., "rx": time}')
+    parser.add_argument("--quiet", action="store_true",
+                        help="do not print every received command")
+    return parser.parse_args(argv)
+
+
+async def main(argv=None):
+    args = parse_args(argv)
+    trace = load_trace(args.trace) if args.trace else None
+    if trace is not None and not trace:
+        raise SystemExit(f"No telemetry in {args.trace}")
+
+    servers = []
+    for port in range(args.port, args.port + args.instances):
+        servers.append(await websockets.serve(
+            lambda ws: handle_connection(ws, args, trace), args.host, port
+        ))
+        print(f"Mock Rover Server running at ws://{args.host}:{port}", flush=True)
+    await asyncio.Future()  # run forever
 
-async def main():
-    async with websockets.serve(handle_connection, "localhost", 8765):
-        print("Mock Rover Server running at ws://localhost:8765")
-        await asyncio.Future()  # run forever
 
-asyncio.run(main())
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+"""Qt-independent building blocks for the x0 rover controller."""
+
+from rover.backends import OnnxDetector, OpenVinoDetector, detector_loader
+from rover.bitrate import BitrateController, control_url
+from rover.capture import CaptureThread, FrameSlot, create_capture
+from rover.commands import CommandScheduler
+from rover.connection import RoverConnection
+from rover.controller import RoverController, direction_for_keys
+from rover.detection import (
+    BatchDetectionWorker, Detection, DetectionConfig, DetectionFeed, DetectionPipeline,
+    DetectionWorker, draw_detections, load_yolo
+)
+from rover.fleet import Fleet, RoverSession, parse_rover_spec
+from rover.framebus import FrameBus
+from rover.gamepad import DriveStreamer, LinuxJoystick, VirtualGamepad, open_gamepad
+from rover.logline import format_log_line
+from rover.metrics import LoopLagMonitor, Metrics, MetricsServer
+from rover.mission import Mission
+from rover.mjpeg import MjpegCapture, MultipartParser
+from rover.predict import PosePredictor
+from rover.protocol import BinaryCodec, JsonCodec, ProtocolError, negotiate
+from rover.recorder import FlightRecorder, read_records, replay, telemetry_arrays
+from rover.relay import RelayHub
+from rover.render import FrameScaler
+from rover.startup import StartupTimer
+from rover.telemetry import TelemetryState
+from rover.ticker import Ticker, sleep_until
+from rover.timeseries import RingSeries, downsample, event_rate, lttb, minmax_downsample
+from rover.tracking import IoUTracker
+from rover.video import VideoRecorder
+
+__all__ = [
+    "BatchDetectionWorker",
+    "BinaryCodec",
+    "BitrateController",
+    "CaptureThread",
+    "CommandScheduler",
+    "Detection",
+    "DetectionConfig",
+    "DetectionFeed",
+    "DetectionPipeline",
+    "DetectionWorker",
+    "DriveStreamer",
+    "FlightRecorder",
+    "Fleet",
+    "FrameBus",
+    "FrameScaler",
+    "FrameSlot",
+    "IoUTracker",
+    "JsonCodec",
+    "LinuxJoystick",
+    "LoopLagMonitor",
+    "Metrics",
+    "MetricsServer",
+    "Mission",
+    "MjpegCapture",
+    "MultipartParser",
+    "OnnxDetector",
+    "OpenVinoDetector",
+    "PosePredictor",
+    "ProtocolError",
+    "RelayHub",
+    "RoverConnection",
+    "RingSeries",
+    "RoverController",
+    "RoverSession",
+    "StartupTimer",
+    "TelemetryState",
+    "Ticker",
+    "VirtualGamepad",
+    "VideoRecorder",
+    "control_url",
+    "create_capture",
+    "detector_loader",
+    "direction_for_keys",
+    "downsample",
+    "draw_detections",
+    "event_rate",
+    "format_log_line",
+    "load_yolo",
+    "lttb",
+    "minmax_downsample",
+    "negotiate",
+    "open_gamepad",
+    "parse_rover_spec",
+    "read_records",
+    "replay",
+    "sleep_until",
+    "telemetry_arrays",
+]
@@ -0,0 +1,221 @@
+"""Headless rover controller: ``python -m rover``.
+
+Drives a rover without Qt or a display, e.g. on a ground-station box or
+from a script::
+
+    python -m rover --url ws://192.168.4.1:81 --send '{"cmd":"move","dir":"forward"}' --duration 5
+
+Commands given with ``--send`` are queued once the link is up; telemetry
+is printed once a second until ``--duration`` elapses (or forever).
+
+Several rovers can be driven at once with a repeated ``--rover
+[NAME=]URL`` (``--send`` then goes to all of them). ``--metrics-port``
+and ``--metrics-json`` export the link metrics (see rover/metrics.py).
+
+``--mission FILE`` runs a timed mission script once connected (see
+rover/mission.py) and exits when it is done, unless ``--duration`` says
+otherwise.
+
+``--relay-port`` shares the (first) rover's link with other clients,
+which connect to the relay instead of the rover; ``--relay-control``
+lets one of them drive (see rover/relay.py)::
+
+    python -m rover --url ws://192.168.4.1:81 --relay-port 8766 --relay-control
+"""
+import time
+
+LAUNCH_TIME = time.perf_counter()  # Taken before the controller imports below
+
+import argparse
+import asyncio
+import json
+
+from rover.connection import DEFAULT_URL
+from rover.fleet import Fleet, parse_rover_spec
+from rover.logline import format_log_line
+from rover.metrics import LoopLagMonitor, MetricsServer
+from rover.mission import Mission
+from rover.relay import RelayHub
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m rover",
+                                     description="Headless x0 rover controller")
+    parser.add_argument(
+        "--url", default=DEFAULT_URL,
+        help=f"rover WebSocket endpoint (default {DEFAULT_URL})"
+    )
+    parser.add_argument(
+        "--rover", metavar="[NAME=]URL", action="append", default=[],
+        help="drive several rovers at once (repeatable; overrides --url)"
+    )
+    parser.add_argument(
+        "--protocol", choices=("auto", "json"), default="auto",
+        help="'auto' offers the compact binary protocol and falls back to JSON"
+    )
+    parser.add_argument(
+        "--record", metavar="FILE",
+        help="record all telemetry and commands to FILE"
+    )
+    parser.add_argument(
+        "--replay", metavar="FILE",
+        help="replay a recorded flight instead of connecting to the rover"
+    )
+    parser.add_argument(
+        "--replay-speed", type=float, default=1.0,
+        help="replay speed multiplier (0 = as fast as possible)"
+    )
+    parser.add_argument(
+        "--send", metavar="JSON", action="append", default=[], type=json.loads,
+        help="command to send once connected (repeatable)"
+    )
+    parser.add_argument(
+        "--mission", metavar="FILE",
+        help="run a timed mission script once connected (first rover)"
+    )
+    parser.add_argument(
+        "--metrics-port", type=int,
+        help="serve metrics on http://127.0.0.1:PORT/metrics (Prometheus) and /metrics.json"
+    )
+    parser.add_argument(
+        "--metrics-json", metavar="FILE",
+        help="append a JSON line of metrics per rover to FILE once a second"
+    )
+    parser.add_argument(
+        "--relay-port", type=int,
+        help="relay the rover link to other clients on ws://HOST:PORT"
+    )
+    parser.add_argument(
+        "--relay-host", default="0.0.0.0",
+        help="interface the relay listens on (default all)"
+    )
+    parser.add_argument(
+        "--relay-control", action="store_true",
+        help="let one relay client at a time drive the rover (default: observe only)"
+    )
+    parser.add_argument(
+        "--duration", type=float,
+        help="seconds to run before exiting (default: until interrupted)"
+    )
+    return parser.parse_args(argv)
+
+
+def status_line(controller, seen):
+    values = controller.telemetry.values
+    link = controller.connection.stats()
+    rtt = f"{link['rtt_ms']:.0f} ms" if link["rtt_ms"] is not None else "--"
+    return (
+        f"Battery {values['battery']}% | Pitch {values['pitch']} | "
+        f"Roll {values['roll']} | {controller.telemetry.messages - seen} new msgs | "
+        f"RTT {rtt}"
+    )
+
+
+async def run(args):
+    fleet = Fleet()
+    for index, spec in enumerate(args.rover or [args.url]):
+        name, url, _ = parse_rover_spec(spec, index)
+        fleet.add(name, url, protocol=args.protocol,
+                  record_path=args.record if len(args.rover) <= 1 else None)
+    for session in fleet:
+        prefix = f"{session.name}: " if len(fleet) > 1 else ""
+        session.controller.on_log = (
+            lambda text, prefix=prefix: print(format_log_line(prefix + text), flush=True)
+        )
+    controllers = [session.controller for session in fleet]
+    mission = None
+    if args.mission:
+        try:
+            mission = Mission.load(controllers[0], args.mission)
+        except (OSError, ValueError) as e:
+            print(f"Cannot load mission: {e}", flush=True)
+            return 2
+
+    if args.replay:
+        controllers[0].start(connect=False)
+        await controllers[0].replay(args.replay, args.replay_speed)
+        await fleet.close()
+        return 0
+
+    registries = {session.name: session.controller.metrics for session in fleet}
+    metrics_server = None
+    if args.metrics_port:
+        metrics_server = MetricsServer(registries, port=args.metrics_port)
+        await metrics_server.start()
+    if args.metrics_json:
+        for metrics in registries.values():
+            metrics.enable("json")
+    loop_lag = LoopLagMonitor(controllers[0].metrics)
+    loop_lag.start()
+    relay = None
+    if args.relay_port:
+        relay = RelayHub(controllers[0], args.relay_host, args.relay_port,
+                         remote_control=args.relay_control)
+        await relay.start()
+
+    fleet.start()
+    connected = await asyncio.gather(*(c.wait_connected(args.duration) for c in controllers))
+    for controller, ok in zip(controllers, connected):
+        if not ok:
+            controller.log("Could not connect to the rover")
+    if not any(connected):
+        if relay is not None:
+            await relay.close()
+        await fleet.close()
+        return 1
+    print(format_log_line(
+        f"{sum(connected)}/{len(fleet)} connected "
+        f"{(time.perf_counter() - LAUNCH_TIME) * 1000:.0f} ms after startup"
+    ), flush=True)
+    for msg in args.send:
+        for controller in controllers:
+            data = dict(msg)
+            controller.send_cmd(data.pop("cmd"), data)
+    mission_task = None
+    if mission is not None:
+        mission_task = asyncio.ensure_future(mission.run())
+        if args.duration is None:
+            args.duration = mission.duration + 1.0  # Then let the final stop go out
+
+    deadline = None if args.duration is None else time.monotonic() + args.duration
+    seen = [0] * len(controllers)
+    while deadline is None or time.monotonic() < deadline:
+        remaining = 1.0 if deadline is None else deadline - time.monotonic()
+        await asyncio.sleep(max(0.0, min(1.0, remaining)))
+        for index, controller in enumerate(controllers):
+            controller.log(status_line(controller, seen[index]))
+            seen[index] = controller.telemetry.messages
+        if relay is not None:
+            stats = relay.stats()
+            controllers[0].log(f"Relay: {stats['clients']} clients | {stats['dropped']} dropped"
+                               f" | authority {stats['authority'] or 'free'}")
+        if args.metrics_json:
+            with open(args.metrics_json, "a") as f:
+                f.write(json.dumps({"t": round(time.time(), 3), "rovers": {
+                    name: metrics.snapshot() for name, metrics in registries.items()
+                }}) + "\n")
+
+    if mission_task is not None:
+        if mission_task.done():
+            controllers[0].log(f"Mission done: {json.dumps(mission_task.result())}")
+        else:
+            mission_task.cancel()
+    loop_lag.stop()
+    if relay is not None:
+        await relay.close()
+    if metrics_server is not None:
+        metrics_server.close()
+    await fleet.close()
+    return 0
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        return asyncio.run(run(args))
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
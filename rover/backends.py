@@ -0,0 +1,292 @@
+"""Detector backends: ultralytics, ONNX Runtime and OpenVINO.
+
+The detection workers only need a callable with the ultralytics calling
+convention - ``model(image_or_list, verbose=False, imgsz=, conf=, iou=,
+classes=)`` returning results with ``names`` and ``boxes`` - so the ONNX
+Runtime and OpenVINO backends run a YOLOv8 export (``yolo export
+format=onnx``) behind that same interface, without torch. Every runtime
+is imported when its backend is loaded, never at module level.
+
+``int8`` picks a quantized variant of the model, created next to it on
+first use: ONNX Runtime quantizes the weights dynamically; OpenVINO runs
+NNCF post-training quantization, which needs ``calibration`` frames (a
+video file or a directory of images, e.g. a mission recording).
+"""
+import ast
+import functools
+import glob
+import os
+
+import cv2
+import numpy as np
+
+from rover.detection import load_yolo
+
+BACKENDS = ("ultralytics", "onnx", "openvino")
+
+
+class _Box:
+    """One box in the shape parse_results expects from ultralytics."""
+
+    __slots__ = ("xyxy", "conf", "cls")
+
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy = (xyxy,)
+        self.conf = (conf,)
+        self.cls = (cls,)
+
+
+class _Result:
+    __slots__ = ("names", "boxes")
+
+    def __init__(self, names, boxes):
+        self.names = names
+        self.boxes = boxes
+
+
+def letterbox(image, size):
+    """Resize keeping the aspect ratio and pad to size x size, as ultralytics does.
+
+    Returns (NCHW float32 RGB blob, scale, (pad_x, pad_y)).
+    """
+    height, width = image.shape[:2]
+    scale = min(size / height, size / width)
+    new_w, new_h = int(round(width * scale)), int(round(height * scale))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(
+        image, (new_w, new_h), interpolation=cv2.INTER_LINEAR
+    )
+    blob = cv2.dnn.blobFromImage(canvas, 1 / 255.0, swapRB=True)
+    return blob, scale, (pad_x, pad_y)
+
+
+def decode_yolov8(output, scale, pad, conf=0.25, iou=0.45, classes=None, max_det=300):
+    """Boxes of one image from a YOLOv8 head output of shape (1, 4 + classes, anchors).
+
+    Returns [(x1, y1, x2, y2), conf, class_id] in original image pixels,
+    after per-class NMS.
+    """
+    pred = output[0].T  # (anchors, 4 + classes)
+    scores = pred[:, 4:]
+    class_ids = scores.argmax(axis=1)
+    confs = scores[np.arange(len(scores)), class_ids]
+    keep = confs >= conf
+    if classes is not None:
+        keep &= np.isin(class_ids, classes)
+    if not keep.any():
+        return []
+    pred, confs, class_ids = pred[keep], confs[keep], class_ids[keep]
+    cx, cy, w, h = pred[:, 0], pred[:, 1], pred[:, 2], pred[:, 3]
+    pad_x, pad_y = pad
+    x1 = (cx - w / 2 - pad_x) / scale
+    y1 = (cy - h / 2 - pad_y) / scale
+    rects = np.stack([x1, y1, w / scale, h / scale], axis=1)
+    indices = cv2.dnn.NMSBoxesBatched(rects.tolist(), confs.tolist(), class_ids.tolist(),
+                                      conf, iou, top_k=max_det)
+    boxes = []
+    for i in np.asarray(indices).reshape(-1):
+        x, y, bw, bh = rects[i]
+        boxes.append(((x, y, x + bw, y + bh), float(confs[i]), int(class_ids[i])))
+    return boxes
+
+
+class ExportedYolo:
+    """Pre/post-processing shared by the runtimes that run an exported YOLOv8.
+
+    ``input_size`` is the model's fixed input size, or None when the export
+    has dynamic axes (then each call's ``imgsz`` is used). Subclasses
+    implement ``infer(blob)`` returning the raw head output.
+    """
+
+    backend = None
+
+    def __init__(self, names, input_size=None):
+        self.names = names
+        self.input_size = input_size
+
+    def infer(self, blob):
+        raise NotImplementedError
+
+    def __call__(self, images, verbose=False, imgsz=640, conf=0.25, iou=0.45, classes=None):
+        single = not isinstance(images, (list, tuple))
+        results = []
+        for image in ([images] if single else images):
+            size = self.input_size or max(32, int(round(imgsz / 32)) * 32)
+            blob, scale, pad = letterbox(image, size)
+            boxes = decode_yolov8(self.infer(blob), scale, pad, conf, iou, classes)
+            for _, _, class_id in boxes:
+                self.names.setdefault(class_id, str(class_id))  # Export without metadata
+            results.append(_Result(self.names, [_Box(*box) for box in boxes]))
+        return results
+
+
+def _static_size(shape):
+    """Square input size of an NCHW shape, or None if it is dynamic."""
+    height, width = shape[2], shape[3]
+    if isinstance(height, int) and height == width and height > 0:
+        return height
+    return None
+
+
+def _parse_names(text):
+    """ultralytics stores class names as the repr of a dict in the metadata."""
+    try:
+        names = ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return None
+    return {int(k): v for k, v in names.items()} if isinstance(names, dict) else None
+
+
+def _names_from_yaml(path):
+    """Class names from an ultralytics ``metadata.yaml`` (only the ``names`` block)."""
+    names = {}
+    try:
+        with open(path) as f:
+            in_names = False
+            for line in f:
+                if not line.startswith(" ") and line.strip():
+                    in_names = line.startswith("names:")
+                    continue
+                key, sep, value = line.strip().partition(":")
+                if in_names and sep and key.isdigit():
+                    names[int(key)] = value.strip().strip("'\"")
+    except OSError:
+        return None
+    return names or None
+
+
+class OnnxDetector(ExportedYolo):
+    """YOLOv8 ONNX export on ONNX Runtime's CPU execution provider."""
+
+    backend = "onnx"
+
+    def __init__(self, path, threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        names = _parse_names(metadata.get("names", "")) or {}
+        super().__init__(names, _static_size(model_input.shape))
+
+    def infer(self, blob):
+        return self.session.run(None, {self.input_name: blob})[0]
+
+
+class OpenVinoDetector(ExportedYolo):
+    """YOLOv8 export (OpenVINO IR ``.xml`` or ONNX) compiled for the CPU."""
+
+    backend = "openvino"
+
+    def __init__(self, path, threads=None):
+        import openvino as ov
+
+        core = ov.Core()
+        model = core.read_model(path)
+        config = {"PERFORMANCE_HINT": "LATENCY"}
+        if threads:
+            config["INFERENCE_NUM_THREADS"] = threads
+        self.compiled = core.compile_model(model, "CPU", config)
+        self.output = self.compiled.output(0)
+        shape = model.input(0).get_partial_shape()
+        dims = [d.get_length() if d.is_static else None for d in shape]
+        names = _names_from_yaml(os.path.join(os.path.dirname(path), "metadata.yaml"))
+        super().__init__(names or {}, _static_size(dims))
+
+    def infer(self, blob):
+        return self.compiled([blob])[self.output]
+
+
+def read_frames(source, limit=None):
+    """BGR frames from a video file or a directory of images, in order."""
+    frames = []
+    if os.path.isdir(source):
+        paths = sorted(p for p in glob.glob(os.path.join(source, "*"))
+                       if p.lower().endswith((".jpg", ".jpeg", ".png", ".bmp")))
+        for path in paths[:limit]:
+            frame = cv2.imread(path)
+            if frame is not None:
+                frames.append(frame)
+        return frames
+    capture = cv2.VideoCapture(source)
+    try:
+        while limit is None or len(frames) < limit:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            frames.append(frame)
+    finally:
+        capture.release()
+    return frames
+
+
+def int8_path(path, extension):
+    stem, _ = os.path.splitext(path)
+    return f"{stem}.int8{extension}"
+
+
+def quantize_onnx(path):
+    """Weight-only dynamic INT8 quantization of an ONNX model (cached next to it)."""
+    output = int8_path(path, ".onnx")
+    if not os.path.exists(output):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(path, output, weight_type=QuantType.QUInt8)
+    return output
+
+
+def quantize_openvino(path, calibration, samples=300):
+    """NNCF post-training INT8 quantization for OpenVINO (cached next to the model)."""
+    import openvino as ov
+
+    output = int8_path(path, ".xml")
+    if os.path.exists(output):
+        return output
+    if calibration is None:
+        raise ValueError("OpenVINO INT8 needs calibration frames (a video or image directory)")
+    frames = read_frames(calibration, samples)
+    if not frames:
+        raise ValueError(f"No calibration frames in {calibration}")
+    import nncf
+
+    model = ov.Core().read_model(path)
+    shape = model.input(0).get_partial_shape()
+    size = _static_size([d.get_length() if d.is_static else None for d in shape]) or 640
+    dataset = nncf.Dataset(frames, lambda frame: letterbox(frame, size)[0])
+    ov.save_model(nncf.quantize(model, dataset, subset_size=len(frames)), output)
+    return output
+
+
+def _load_exported(cls, path, threads, int8, calibration, warmup_shape):
+    if int8:
+        path = quantize_onnx(path) if cls is OnnxDetector else quantize_openvino(path, calibration)
+    model = cls(path, threads)
+    if warmup_shape is not None:
+        model(np.zeros(warmup_shape, dtype=np.uint8))
+    return model
+
+
+def detector_loader(backend="ultralytics", model=None, threads=None, int8=False,
+                    calibration=None, warmup_shape=(480, 640, 3)):
+    """A ``model_loader`` for the detection workers (called on their thread).
+
+    ``model`` defaults to yolov8n.pt for ultralytics and yolov8n.onnx for
+    the other backends.
+    """
+    if backend == "ultralytics":
+        if int8:
+            raise ValueError("INT8 needs the onnx or openvino backend")
+        return functools.partial(load_yolo, model or "yolov8n.pt", warmup_shape, threads)
+    if backend == "onnx":
+        cls = OnnxDetector
+    elif backend == "openvino":
+        cls = OpenVinoDetector
+    else:
+        raise ValueError(f"Unknown detector backend {backend!r}; expected one of {BACKENDS}")
+    return functools.partial(_load_exported, cls, model or "yolov8n.onnx", threads, int8,
+                             calibration, warmup_shape)
@@ -0,0 +1,234 @@
+"""Adaptive video bitrate for the ESP32-CAM stream.
+
+The camera firmware fixes its frame size and JPEG quality at boot; on a
+congested link frames then queue up in the network buffers and the
+video falls seconds behind. ``BitrateController`` watches what the
+stream actually delivers and steps the camera along a ladder of
+(frame size, quality) settings through the CameraWebServer control
+endpoint (``/control?var=framesize&val=N`` and ``var=quality``):
+
+* down one step as soon as frames arrive older than ``target_ms`` (or
+  far below the expected frame rate);
+* up one step only after the link has had headroom for ``hold_s``; a
+  step up that has to be undone right away doubles that hold (capped),
+  so the controller does not oscillate around the link's capacity.
+
+Frame age comes from the parts' ``X-Timestamp`` header. The camera's
+clock is not ours (the ESP32 counts from boot), so the age is measured
+relative to the smallest arrival-minus-timestamp difference seen on the
+current stream: the queueing delay on top of the best case.
+"""
+import asyncio
+import time
+import urllib.parse
+import urllib.request
+
+# esp32-camera framesize_t values
+FRAME_SIZES = {5: "QVGA 320x240", 6: "CIF 400x296", 7: "HVGA 480x320", 8: "VGA 640x480",
+               9: "SVGA 800x600"}
+
+# (framesize, jpeg_quality) from best to smallest; quality is 10-63, lower is better
+LADDER = (
+    (8, 10),
+    (8, 12),  # The firmware's boot setting
+    (8, 18),
+    (7, 18),
+    (7, 25),
+    (6, 25),
+    (5, 25),
+    (5, 35),
+)
+DEFAULT_LEVEL = 1
+
+
+def control_url(stream_url):
+    """Control endpoint for a stream URL.
+
+    The ESP32 CameraWebServer streams on port 81 and serves ``/control``
+    on port 80; anything else (e.g. mock_camera_server.py) is assumed to
+    serve both on the same port.
+    """
+    parts = urllib.parse.urlsplit(stream_url)
+    netloc = parts.hostname if parts.port == 81 else parts.netloc
+    return urllib.parse.urlunsplit((parts.scheme, netloc, "/control", "", ""))
+
+
+class FrameAge:
+    """Age of frames on arrival from (camera timestamp, local arrival) pairs."""
+
+    def __init__(self):
+        self.baseline = None  # Smallest arrival - timestamp seen so far
+        self.last_ms = None
+
+    def reset(self):
+        self.baseline = None
+        self.last_ms = None
+
+    def update(self, timestamp, arrival):
+        offset = arrival - timestamp
+        if self.baseline is None or offset < self.baseline:
+            self.baseline = offset
+        self.last_ms = (offset - self.baseline) * 1000
+        return self.last_ms
+
+
+class BitrateController:
+    """Steps an MjpegCapture's camera along LADDER to keep frames fresh.
+
+    ``capture`` must have ``frames_received``, ``bytes_received`` and
+    ``last_frame_timing`` (MjpegCapture does). Runs on the event loop;
+    the HTTP requests run in the default executor. Every adjustment is
+    kept in ``adjustments`` and reported through ``on_log(text)``.
+    """
+
+    def __init__(self, capture, control, target_ms=300.0, expected_fps=None,
+                 metrics=None, interval=0.25, decide_every=2.0, hold_s=6.0,
+                 max_hold_s=60.0, level=DEFAULT_LEVEL):
+        self.capture = capture
+        self.control = control
+        self.target_ms = target_ms
+        self.expected_fps = expected_fps
+        self.metrics = metrics
+        self.interval = interval
+        self.decide_every = decide_every
+        self.base_hold_s = hold_s
+        self.hold_s = hold_s
+        self.max_hold_s = max_hold_s
+        self.level = level
+        self.age = FrameAge()
+        self.fps = None
+        self.kbps = None
+        self.age_ms = None  # Worst frame age of the last decision window
+        self.adjustments = []  # (time.time(), old level, new level, reason)
+        self.failures = 0
+        self.on_log = None
+        self._ages = []
+        self._last_timing = None
+        self._last_change = 0.0
+        self._task = None
+        if metrics is not None:
+            metrics.gauge("video_frame_age_ms", lambda: self.age_ms)
+            metrics.gauge("video_kbps", lambda: self.kbps)
+            metrics.gauge("video_level", lambda: self.level)
+
+    @property
+    def setting(self):
+        return LADDER[self.level]
+
+    def describe(self, level=None):
+        framesize, quality = LADDER[self.level if level is None else level]
+        return f"{FRAME_SIZES[framesize]} q{quality}"
+
+    def stats(self):
+        return {"level": self.level, "setting": self.describe(), "fps": self.fps,
+                "kbps": self.kbps, "age_ms": self.age_ms, "hold_s": self.hold_s,
+                "adjustments": len(self.adjustments), "failures": self.failures}
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return self._task
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def log(self, text):
+        if self.on_log is not None:
+            self.on_log(text)
+
+    def sample(self):
+        """Record the age of the newest frame, if a new one arrived."""
+        timing = self.capture.last_frame_timing
+        if timing is None or timing == self._last_timing:
+            return
+        if self._last_timing is not None and timing[0] < self._last_timing[0]:
+            self.age.reset()  # Camera clock went backwards: it rebooted
+        self._last_timing = timing
+        self._ages.append(self.age.update(*timing))
+
+    def decide(self, now, frames, nbytes, elapsed):
+        """Measure one window and pick the next level; returns (level, reason)."""
+        self.fps = frames / elapsed
+        self.kbps = nbytes * 8 / 1000 / elapsed
+        self.age_ms = max(self._ages) if self._ages else None
+        latest = self._ages[-1] if self._ages else None
+        self._ages = []
+        since_change = now - self._last_change
+        starved = self.expected_fps is not None and self.fps < 0.5 * self.expected_fps
+        congested = self.age_ms is not None and self.age_ms > self.target_ms
+        if congested and since_change < 2 * self.decide_every:
+            # Right after a change the backlog of old frames is still draining;
+            # only step again if the newest frame is late too
+            congested = latest > self.target_ms
+        if (congested or starved) and self.level < len(LADDER) - 1:
+            stepped_up = self.adjustments and self.adjustments[-1][2] < self.adjustments[-1][1]
+            if stepped_up and since_change <= self.hold_s:
+                # The step up did not fit: stay down here longer next time
+                self.hold_s = min(self.hold_s * 2, self.max_hold_s)
+            reason = f"frame age {self.age_ms:.0f} ms" if congested else f"{self.fps:.1f} fps"
+            return self.level + 1, reason
+        if since_change > self.max_hold_s:
+            self.hold_s = self.base_hold_s  # Settled for long enough: forget old oscillation
+        calm = self.age_ms is not None and self.age_ms < self.target_ms / 2 and not starved
+        if calm and self.level > 0 and since_change >= self.hold_s:
+            return self.level - 1, f"frame age {self.age_ms:.0f} ms"
+        return self.level, None
+
+    def _request(self, var, value):
+        query = urllib.parse.urlencode({"var": var, "val": value})
+        with urllib.request.urlopen(f"{self.control}?{query}", timeout=2.0) as response:
+            response.read()
+
+    async def apply(self, level, reason):
+        """Send the camera settings for ``level``; returns whether it worked."""
+        old = self.level
+        framesize, quality = LADDER[level]
+        loop = asyncio.get_running_loop()
+        try:
+            if framesize != LADDER[old][0]:
+                await loop.run_in_executor(None, self._request, "framesize", framesize)
+            if quality != LADDER[old][1]:
+                await loop.run_in_executor(None, self._request, "quality", quality)
+        except OSError as e:
+            self.failures += 1
+            self.log(f"Video: could not set {self.describe(level)} ({e})")
+            return False
+        self.level = level
+        self._last_change = time.monotonic()
+        self.adjustments.append((time.time(), old, level, reason))
+        direction = "down" if level > old else "up"
+        self.log(f"Video: {reason}, {self.fps:.1f} fps, {self.kbps:.0f} kbit/s - "
+                 f"stepping {direction} to {self.describe()}")
+        self._ages = []  # Frames already in flight were sent with the old setting
+        return True
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        # Start from a known setting rather than whatever the camera booted with
+        framesize, quality = self.setting
+        try:
+            await loop.run_in_executor(None, self._request, "framesize", framesize)
+            await loop.run_in_executor(None, self._request, "quality", quality)
+            self.log(f"Video: adaptive bitrate on, target {self.target_ms:.0f} ms, "
+                     f"starting at {self.describe()}")
+        except OSError as e:
+            self.failures += 1
+            self.log(f"Video: camera control at {self.control} failed ({e})")
+        frames, nbytes = self.capture.frames_received, self.capture.bytes_received
+        window_start = loop.time()
+        self._last_change = time.monotonic()
+        while True:
+            await asyncio.sleep(self.interval)
+            self.sample()
+            elapsed = loop.time() - window_start
+            if elapsed < self.decide_every:
+                continue
+            new_frames = self.capture.frames_received - frames
+            new_bytes = self.capture.bytes_received - nbytes
+            frames, nbytes = self.capture.frames_received, self.capture.bytes_received
+            window_start = loop.time()
+            level, reason = self.decide(time.monotonic(), new_frames, new_bytes, elapsed)
+            if level != self.level:
+                await self.apply(level, reason)
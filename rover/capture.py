@@ -0,0 +1,138 @@
+import threading
+import time
+
+import cv2
+
+
+class FrameSlot:
+    """Single-slot frame buffer that always holds the newest frame.
+
+    The producer overwrites whatever is waiting, so a slow consumer never
+    sees a backlog - it just skips the frames it was too slow for.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frame = None
+        self._timestamp = 0.0
+        self._seq = 0
+        self.dropped = 0
+
+    def put(self, frame, timestamp=None):
+        """Publish a frame, replacing (and counting) any unread one."""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        with self._lock:
+            if self._frame is not None:
+                self.dropped += 1
+            self._frame = frame
+            self._timestamp = timestamp
+            self._seq += 1
+
+    def take(self):
+        """Return (seq, timestamp, frame) for the newest unread frame, or None."""
+        with self._lock:
+            if self._frame is None:
+                return None
+            frame, self._frame = self._frame, None
+            return self._seq, self._timestamp, frame
+
+
+class CaptureThread(threading.Thread):
+    """Reads frames from a cv2.VideoCapture source in its own thread.
+
+    Only the newest frame is kept in ``slot``; the GUI polls it without ever
+    blocking on the camera. Frames are also published to ``bus`` (a
+    rover.framebus.FrameBus) when one is set, for other processes.
+    """
+
+    REOPEN_AFTER_FAILURES = 30
+
+    def __init__(self, source=0, width=640, height=480):
+        super().__init__(name="camera-capture", daemon=True)
+        self.source = source
+        self.width = width
+        self.height = height
+        self.slot = FrameSlot()
+        self.frames_captured = 0
+        self.read_failures = 0
+        self.status = "opening"
+        self.bus = None
+        self._stop_event = threading.Event()
+        self._cap = None
+
+    @property
+    def frames_dropped(self):
+        return self.slot.dropped
+
+    def stats(self):
+        """Snapshot of the capture counters."""
+        return {
+            "status": self.status,
+            "captured": self.frames_captured,
+            "dropped": self.frames_dropped,
+            "read_failures": self.read_failures,
+        }
+
+    def set_display_size(self, width, height):
+        """Local devices always deliver full-size frames; nothing to adjust."""
+
+    def _open(self):
+        if self._cap is not None:
+            self._cap.release()
+        self._cap = cv2.VideoCapture(self.source)
+        if not self._cap.isOpened():
+            return False
+        self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        return True
+
+    def run(self):
+        if not self._open():
+            self.status = "failed"
+            return
+        self.status = "running"
+
+        consecutive_failures = 0
+        while not self._stop_event.is_set():
+            ret, frame = self._cap.read()
+            if not ret:
+                self.read_failures += 1
+                consecutive_failures += 1
+                if consecutive_failures >= self.REOPEN_AFTER_FAILURES:
+                    # Camera stalled or was unplugged; try to bring it back
+                    self.status = "reopening"
+                    consecutive_failures = 0
+                    if self._open():
+                        self.status = "running"
+                self._stop_event.wait(0.05)
+                continue
+
+            consecutive_failures = 0
+            self.frames_captured += 1
+            timestamp = time.monotonic()
+            self.slot.put(frame, timestamp)
+            if self.bus is not None:
+                self.bus.put(frame, timestamp)
+
+        self._cap.release()
+        self.status = "stopped"
+
+    def stop(self, timeout=1.0):
+        """Ask the thread to exit and wait briefly for it."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+
+def create_capture(source, width=640, height=480):
+    """Build the capture thread for a camera source.
+
+    ``source`` is either a local device index/file path (read through
+    cv2.VideoCapture) or an http(s) URL of an MJPEG stream such as the
+    ESP32-CAM's ``http://<ip>:81/stream``.
+    """
+    if isinstance(source, str) and source.startswith(("http://", "https://")):
+        from rover.mjpeg import MjpegCapture
+        return MjpegCapture(source)
+    return CaptureThread(source, width, height)
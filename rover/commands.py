@@ -0,0 +1,146 @@
+import asyncio
+import collections
+import time
+
+
+def command_channel(msg):
+    """Channel a command belongs to; a newer value replaces an older one."""
+    cmd = msg.get("cmd")
+    if cmd == "arm":
+        return f"arm:{msg.get('joint', 1)}"
+    if cmd == "drive":
+        return "move"  # Analog and discrete driving: only the newest counts
+    return cmd
+
+
+def is_stop(msg):
+    cmd = msg.get("cmd")
+    if cmd == "drive":
+        return not msg.get("throttle") and not msg.get("steering")
+    return cmd == "move" and msg.get("dir") == "stop"
+
+
+def is_urgent(msg):
+    """Stop and flag commands bypass coalescing and rate limiting."""
+    return msg.get("cmd") == "flag" or is_stop(msg)
+
+
+class CommandScheduler:
+    """Outbound command queue with per-channel latest-value semantics.
+
+    Only the most recent pending command per channel (move, each arm joint,
+    camera, ...) is kept, and pending commands are sent at no more than
+    ``max_rate`` per second, oldest channel first. Urgent commands (stop,
+    flag) skip the queue and go out immediately; a stop (including a zero
+    ``drive``) also discards any move that was still waiting.
+
+    ``send`` is a coroutine function taking the command dict.
+    """
+
+    def __init__(self, send, max_rate=25.0):
+        self.send = send
+        self.interval = 1.0 / max_rate
+        self.submitted = 0
+        self.coalesced = 0
+        self.sent = 0
+        self.urgent_sent = 0
+        self.send_errors = 0
+        self.last_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self._latency_total = 0.0
+        self._pending = {}  # channel -> (msg, submit time); dict keeps FIFO order
+        self._urgent = collections.deque()
+        self._wake = asyncio.Event()
+        self._last_send = 0.0
+        self._task = None
+
+    @property
+    def queue_depth(self):
+        return len(self._pending) + len(self._urgent)
+
+    @property
+    def avg_latency_ms(self):
+        return self._latency_total / self.sent if self.sent else 0.0
+
+    def stats(self):
+        """Snapshot of the scheduler counters."""
+        return {
+            "submitted": self.submitted,
+            "coalesced": self.coalesced,
+            "sent": self.sent,
+            "urgent": self.urgent_sent,
+            "errors": self.send_errors,
+            "queue_depth": self.queue_depth,
+            "latency_ms": self.last_latency_ms,
+            "avg_latency_ms": self.avg_latency_ms,
+            "max_latency_ms": self.max_latency_ms,
+        }
+
+    def start(self):
+        """Start the sender task on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return self._task
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def clear(self):
+        """Drop everything still waiting (e.g. after the link went down)."""
+        self._pending.clear()
+        self._urgent.clear()
+
+    def submit(self, msg):
+        """Queue a command dict for sending."""
+        self.submitted += 1
+        now = time.monotonic()
+        if is_urgent(msg):
+            if is_stop(msg):
+                # A queued move must never go out after the stop
+                if self._pending.pop("move", None) is not None:
+                    self.coalesced += 1
+            self._urgent.append((msg, now))
+        else:
+            channel = command_channel(msg)
+            if channel in self._pending:
+                self.coalesced += 1
+            self._pending[channel] = (msg, now)
+        self._wake.set()
+
+    async def _send(self, msg, submitted_at):
+        try:
+            await self.send(msg)
+        except Exception:
+            self.send_errors += 1
+            return
+        self._last_send = time.monotonic()
+        latency_ms = (self._last_send - submitted_at) * 1000
+        self.sent += 1
+        self.last_latency_ms = latency_ms
+        self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+        self._latency_total += latency_ms
+
+    async def _run(self):
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            while self._urgent or self._pending:
+                if self._urgent:
+                    await self._send(*self._urgent.popleft())
+                    self.urgent_sent += 1
+                    continue
+
+                delay = self._last_send + self.interval - time.monotonic()
+                if delay > 0:
+                    # Sleep out the rate limit, but wake early for urgent ones
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), delay)
+                        self._wake.clear()
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                channel = next(iter(self._pending))
+                await self._send(*self._pending.pop(channel))
@@ -0,0 +1,201 @@
+import asyncio
+import json
+import random
+import time
+
+import websockets
+
+from rover.protocol import BINARY_PROTOCOL, JsonCodec, negotiate
+
+DEFAULT_URL = "ws://localhost:8765"
+
+
+class RoverConnection:
+    """Keeps a WebSocket session to the rover alive.
+
+    Reconnects with exponential backoff (plus jitter) whenever connecting
+    fails or the session drops, negotiates the wire protocol on every new
+    session, and sends an application-level ping every ``ping_interval``
+    seconds. The rover's pongs give the round-trip time; if nothing at all
+    is received for ``dead_after`` seconds the link is declared dead,
+    ``on_link_lost`` is called (so the caller can stop the rover locally)
+    and a fresh session is started.
+
+    Callbacks (all optional, called on the event loop):
+    ``on_message(message)`` for every non-pong message,
+    ``on_connected()``, ``on_disconnected(reason)`` and ``on_link_lost()``.
+    """
+
+    def __init__(self, url=DEFAULT_URL, on_message=None, on_connected=None,
+                 on_disconnected=None, on_link_lost=None, protocol="auto",
+                 ping_interval=1.0, dead_after=3.0, min_backoff=0.5,
+                 max_backoff=10.0, open_timeout=5.0):
+        self.url = url
+        self.on_message = on_message
+        self.on_connected = on_connected
+        self.on_disconnected = on_disconnected
+        self.on_link_lost = on_link_lost
+        self.offer = (BINARY_PROTOCOL, "json") if protocol == "auto" else ("json",)
+        self.ping_interval = ping_interval
+        self.dead_after = dead_after
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.open_timeout = open_timeout
+
+        self.ws = None
+        self.codec = JsonCodec()
+        self.state = "idle"
+        self.last_error = None
+        self.connects = 0
+        self.failed_attempts = 0
+        self.links_lost = 0
+        self.rtt_ms = None
+        self.avg_rtt_ms = None
+        self.last_rx = None  # time.monotonic() of the last received message
+        self.disconnected_at = None
+        self.last_recovery_s = None  # Time from losing the link to reconnecting
+        self._task = None
+        self._closing = False
+
+    @property
+    def connected(self):
+        return self.ws is not None
+
+    def stats(self):
+        """Snapshot of the connection counters."""
+        return {
+            "state": self.state,
+            "url": self.url,
+            "protocol": self.codec.name,
+            "rtt_ms": self.rtt_ms,
+            "avg_rtt_ms": self.avg_rtt_ms,
+            "connects": self.connects,
+            "failed_attempts": self.failed_attempts,
+            "links_lost": self.links_lost,
+            "last_recovery_s": self.last_recovery_s,
+        }
+
+    def start(self):
+        """Start connecting (and reconnecting) on the running event loop."""
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._task = asyncio.ensure_future(self._run())
+        return self._task
+
+    async def close(self):
+        """Close the session and stop reconnecting."""
+        self._closing = True
+        if self.ws is not None:
+            await self.ws.close()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def send(self, msg):
+        """Encode a command dict with the negotiated codec and send it."""
+        ws = self.ws
+        if ws is None:
+            raise ConnectionError("Not connected to the rover")
+        await ws.send(self.codec.encode_command(msg))
+
+    def _backoff(self, attempt):
+        delay = min(self.max_backoff, self.min_backoff * (2 ** attempt))
+        return delay * random.uniform(0.8, 1.2)
+
+    async def _run(self):
+        attempt = 0
+        while not self._closing:
+            self.state = "connecting" if self.connects == 0 else "reconnecting"
+            try:
+                ws = await websockets.connect(
+                    self.url, ping_interval=None, open_timeout=self.open_timeout,
+                    close_timeout=1.0
+                )
+            except Exception as e:
+                self.last_error = e
+                self.failed_attempts += 1
+                await asyncio.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            attempt = 0
+            reason = "closed"
+            try:
+                self.codec, early_messages = await negotiate(ws, self.offer)
+                self.ws = ws
+                self.state = "connected"
+                self.connects += 1
+                self.last_rx = time.monotonic()
+                if self.disconnected_at is not None:
+                    self.last_recovery_s = self.last_rx - self.disconnected_at
+                if self.on_connected:
+                    self.on_connected()
+                for message in early_messages:
+                    self._dispatch(message)
+                reason = await self._session(ws)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.last_error = e
+                reason = str(e)
+            finally:
+                self.ws = None
+                self.disconnected_at = time.monotonic()
+                await ws.close()
+            if not self._closing:
+                self.state = "reconnecting"
+                if self.on_disconnected:
+                    self.on_disconnected(reason)
+                await asyncio.sleep(self._backoff(0))
+
+    async def _session(self, ws):
+        """Receive and heartbeat until either fails; returns the reason."""
+        tasks = [asyncio.ensure_future(self._receive(ws)),
+                 asyncio.ensure_future(self._heartbeat(ws))]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+        task = done.pop()
+        if task.exception() is not None:
+            self.last_error = task.exception()
+            return str(task.exception()) or type(task.exception()).__name__
+        return task.result()
+
+    async def _receive(self, ws):
+        async for message in ws:
+            self.last_rx = time.monotonic()
+            self._dispatch(message)
+        return "closed by rover"
+
+    def _dispatch(self, message):
+        # Pongs are answered by the rover to our pings; they never reach the app
+        if isinstance(message, str) and message.startswith('{"pong"'):
+            self._handle_pong(message)
+        elif self.on_message:
+            self.on_message(message)
+
+    def _handle_pong(self, message):
+        try:
+            sent_ms = float(json.loads(message)["pong"])
+        except (ValueError, KeyError, TypeError):
+            return
+        rtt = time.monotonic() * 1000 - sent_ms
+        self.rtt_ms = rtt
+        if self.avg_rtt_ms is None:
+            self.avg_rtt_ms = rtt
+        else:
+            self.avg_rtt_ms += 0.2 * (rtt - self.avg_rtt_ms)
+
+    async def _heartbeat(self, ws):
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            if time.monotonic() - self.last_rx > self.dead_after:
+                self.links_lost += 1
+                if self.on_link_lost:
+                    self.on_link_lost()
+                return f"no data for {self.dead_after:.0f}s"
+            # Timestamp in ms of our own clock; the rover echoes it back
+            ping = json.dumps({"cmd": "ping", "t": round(time.monotonic() * 1000, 3)})
+            await ws.send(ping)
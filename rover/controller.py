@@ -0,0 +1,328 @@
+import asyncio
+import json
+import time
+
+from rover.commands import CommandScheduler, is_stop
+from rover.connection import DEFAULT_URL, RoverConnection
+from rover.metrics import Metrics
+from rover.predict import PosePredictor
+from rover.protocol import decode_telemetry, telemetry_ack
+from rover.recorder import FlightRecorder, replay
+from rover.telemetry import TelemetryState
+from rover.timeseries import RingSeries
+
+# Speed presets selectable from the GUI (keys 1/2/3)
+SPEEDS = {"normal": 1, "object": 0.5, "fast": 2}
+
+# Held movement keys -> drive direction, most specific combination first
+_KEY_DIRECTIONS = (
+    ({"forward", "left"}, "forward_left"),
+    ({"forward", "right"}, "forward_right"),
+    ({"backward", "left"}, "backward_left"),
+    ({"backward", "right"}, "backward_right"),
+    ({"forward"}, "forward"),
+    ({"backward"}, "backward"),
+    ({"left"}, "left"),
+    ({"right"}, "right"),
+)
+
+
+def direction_for_keys(pressed):
+    """Drive direction for a set of held keys ("forward", "left", ...)."""
+    for keys, direction in _KEY_DIRECTIONS:
+        if keys <= pressed:
+            return direction
+    return "stop"
+
+
+class RoverController:
+    """Drives one rover: connection, command queue and telemetry, no Qt.
+
+    The GUI is a view over this class, and scripts or a headless ground
+    station can use it directly on any asyncio loop::
+
+        controller = RoverController("ws://192.168.4.1:81")
+        controller.start()
+        await controller.wait_connected()
+        controller.move("forward")
+
+    Every command is stamped with a sequence number and the client clock
+    (``seq``, ``t`` in ms); the rover echoes the last applied ``seq`` in its
+    telemetry, which ``predictor`` uses to tell confirmed commands from
+    ones still in flight. On connect the controller asks the rover to stop
+    by itself when no move arrives for ``deadman`` seconds, and keeps an
+    ongoing move alive by re-sending it well within that time.
+
+    ``metrics`` covers the link: RTT, telemetry and command rates, command
+    queue depth, and the time spent handling telemetry and sending commands.
+
+    Callbacks (all optional, set as attributes, called on the event loop):
+    ``on_log(text)`` for human-readable events, ``on_connected()``,
+    ``on_link_lost()`` and ``on_message(message)`` with every raw rover
+    message (as received, e.g. for the relay hub).
+    """
+
+    def __init__(self, url=DEFAULT_URL, protocol="auto", record_path=None,
+                 max_rate=25.0, deadman=0.5, metrics=None, **connection_options):
+        self.connection = RoverConnection(
+            url,
+            on_message=self.handle_message,
+            on_connected=self._connected,
+            on_disconnected=self._disconnected,
+            on_link_lost=self._link_lost,
+            protocol=protocol,
+            **connection_options,
+        )
+        # Outbound commands are coalesced per channel and rate limited
+        self.commands = CommandScheduler(self._send, max_rate)
+        self.telemetry = TelemetryState()
+        # Send time of every command for the activity plot (value: 1 for stops)
+        self.command_history = RingSeries(TelemetryState.HISTORY, 1)
+        self.recorder = FlightRecorder(record_path) if record_path else None
+        self.speed_factor = SPEEDS["normal"]
+        self.last_telemetry = {}
+        self.deadman = deadman
+        self.predictor = PosePredictor(deadman=deadman)
+        self.command_seq = 0
+        self._drive = None  # (cmd, data) being kept alive, or None when stopped
+        self._last_move = 0.0
+        self._keepalive_task = None
+        self.on_log = None
+        self.on_connected = None
+        self.on_link_lost = None
+        self.on_message = None
+        self._connected_event = None
+        self.metrics = metrics if metrics is not None else Metrics()
+        self._register_metrics()
+
+    def _register_metrics(self):
+        metrics = self.metrics
+        metrics.rate("telemetry_per_s", lambda: self.telemetry.messages)
+        metrics.rate("commands_per_s", lambda: self.commands.sent)
+        metrics.gauge("command_queue_depth", lambda: self.commands.queue_depth)
+        metrics.gauge("rtt_ms", lambda: self.connection.rtt_ms)
+
+    @property
+    def connected(self):
+        return self.connection.connected
+
+    def log(self, text):
+        if self.on_log is not None:
+            self.on_log(text)
+
+    def stats(self):
+        """Connection and command counters in one dict."""
+        return {
+            "link": self.connection.stats(),
+            "commands": self.commands.stats(),
+            "telemetry_messages": self.telemetry.messages,
+        }
+
+    def start(self, connect=True):
+        """Start recording, the command sender and (unless replaying) the link."""
+        if self.recorder is not None and not self.recorder.is_alive():
+            self.recorder.start()
+            self.log(f"Recording flight to {self.recorder.path}")
+        if connect:
+            self.commands.start()
+            self.connection.start()
+            if self.deadman and self._keepalive_task is None:
+                self._keepalive_task = asyncio.ensure_future(self._keepalive())
+
+    async def wait_connected(self, timeout=None):
+        """Wait until a session is up; returns False on timeout."""
+        if self.connected:
+            return True
+        if self._connected_event is None:
+            self._connected_event = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._connected_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def close(self):
+        """Stop sending and flush the flight recording right away.
+
+        Closing the WebSocket needs the event loop; the returned task can be
+        awaited by callers that want to wait for it.
+        """
+        self.commands.stop()
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        if self.recorder is not None:
+            self.recorder.stop()
+        return asyncio.ensure_future(self.connection.close())
+
+    async def replay(self, path, speed=1.0):
+        """Play a flight recording back through the normal telemetry path"""
+        self.log(f"Replaying {path} at {speed:g}x")
+        try:
+            count = await replay(path, self.handle_message, speed)
+        except (OSError, ValueError) as e:
+            self.log(f"Replay failed: {e}")
+            return None
+        self.log(f"Replay finished ({count} records)")
+        return count
+
+    def _connected(self):
+        stats = self.connection.stats()
+        message = f"Connected to Rover! ({self.connection.url}, protocol: {stats['protocol']})"
+        if stats["last_recovery_s"] is not None:
+            message += f" - link recovered in {stats['last_recovery_s']:.1f}s"
+        self.log(message)
+        self.predictor.reset()
+        if self.deadman:
+            # Older firmware ignores this; the rover then only stops on disconnect
+            self.send_cmd("deadman", {"ms": int(self.deadman * 1000)})
+        if self._connected_event is not None:
+            self._connected_event.set()
+            self._connected_event = None
+        if self.on_connected is not None:
+            self.on_connected()
+
+    def _disconnected(self, reason):
+        # The rover stops when the session drops; resuming the move on the
+        # next session without new operator input would defeat that
+        self._stop_driving()
+        self.log(f"Connection error: {reason} - reconnecting...")
+
+    def _stop_driving(self):
+        self.commands.clear()
+        self.predictor.reset()
+        self._drive = None
+
+    def _link_lost(self):
+        """Nothing heard from the rover in time: stop driving locally"""
+        self._stop_driving()
+        self.log("Link to rover lost - movement stopped")
+        if self.on_link_lost is not None:
+            self.on_link_lost()
+
+    def send_cmd(self, cmd_type, data=None):
+        """Queue a command; returns False when there is no link to send on."""
+        if not self.connection.connected:
+            return False
+        msg = {"cmd": cmd_type}
+        if data:
+            msg.update(data)
+        # Apply speed factor to movement commands
+        if cmd_type == "move" and "speed" not in msg:
+            msg["speed"] = self.speed_factor
+        if cmd_type in ("move", "drive"):
+            self._drive = None if is_stop(msg) else (cmd_type, dict(data))
+            self._last_move = time.monotonic()
+        self.command_seq += 1
+        msg["seq"] = self.command_seq
+        msg["t"] = round(time.monotonic() * 1000, 3)  # Same clock as the pings
+        # Queued per channel: a newer slider/move value replaces an unsent
+        # older one, while stop and flag are sent ahead of everything
+        self.commands.submit(msg)
+        return True
+
+    def forward(self, msg):
+        """Queue a command dict from another client (e.g. through the relay hub).
+
+        Goes through send_cmd like our own commands, so a forwarded move is
+        kept alive and stopped like one; the client's ``seq``/``t`` are
+        replaced with ours, so the rover's acks match our predictor.
+        Returns the new sequence number, or None when not connected or
+        ``msg`` has no ``cmd``.
+        """
+        cmd = msg.get("cmd")
+        if not isinstance(cmd, str):
+            return None
+        data = {key: value for key, value in msg.items() if key not in ("cmd", "seq", "t")}
+        if not self.send_cmd(cmd, data):
+            return None
+        return self.command_seq
+
+    def move(self, direction, speed=None):
+        data = {"dir": direction}
+        if speed is not None:
+            data["speed"] = speed
+        return self.send_cmd("move", data)
+
+    def stop(self):
+        return self.send_cmd("move", {"dir": "stop"})
+
+    def drive(self, throttle, steering):
+        """Analog drive: throttle and steering in -1..1 (positive = forward, right).
+
+        Not scaled by the speed preset; the rover mixes the two into wheel
+        speeds itself. Zero for both stops.
+        """
+        return self.send_cmd("drive", {"throttle": throttle, "steering": steering})
+
+    def drive_keys(self, pressed):
+        """Send the move for a set of held keys; does nothing if none are held."""
+        if pressed:
+            self.move(direction_for_keys(pressed))
+
+    def set_arm(self, angle, joint=1):
+        return self.send_cmd("arm", {"joint": joint, "angle": angle})
+
+    def set_camera(self, angle):
+        return self.send_cmd("camera", {"angle": angle})
+
+    def drop_flag(self):
+        return self.send_cmd("flag", {"action": "drop"})
+
+    def set_speed(self, name):
+        """Select a speed preset from SPEEDS."""
+        self.speed_factor = SPEEDS[name]
+
+    async def _keepalive(self):
+        """Re-send an ongoing move so the rover's deadman does not stop it"""
+        interval = self.deadman / 3
+        while True:
+            await asyncio.sleep(interval / 2)
+            if self._drive is not None and time.monotonic() - self._last_move >= interval:
+                self.send_cmd(*self._drive)
+
+    async def _send(self, msg):
+        """Serialize and send one command (called by the command scheduler)"""
+        with self.metrics.time("command_send_ms"):
+            await self.connection.send(msg)
+        self.predictor.set_rtt(self.connection.avg_rtt_ms)
+        now = time.monotonic()
+        self.predictor.command_sent(msg, now)
+        self.command_history.append(now, is_stop(msg))
+        if self.recorder is not None:
+            self.recorder.record_command(msg)
+
+    def handle_message(self, message):
+        """Store one telemetry message; views pull it from ``telemetry``"""
+        if not self.metrics.enabled:
+            # Hottest path: skip even the no-op timer when nobody is looking
+            self._handle_message(message)
+            return
+        with self.metrics.time("telemetry_handle_ms"):
+            self._handle_message(message)
+
+    def _handle_message(self, message):
+        if self.recorder is not None:
+            self.recorder.record_telemetry(message)
+        if self.on_message is not None:
+            self.on_message(message)
+        try:
+            if isinstance(message, bytes):
+                # Binary frames decode straight into a tuple, no dict involved
+                _, battery, pitch, roll, arm = decode_telemetry(message)
+                self.telemetry.update_fields(battery, pitch, roll, arm)
+                ack = telemetry_ack(message)
+            else:
+                telemetry = json.loads(message)
+                if not isinstance(telemetry, dict):
+                    raise ValueError(f"expected an object, got {type(telemetry).__name__}")
+                # Command acks and late protocol replies are not telemetry
+                # samples; only their ack (if any) matters
+                if TelemetryState.is_telemetry(telemetry):
+                    self.last_telemetry = telemetry
+                    self.telemetry.update(telemetry)
+                ack = telemetry.get("ack")
+            if ack is not None:
+                self.predictor.command_acked(ack, time.monotonic())
+        except ValueError as e:
+            self.log(f"Bad telemetry message: {e}")
@@ -0,0 +1,466 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from rover.capture import FrameSlot
+from rover.tracking import IoUTracker
+
+
+class Detection:
+    """A single detected object in frame pixel coordinates."""
+
+    __slots__ = ("x1", "y1", "x2", "y2", "conf", "name", "track_id")
+
+    def __init__(self, x1, y1, x2, y2, conf, name, track_id=None):
+        self.x1 = x1
+        self.y1 = y1
+        self.x2 = x2
+        self.y2 = y2
+        self.conf = conf
+        self.name = name
+        self.track_id = track_id
+
+
+def parse_results(results, offset=(0, 0)):
+    """Convert ultralytics results into a flat list of Detection objects.
+
+    ``offset`` is added to every box, for results of a cropped frame.
+    """
+    dx, dy = offset
+    detections = []
+    for result in results:
+        for box in result.boxes:
+            x1, y1, x2, y2 = map(int, box.xyxy[0])
+            cls = int(box.cls[0])
+            detections.append(Detection(
+                x1 + dx, y1 + dy, x2 + dx, y2 + dy, float(box.conf[0]), result.names[cls]
+            ))
+    return detections
+
+
+def draw_detections(frame, detections, scale_x=1.0, scale_y=1.0):
+    """Draw boxes and labels onto a BGR frame in place.
+
+    ``scale_x``/``scale_y`` map detection coordinates onto a frame that has
+    been resized for display.
+    """
+    for det in detections:
+        x1, y1 = int(det.x1 * scale_x), int(det.y1 * scale_y)
+        x2, y2 = int(det.x2 * scale_x), int(det.y2 * scale_y)
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        label = f'{det.name} {det.conf:.2f}'
+        if det.track_id is not None:
+            label = f'#{det.track_id} {label}'
+        cv2.putText(frame, label, (x1, y1 - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+
+
+def load_yolo(weights='yolov8n.pt', warmup_shape=(480, 640, 3), threads=None):
+    """Build the YOLO model and run one warm-up inference.
+
+    ultralytics (and with it torch) is imported here rather than at module
+    level so that launching the GUI does not pay for it. ``threads`` caps
+    torch's CPU threads.
+    """
+    from ultralytics import YOLO
+
+    if threads:
+        import torch
+        torch.set_num_threads(threads)
+    model = YOLO(weights, verbose=False)
+    if warmup_shape is not None:
+        model(np.zeros(warmup_shape, dtype=np.uint8), verbose=False)
+    return model
+
+
+class DetectionConfig:
+    """Tunables of the detection pipeline.
+
+    ``imgsz`` is the model input size for a full frame and ``roi_imgsz``
+    for a region-of-interest crop; ``classes`` is an allow-list of class
+    names (None = all); ``conf``/``iou`` are the confidence and NMS
+    thresholds. With ``roi`` on, once something is being tracked only the
+    area around the tracks (grown by ``roi_margin`` of their size, at least
+    ``roi_min_size`` pixels) is run through the model, with a full frame
+    every ``full_every`` runs to pick up new objects. ``track`` carries
+    boxes between runs with an IoUTracker.
+    """
+
+    def __init__(self, imgsz=640, roi_imgsz=320, classes=None, conf=0.25, iou=0.45,
+                 roi=True, roi_margin=0.5, roi_min_size=160, full_every=10,
+                 track=True, track_iou=0.3, max_missed=3):
+        self.imgsz = imgsz
+        self.roi_imgsz = roi_imgsz
+        self.classes = set(classes) if classes else None
+        self.conf = conf
+        self.iou = iou
+        self.roi = roi and track  # The ROI comes from the tracks
+        self.roi_margin = roi_margin
+        self.roi_min_size = roi_min_size
+        self.full_every = full_every
+        self.track = track
+        self.track_iou = track_iou
+        self.max_missed = max_missed
+
+
+class DetectionPipeline:
+    """Per-feed work around the model call: ROI cropping, filtering, tracking.
+
+    Not thread-safe; the worker serializes access with its result lock.
+    """
+
+    # Above this share of the frame a crop saves too little to be worth it
+    MAX_ROI_FRACTION = 0.5
+
+    def __init__(self, config):
+        self.config = config
+        self.tracker = IoUTracker(config.track_iou, config.max_missed) if config.track else None
+        self.runs = 0
+        self.roi_runs = 0
+        self.last_roi = None
+        self._detections = []
+
+    def reset(self):
+        if self.tracker is not None:
+            self.tracker.reset()
+        self._detections = []
+        self.last_roi = None
+
+    def model_options(self, model, full=True):
+        """Keyword arguments for the ultralytics call."""
+        options = {
+            "imgsz": self.config.imgsz if full else self.config.roi_imgsz,
+            "conf": self.config.conf,
+            "iou": self.config.iou,
+        }
+        names = getattr(model, "names", None)
+        if self.config.classes is not None and isinstance(names, dict) and names:
+            options["classes"] = [i for i, name in names.items() if name in self.config.classes]
+        return options
+
+    def prepare(self, frame, timestamp):
+        """Pick the model input: (image, (x, y) offset of the crop, full)."""
+        self.runs += 1
+        self.last_roi = None
+        config = self.config
+        if not config.roi or self.runs % config.full_every == 0:
+            return frame, (0, 0), True
+        boxes = [box for _, box in self.tracker.tracks_at(timestamp)]
+        if not boxes:
+            return frame, (0, 0), True
+        height, width = frame.shape[:2]
+        x1 = min(b[0] for b in boxes)
+        y1 = min(b[1] for b in boxes)
+        x2 = max(b[2] for b in boxes)
+        y2 = max(b[3] for b in boxes)
+        grow_x = max((x2 - x1) * config.roi_margin, (config.roi_min_size - (x2 - x1)) / 2)
+        grow_y = max((y2 - y1) * config.roi_margin, (config.roi_min_size - (y2 - y1)) / 2)
+        x1, x2 = max(0, int(x1 - grow_x)), min(width, int(x2 + grow_x))
+        y1, y2 = max(0, int(y1 - grow_y)), min(height, int(y2 + grow_y))
+        if x2 <= x1 or y2 <= y1 or (x2 - x1) * (y2 - y1) > self.MAX_ROI_FRACTION * width * height:
+            return frame, (0, 0), True
+        self.roi_runs += 1
+        self.last_roi = (x1, y1, x2, y2)
+        return frame[y1:y2, x1:x2], (x1, y1), False
+
+    def finish(self, detections, timestamp):
+        """Filter one run's detections and fold them into the tracks."""
+        if self.config.classes is not None:
+            detections = [d for d in detections if d.name in self.config.classes]
+        if self.tracker is None:
+            self._detections = detections
+            return
+        self.tracker.update((((d.x1, d.y1, d.x2, d.y2), d.conf, d.name) for d in detections),
+                            timestamp)
+        self._detections = self.detections_at(None)
+
+    def detections(self):
+        """Detections of the last run (tracked, if tracking is on)."""
+        return self._detections
+
+    def detections_at(self, timestamp):
+        """Tracked boxes moved to ``timestamp``; last results without a tracker."""
+        if self.tracker is None:
+            return self._detections
+        return [Detection(*(int(round(c)) for c in box), track.conf, track.name,
+                          track.track_id)
+                for track, box in self.tracker.tracks_at(timestamp)]
+
+
+class DetectionWorker(threading.Thread):
+    """Loads the detector and runs it on a background thread.
+
+    The model is built by calling ``model_loader`` from inside the thread,
+    so the (slow) import and weight loading never block the GUI; ``status``
+    goes from "loading" to "ready" (or "failed"). Frames are submitted
+    into a single-slot buffer, so while an inference is running newer
+    frames simply replace older ones and the backlog never grows. The
+    most recent detections stay available through ``latest()`` so the
+    display can keep drawing them on the frames in between;
+    ``detections_at`` moves tracked boxes along to each frame's timestamp.
+    Input size, thresholds, class filter, ROI cropping and tracking are
+    set by ``config`` (a DetectionConfig).
+    """
+
+    def __init__(self, model_loader=load_yolo, config=None):
+        super().__init__(name="detection-worker", daemon=True)
+        self.model_loader = model_loader
+        self.config = config if config is not None else DetectionConfig()
+        self.pipeline = DetectionPipeline(self.config)
+        self.model = None
+        self.status = "loading"
+        self.load_time = None
+        self.slot = FrameSlot()
+        self.frames_processed = 0
+        self.last_inference_ms = 0.0
+        self.last_error = None
+        self._frame_ready = threading.Event()
+        self._stop_event = threading.Event()
+        self._result_lock = threading.Lock()
+        self._result_seq = 0
+        self._generation = 0
+
+    @property
+    def frames_skipped(self):
+        return self.slot.dropped
+
+    @property
+    def roi_runs(self):
+        return self.pipeline.roi_runs
+
+    def submit(self, frame, timestamp=None):
+        """Offer a frame for inference; replaces any frame still waiting."""
+        self.slot.put(frame, timestamp)
+        self._frame_ready.set()
+
+    def latest(self):
+        """Return (result_seq, detections) for the freshest finished inference."""
+        with self._result_lock:
+            return self._result_seq, self.pipeline.detections()
+
+    def detections_at(self, timestamp):
+        """Detections to draw on a frame captured at ``timestamp`` (monotonic)."""
+        with self._result_lock:
+            return self.pipeline.detections_at(timestamp)
+
+    def clear(self):
+        """Forget pending frames and previous detections."""
+        self.slot.take()
+        with self._result_lock:
+            self.pipeline.reset()
+            self._result_seq += 1
+            self._generation += 1
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            self.model = self.model_loader()
+        except Exception as e:
+            self.last_error = e
+            self.status = "failed"
+            return False
+        self.load_time = time.perf_counter() - start
+        self.status = "ready"
+        return True
+
+    def run(self):
+        if not self._load():
+            return
+        while not self._stop_event.is_set():
+            self._frame_ready.wait(0.1)
+            self._frame_ready.clear()
+            latest = self.slot.take()
+            if latest is None:
+                continue
+            _, timestamp, frame = latest
+            with self._result_lock:
+                generation = self._generation
+                image, offset, full = self.pipeline.prepare(frame, timestamp)
+
+            start = time.perf_counter()
+            try:
+                results = self.model(image, verbose=False,
+                                     **self.pipeline.model_options(self.model, full))
+                detections = parse_results(results, offset)
+            except Exception as e:
+                self.last_error = e
+                continue
+            self.last_inference_ms = (time.perf_counter() - start) * 1000
+            self.frames_processed += 1
+
+            with self._result_lock:
+                if generation != self._generation:
+                    continue  # Cleared while this frame was in flight
+                self.pipeline.finish(detections, timestamp)
+                self._result_seq += 1
+
+    def stop(self, timeout=1.0):
+        """Ask the worker to exit and wait briefly for it."""
+        self._stop_event.set()
+        self._frame_ready.set()
+        if self.is_alive():
+            self.join(timeout)
+
+
+class DetectionFeed:
+    """One camera feed's view of a shared BatchDetectionWorker.
+
+    Has the same interface as DetectionWorker, so code written for a
+    private detector can use a shared one unchanged. ``stop()`` only
+    clears this feed; the shared worker is stopped by its owner.
+    """
+
+    def __init__(self, worker, key):
+        self.worker = worker
+        self.key = key
+
+    @property
+    def status(self):
+        return self.worker.status
+
+    @property
+    def load_time(self):
+        return self.worker.load_time
+
+    @property
+    def last_error(self):
+        return self.worker.last_error
+
+    def start(self):
+        """Start the shared worker unless it is already running.
+
+        A worker that failed to load stays failed (see ``last_error``);
+        the owner hands out feeds on a fresh one to retry.
+        """
+        if not self.worker.is_alive() and self.worker.status == "loading":
+            self.worker.start()
+
+    def submit(self, frame, timestamp=None):
+        self.worker.submit(self.key, frame, timestamp)
+
+    def latest(self):
+        return self.worker.latest(self.key)
+
+    def detections_at(self, timestamp):
+        return self.worker.detections_at(self.key, timestamp)
+
+    def clear(self):
+        self.worker.clear(self.key)
+
+    def stop(self, timeout=1.0):
+        self.clear()
+
+
+class BatchDetectionWorker(DetectionWorker):
+    """One detector shared by several camera feeds.
+
+    Every feed (identified by a key, e.g. the rover name) gets its own
+    latest-frame slot and its own pipeline (ROI and tracks). Each pass of
+    the worker takes the newest frame of every feed that has one and runs
+    them through the model as a single batch, so N cameras cost one model
+    in memory and roughly one inference call per pass instead of N. Use
+    ``feed(key)`` to get a per-feed handle.
+    """
+
+    def __init__(self, model_loader=load_yolo, max_batch=8, config=None):
+        super().__init__(model_loader, config)
+        self.name = "batch-detection-worker"
+        self.max_batch = max_batch
+        self.batches = 0
+        self.last_batch_size = 0
+        self._slots = {}
+        self._pipelines = {}
+        self._result_seqs = {}
+        self._generations = {}
+        self._rotation = 0
+
+    @property
+    def frames_skipped(self):
+        return sum(slot.dropped for slot in list(self._slots.values()))
+
+    @property
+    def roi_runs(self):
+        return sum(pipeline.roi_runs for pipeline in list(self._pipelines.values()))
+
+    def feed(self, key):
+        """Handle with the DetectionWorker interface for one feed."""
+        with self._result_lock:
+            if key not in self._slots:
+                self._slots[key] = FrameSlot()
+                self._pipelines[key] = DetectionPipeline(self.config)
+                self._result_seqs[key] = 0
+                self._generations[key] = 0
+        return DetectionFeed(self, key)
+
+    def submit(self, key, frame, timestamp=None):
+        """Offer a feed's frame; replaces that feed's frame still waiting."""
+        self._slots[key].put(frame, timestamp)
+        self._frame_ready.set()
+
+    def latest(self, key):
+        """Return (result_seq, detections) for a feed's freshest inference."""
+        with self._result_lock:
+            return self._result_seqs[key], self._pipelines[key].detections()
+
+    def detections_at(self, key, timestamp):
+        """A feed's detections for a frame captured at ``timestamp``."""
+        with self._result_lock:
+            return self._pipelines[key].detections_at(timestamp)
+
+    def clear(self, key=None):
+        """Forget pending frames and detections of one feed (or all)."""
+        keys = list(self._slots) if key is None else [key]
+        with self._result_lock:
+            for k in keys:
+                self._slots[k].take()
+                self._pipelines[k].reset()
+                self._result_seqs[k] += 1
+                self._generations[k] += 1
+
+    def run(self):
+        if not self._load():
+            return
+        while not self._stop_event.is_set():
+            self._frame_ready.wait(0.1)
+            self._frame_ready.clear()
+            batch = []  # (key, generation, timestamp, offset, full, image)
+            with self._result_lock:
+                # Start where the last full batch stopped so no feed starves
+                items = list(self._slots.items())
+                first = self._rotation % len(items) if items else 0
+                for key, slot in items[first:] + items[:first]:
+                    latest = slot.take()
+                    if latest is None:
+                        continue
+                    _, timestamp, frame = latest
+                    image, offset, full = self._pipelines[key].prepare(frame, timestamp)
+                    batch.append((key, self._generations[key], timestamp, offset, full, image))
+                    if len(batch) == self.max_batch:
+                        self._frame_ready.set()  # Others wait for the next pass
+                        break
+                self._rotation = first + len(batch)
+            if not batch:
+                continue
+
+            # One call takes one input size: full frames need the larger one
+            full = any(item[4] for item in batch)
+            start = time.perf_counter()
+            try:
+                results = self.model([item[5] for item in batch], verbose=False,
+                                     **self.pipeline.model_options(self.model, full))
+            except Exception as e:
+                self.last_error = e
+                continue
+            self.last_inference_ms = (time.perf_counter() - start) * 1000
+            self.frames_processed += len(batch)
+            self.batches += 1
+            self.last_batch_size = len(batch)
+
+            with self._result_lock:
+                for (key, generation, timestamp, offset, _, _), result in zip(batch, results):
+                    if generation != self._generations[key]:
+                        continue  # Cleared while this frame was in flight
+                    self._pipelines[key].finish(parse_results([result], offset), timestamp)
+                    self._result_seqs[key] += 1
@@ -0,0 +1,95 @@
+import asyncio
+
+from rover.controller import RoverController
+from rover.detection import BatchDetectionWorker, load_yolo
+
+
+def parse_rover_spec(spec, index=0):
+    """Parse ``[NAME=]URL[,CAMERA]`` into (name, url, camera_source).
+
+    Without a name the rover is called ``rover<index + 1>``; a numeric
+    camera is a device index.
+    """
+    name, sep, rest = spec.partition("=")
+    if not sep or "://" in name:
+        name, rest = f"rover{index + 1}", spec
+    url, _, camera = rest.partition(",")
+    if not camera:
+        camera = None
+    elif camera.isdigit():
+        camera = int(camera)
+    return name, url, camera
+
+
+class RoverSession:
+    """One rover of a fleet: its controller and where its camera is."""
+
+    def __init__(self, name, controller, camera_source=None):
+        self.name = name
+        self.controller = controller
+        self.camera_source = camera_source
+
+
+class Fleet:
+    """Several rovers driven from one event loop.
+
+    Each rover gets its own RoverController (and so its own connection,
+    command queue and telemetry store); all of them share a single
+    BatchDetectionWorker, which is only created - and the model only
+    loaded - when the first feed asks for detection.
+    """
+
+    def __init__(self, detector_loader=load_yolo, max_batch=8, detection_config=None):
+        self.sessions = {}
+        self.detector_loader = detector_loader
+        self.max_batch = max_batch
+        self.detection_config = detection_config
+        self._detector = None
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def __iter__(self):
+        return iter(self.sessions.values())
+
+    def add(self, name, url, camera_source=None, **controller_options):
+        """Create and register a rover session; names must be unique."""
+        if name in self.sessions:
+            raise ValueError(f"Duplicate rover name {name!r}")
+        session = RoverSession(name, RoverController(url, **controller_options), camera_source)
+        self.sessions[name] = session
+        return session
+
+    @property
+    def detector(self):
+        """The shared detection worker (created on first access).
+
+        One that failed to load is replaced, so detection can be retried
+        without restarting.
+        """
+        if self._detector is None or self._detector.status == "failed":
+            self._detector = BatchDetectionWorker(self.detector_loader, self.max_batch,
+                                                  self.detection_config)
+        return self._detector
+
+    def detection_feed(self, name):
+        """DetectionWorker-compatible handle on the shared detector for one rover."""
+        return self.detector.feed(name)
+
+    def start(self):
+        for session in self:
+            session.controller.start()
+
+    def stop_all(self):
+        """Send stop to every connected rover."""
+        for session in self:
+            session.controller.stop()
+
+    def stats(self):
+        return {session.name: session.controller.stats() for session in self}
+
+    def close(self):
+        """Close every session and the shared detector; returns an awaitable."""
+        if self._detector is not None:
+            self._detector.stop()
+        return asyncio.gather(*(session.controller.close() for session in self))
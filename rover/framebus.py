@@ -0,0 +1,216 @@
+"""Camera frames shared between processes without copies or pickling.
+
+A ``FrameBus`` is one ``multiprocessing.shared_memory`` block holding a
+ring of preallocated frame slots. The capture thread writes each frame
+into the next slot once; any number of readers - in this process or in
+others that attach by name - get it as a read-only numpy view of that
+slot, so a CPU-heavy consumer can run in its own process (on its own
+core, outside this process's GIL) without slowing the UI::
+
+    bus = FrameBus.attach("rover-camera")
+    seq = 0
+    while True:
+        latest = bus.wait(seq, timeout=1.0)
+        if latest is None:
+            continue
+        seq, timestamp, frame = latest
+        analyse(frame)
+        if not bus.valid(seq):
+            ...  # The writer lapped us while we worked; the result is suspect
+
+Every frame has a sequence number (1, 2, ...) and is kept until the
+writer comes round to its slot again, ``slots - 1`` frames later. The
+slot's sequence number is cleared while it is being written, so a
+reader never returns a half-written frame, and ``valid(seq)`` tells
+whether a view is still intact after using it; ``take(copy=True)`` is
+for readers that keep frames longer. There must be a single writer.
+
+Timestamps are ``time.monotonic()``, which is system-wide on Linux, so
+other processes can compute a frame's age with their own clock.
+"""
+import sys
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+MAGIC = 0x53554246  # "FBUS"
+VERSION = 1
+HEADER_DTYPE = np.dtype([("magic", "<u4"), ("version", "<u4"), ("slots", "<i4"),
+                         ("pad", "<i4"), ("slot_bytes", "<i8"), ("seq", "<i8")])
+SLOT_DTYPE = np.dtype([("seq", "<i8"), ("timestamp", "<f8"), ("height", "<i4"),
+                       ("width", "<i4"), ("channels", "<i4"), ("pad", "<i4")])
+ALIGN = 64
+
+
+def _aligned(size):
+    return -(-size // ALIGN) * ALIGN
+
+
+class FrameBus:
+    """A ring of uint8 frame slots in shared memory; see the module docstring.
+
+    Use ``create`` in the process that owns the camera and ``attach`` in
+    the readers. Frames may vary in size (e.g. reduced-size MJPEG
+    decodes) up to ``max_shape``; larger ones are rejected, counted in
+    ``rejected`` and the first one's shape kept in ``rejected_shape``.
+    """
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.name = shm.name
+        # frombuffer (unlike ndarray(buffer=...)) holds a buffer export, so the
+        # mapping cannot be unmapped from under a live view: close() then
+        # fails with BufferError instead of later reads crashing
+        self.header = np.frombuffer(shm.buf, HEADER_DTYPE, 1).reshape(())
+        if self.header["magic"] != MAGIC or self.header["version"] != VERSION:
+            self.header = None
+            shm.close()
+            raise ValueError(f"Shared memory {shm.name!r} is not a frame bus")
+        self.slots = int(self.header["slots"])
+        self.slot_bytes = int(self.header["slot_bytes"])
+        meta_offset = _aligned(HEADER_DTYPE.itemsize)
+        self.meta = np.frombuffer(shm.buf, SLOT_DTYPE, self.slots, meta_offset)
+        data_offset = _aligned(meta_offset + SLOT_DTYPE.itemsize * self.slots)
+        self.data = np.frombuffer(shm.buf, np.uint8, self.slots * self.slot_bytes,
+                                  data_offset).reshape(self.slots, self.slot_bytes)
+        self.published = 0
+        self.rejected = 0
+        self.rejected_shape = None
+        self.closed = False
+        self._unlinked = False
+
+    @classmethod
+    def create(cls, name=None, slots=8, max_shape=(600, 800, 3)):
+        """Allocate a new bus (``name=None`` picks a unique one)."""
+        slot_bytes = _aligned(int(np.prod(max_shape)))
+        size = (_aligned(HEADER_DTYPE.itemsize) + _aligned(SLOT_DTYPE.itemsize * slots)
+                + slots * slot_bytes)
+        shm = shared_memory.SharedMemory(name, create=True, size=size)
+        header = np.frombuffer(shm.buf, HEADER_DTYPE, 1)
+        header[0] = (MAGIC, VERSION, slots, 0, slot_bytes, 0)
+        del header  # No views may outlive close()
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """Open a bus created by another process."""
+        if sys.version_info >= (3, 13):
+            return cls(shared_memory.SharedMemory(name, track=False), owner=False)
+        # Older versions register every attached block with the resource
+        # tracker, which would unlink it from under the owner when this
+        # process exits; take it back out (close() puts it back in the
+        # owner's tracker, in case that is the same one)
+        shm = shared_memory.SharedMemory(name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return cls(shm, owner=False)
+
+    @property
+    def seq(self):
+        """Sequence number of the newest frame (0 before the first)."""
+        return int(self.header["seq"])
+
+    def stats(self):
+        return {"name": self.name, "slots": self.slots, "seq": self.seq,
+                "published": self.published, "rejected": self.rejected,
+                "max_bytes": self.slot_bytes}
+
+    def put(self, frame, timestamp=None):
+        """Copy ``frame`` into the next slot; returns False if it does not fit.
+
+        Does nothing once the bus is closed.
+        """
+        if self.closed:
+            return False
+        if frame.dtype != np.uint8 or frame.nbytes > self.slot_bytes or frame.ndim not in (2, 3):
+            self.rejected += 1
+            if self.rejected_shape is None:
+                self.rejected_shape = frame.shape
+            return False
+        if timestamp is None:
+            timestamp = time.monotonic()
+        seq = self.seq + 1
+        meta = self.meta[seq % self.slots]
+        meta["seq"] = 0  # Readers skip the slot until it is complete
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 0
+        np.copyto(self.data[seq % self.slots, :frame.nbytes].reshape(frame.shape), frame)
+        meta["timestamp"] = timestamp
+        meta["height"], meta["width"], meta["channels"] = height, width, channels
+        meta["seq"] = seq
+        self.header["seq"] = seq
+        self.published += 1
+        return True
+
+    def take(self, after=0, copy=False):
+        """Return (seq, timestamp, frame) for the newest frame after ``after``, or None.
+
+        ``frame`` is a read-only view into the slot unless ``copy`` is set.
+        """
+        seq = self.seq
+        if seq <= after:
+            return None
+        meta = self.meta[seq % self.slots]
+        timestamp = float(meta["timestamp"])
+        height, width, channels = int(meta["height"]), int(meta["width"]), int(meta["channels"])
+        if int(meta["seq"]) != seq:
+            return None  # Overwritten between the two reads; the next call gets it
+        shape = (height, width, channels) if channels else (height, width)
+        frame = self.data[seq % self.slots, :int(np.prod(shape))].reshape(shape)
+        if copy:
+            frame = frame.copy()
+            if not self.valid(seq):
+                return None
+        else:
+            frame.flags.writeable = False
+        return seq, timestamp, frame
+
+    def valid(self, seq):
+        """Whether frame ``seq`` is still intact in its slot."""
+        return int(self.meta[seq % self.slots]["seq"]) == seq
+
+    def wait(self, after=0, timeout=None, poll=0.002):
+        """Like take(), but waits up to ``timeout`` seconds for a new frame."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            latest = self.take(after)
+            if latest is not None:
+                return latest
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(poll)
+
+    def close(self):
+        """Detach; the creating process also removes the shared memory.
+
+        Frame views returned by ``take`` must be dropped first (or taken
+        with ``copy=True``): while one is still referenced the mapping
+        cannot be closed and this raises BufferError; call it again once
+        they are gone. Publishing stops and the owner removes the name
+        either way.
+        """
+        if not hasattr(self, "shm"):
+            return  # __init__ failed
+        self.closed = True
+        self.header = self.meta = self.data = None  # Our own views of the block
+        if self.owner and not self._unlinked:
+            self._unlinked = True
+            if sys.version_info < (3, 13):
+                # A reader in this process or a child (which shares our
+                # tracker) may have unregistered the name; unlink expects it
+                resource_tracker.register(self.shm._name, "shared_memory")
+            self.shm.unlink()
+        self.shm.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except BufferError:
+            pass  # Views outlived the bus; the mapping goes with the last one
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,209 @@
+"""Analog driving from a gamepad or joystick.
+
+A device only reports stick positions; ``DriveStreamer`` turns them into
+``drive`` commands (throttle and steering in -1..1) at a fixed rate, after
+a deadzone and exponential smoothing, and only sends when the values
+actually changed - a stick held still sends nothing (the controller's
+deadman keepalive still refreshes an ongoing drive).
+
+Devices:
+
+* ``VirtualGamepad`` - axes set from code, for tests and scripted runs.
+* ``LinuxJoystick`` - the kernel joystick API (``/dev/input/js*``), read
+  on a background thread with the standard library only.
+"""
+import asyncio
+import os
+import select
+import struct
+import threading
+
+from rover.ticker import sleep_until
+
+# struct js_event from linux/joystick.h
+JS_EVENT = struct.Struct("<IhBB")
+JS_EVENT_AXIS = 0x02
+JS_EVENT_INIT = 0x80
+
+
+def apply_deadzone(value, deadzone):
+    """Zero out small stick offsets and rescale the rest back to -1..1."""
+    if abs(value) <= deadzone:
+        return 0.0
+    scaled = (abs(value) - deadzone) / (1.0 - deadzone)
+    return min(scaled, 1.0) if value > 0 else -min(scaled, 1.0)
+
+
+class VirtualGamepad:
+    """A gamepad whose axes are set from code."""
+
+    name = "virtual"
+
+    def __init__(self, axes=4):
+        self.axes = [0.0] * axes
+
+    def set_axis(self, index, value):
+        self.axes[index] = max(-1.0, min(1.0, float(value)))
+
+    def read_axes(self):
+        return list(self.axes)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class LinuxJoystick(threading.Thread):
+    """Reads axis events from a Linux joystick device in the background."""
+
+    def __init__(self, path="/dev/input/js0", axes=8):
+        super().__init__(name="joystick", daemon=True)
+        self.name = path
+        self.path = path
+        self.axes = [0.0] * axes
+        self.status = "opening"
+        self.last_error = None
+        self._stop_event = threading.Event()
+
+    def read_axes(self):
+        return list(self.axes)
+
+    def run(self):
+        try:
+            fd = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)
+        except OSError as e:
+            self.last_error = e
+            self.status = "failed"
+            return
+        self.status = "running"
+        try:
+            while not self._stop_event.is_set():
+                readable, _, _ = select.select([fd], [], [], 0.1)
+                if not readable:
+                    continue
+                try:
+                    data = os.read(fd, JS_EVENT.size * 16)
+                except BlockingIOError:
+                    continue
+                except OSError as e:  # Unplugged
+                    self.last_error = e
+                    self.status = "failed"
+                    return
+                for offset in range(0, len(data) - JS_EVENT.size + 1, JS_EVENT.size):
+                    _, value, kind, number = JS_EVENT.unpack_from(data, offset)
+                    if kind & ~JS_EVENT_INIT == JS_EVENT_AXIS and number < len(self.axes):
+                        self.axes[number] = value / 32767
+        finally:
+            os.close(fd)
+            if self.status == "running":
+                self.status = "stopped"
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+
+def open_gamepad(spec):
+    """``"virtual"`` or a joystick device path."""
+    if spec == "virtual":
+        return VirtualGamepad()
+    return LinuxJoystick(spec)
+
+
+class DriveStreamer:
+    """Streams a gamepad's stick as ``drive`` commands to a RoverController.
+
+    Every ``1 / rate`` seconds the throttle and steering axes are read,
+    passed through the deadzone and smoothed (``smoothing`` is the weight
+    of the previous value, 0 = none). A command is sent only when either
+    value moved by at least ``min_delta`` since the last one sent, or when
+    the stick came back to exactly zero, so the rover always gets its stop.
+    Pushing the throttle axis forward gives negative raw values on most
+    pads, hence ``invert_throttle``.
+    """
+
+    def __init__(self, controller, device, rate=20.0, deadzone=0.08, smoothing=0.5,
+                 min_delta=0.02, throttle_axis=1, steering_axis=0, invert_throttle=True):
+        self.controller = controller
+        self.device = device
+        self.rate = rate
+        self.deadzone = deadzone
+        self.smoothing = smoothing
+        self.min_delta = min_delta
+        self.throttle_axis = throttle_axis
+        self.steering_axis = steering_axis
+        self.invert_throttle = invert_throttle
+        self.throttle = 0.0
+        self.steering = 0.0
+        self.sent = 0
+        self.suppressed = 0
+        self._last_sent = (0.0, 0.0)
+        self._task = None
+
+    def start(self):
+        self.device.start()
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return self._task
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.device.stop()
+
+    def stats(self):
+        return {"throttle": self.throttle, "steering": self.steering,
+                "sent": self.sent, "suppressed": self.suppressed}
+
+    def stopped_elsewhere(self):
+        """The rover was stopped by another input (e.g. a key release).
+
+        A stick that is still held is sent again on the next poll instead
+        of being suppressed as unchanged.
+        """
+        self._last_sent = (0.0, 0.0)
+
+    def _smooth(self, previous, target):
+        value = self.smoothing * previous + (1 - self.smoothing) * target
+        # Settle exactly, so a released stick ends at 0 and not 0.0001
+        return target if abs(value - target) < self.min_delta / 2 else value
+
+    def poll(self):
+        """Read the device once; returns (throttle, steering) if it should be sent.
+
+        The values count as sent once the caller managed to queue them.
+        """
+        axes = self.device.read_axes()
+        raw_throttle = axes[self.throttle_axis]
+        if self.invert_throttle:
+            raw_throttle = -raw_throttle
+        throttle = apply_deadzone(raw_throttle, self.deadzone)
+        steering = apply_deadzone(axes[self.steering_axis], self.deadzone)
+        self.throttle = self._smooth(self.throttle, throttle)
+        self.steering = self._smooth(self.steering, steering)
+
+        last_throttle, last_steering = self._last_sent
+        stopped = self.throttle == 0 and self.steering == 0
+        if stopped and (last_throttle, last_steering) == (0.0, 0.0):
+            return None
+        if not stopped and (abs(self.throttle - last_throttle) < self.min_delta and
+                            abs(self.steering - last_steering) < self.min_delta):
+            self.suppressed += 1
+            return None
+        return round(self.throttle, 3), round(self.steering, 3)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / self.rate
+        deadline = loop.time()
+        while True:
+            deadline += interval
+            values = self.poll()
+            if values is not None and self.controller.drive(*values):
+                self._last_sent = values
+                self.sent += 1
+            await sleep_until(deadline)
@@ -0,0 +1,8 @@
+import time
+
+
+def format_log_line(text, timestamp=None):
+    """Format ``text`` as "[hh:mm:ss] text" (local time, now by default)."""
+    if timestamp is None:
+        timestamp = time.time()
+    return f"[{time.strftime('%H:%M:%S', time.localtime(timestamp))}] {text}"
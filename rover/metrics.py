@@ -0,0 +1,278 @@
+"""Lightweight instrumentation of the hot paths.
+
+Most numbers already exist as counters on the objects that own them
+(capture, detector, connection, command queue); those are registered as
+pull callbacks and cost nothing until someone looks. Only durations have
+to be measured where they happen: ``metrics.time(name)`` is a no-op
+context manager while ``enabled`` is False, which it is unless someone -
+the HUD, an exporter - has called ``enable()``.
+
+    metrics = Metrics()
+    metrics.gauge("rtt_ms", lambda: connection.rtt_ms)
+    metrics.rate("telemetry_per_s", lambda: telemetry.messages)
+    with metrics.time("render_ms"):
+        ...
+    metrics.snapshot()
+"""
+import asyncio
+import json
+import re
+import time
+
+import numpy as np
+
+
+class Timing:
+    """Last ``size`` durations of one code path, in ms."""
+
+    def __init__(self, size=256):
+        self.samples = np.zeros(size)
+        self.count = 0
+        self.last = 0.0
+
+    def observe(self, ms):
+        self.samples[self.count % len(self.samples)] = ms
+        self.count += 1
+        self.last = ms
+
+    def summary(self):
+        if not self.count:
+            return None
+        window = self.samples[:min(self.count, len(self.samples))]
+        p50, p95 = np.percentile(window, (50, 95))
+        return {"n": self.count, "last": round(self.last, 3), "p50": round(float(p50), 3),
+                "p95": round(float(p95), 3), "max": round(float(window.max()), 3)}
+
+
+class _Timer:
+    """Context manager that feeds one Timing (one per name, not reentrant)."""
+
+    __slots__ = ("timing", "started")
+
+    def __init__(self, timing):
+        self.timing = timing
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timing.observe((time.perf_counter() - self.started) * 1000)
+
+
+class _NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+
+_NO_TIMER = _NoTimer()
+
+
+class Metrics:
+    """Registry of gauges, rates and timings for one rover session."""
+
+    RATE_INTERVAL = 0.5  # Seconds; rates are recomputed at most this often
+
+    def __init__(self):
+        self.enabled = False
+        self._users = set()
+        self._gauges = {}
+        self._rates = {}  # name -> (fn, last time, last count, rate)
+        self._timings = {}
+        self._timers = {}
+
+    def enable(self, user):
+        """Start measuring on behalf of ``user`` (any hashable, e.g. "hud")."""
+        self._users.add(user)
+        self.enabled = True
+
+    def disable(self, user):
+        """``user`` no longer needs timings; stops once nobody does."""
+        self._users.discard(user)
+        self.enabled = bool(self._users)
+
+    def gauge(self, name, fn):
+        """Register a callback returning the current value (or None)."""
+        self._gauges[name] = fn
+
+    def rate(self, name, fn):
+        """Register a callback returning a growing count; reported per second."""
+        self._rates[name] = (fn, None, None, None)
+
+    def time(self, name):
+        """Context manager timing the block into ``name`` (when enabled)."""
+        if not self.enabled:
+            return _NO_TIMER
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = _Timer(self.timing(name))
+        return timer
+
+    def observe(self, name, ms):
+        """Record a duration measured elsewhere (when enabled)."""
+        if self.enabled:
+            self.timing(name).observe(ms)
+
+    def timing(self, name):
+        timing = self._timings.get(name)
+        if timing is None:
+            timing = self._timings[name] = Timing()
+        return timing
+
+    def _rate_values(self, now):
+        values = {}
+        for name, (fn, last_time, last_count, rate) in list(self._rates.items()):
+            try:
+                count = fn()
+            except Exception:
+                count = None
+            if count is None:
+                values[name] = None
+                self._rates[name] = (fn, None, None, None)
+                continue
+            if last_time is None or count < last_count:
+                self._rates[name] = (fn, now, count, None)
+            elif now - last_time >= self.RATE_INTERVAL:
+                rate = (count - last_count) / (now - last_time)
+                self._rates[name] = (fn, now, count, rate)
+            values[name] = None if rate is None else round(rate, 2)
+        return values
+
+    def snapshot(self):
+        """Current gauges, rates and timing summaries as plain dicts."""
+        gauges = {}
+        for name, fn in list(self._gauges.items()):
+            try:
+                gauges[name] = fn()
+            except Exception:
+                gauges[name] = None
+        return {
+            "gauges": gauges,
+            "rates": self._rate_values(time.monotonic()),
+            "timings": {name: timing.summary() for name, timing in list(self._timings.items())},
+        }
+
+
+def format_hud(snapshot):
+    """Overlay text lines for one snapshot."""
+    lines = []
+    for name, value in snapshot["rates"].items():
+        lines.append(f"{name:<22} {'--' if value is None else f'{value:.1f}'}")
+    for name, value in snapshot["gauges"].items():
+        if isinstance(value, float):
+            value = f"{value:.1f}"
+        lines.append(f"{name:<22} {'--' if value is None else value}")
+    for name, summary in snapshot["timings"].items():
+        if summary is not None:
+            lines.append(f"{name:<22} {summary['p50']:.2f} / {summary['p95']:.2f} p95")
+    return lines
+
+
+def _metric_name(name):
+    return "rover_" + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def prometheus_text(registries):
+    """Prometheus text exposition of {label: Metrics}, one ``rover`` label each."""
+    lines = []
+    for label, metrics in registries.items():
+        snapshot = metrics.snapshot()
+        tag = f'rover="{label}"'
+        for name, value in list(snapshot["gauges"].items()) + list(snapshot["rates"].items()):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                lines.append(f"{_metric_name(name)}{{{tag}}} {value}")
+        for name, summary in snapshot["timings"].items():
+            if summary is None:
+                continue
+            metric = _metric_name(name)
+            lines.append(f'{metric}{{{tag},quantile="0.5"}} {summary["p50"]}')
+            lines.append(f'{metric}{{{tag},quantile="0.95"}} {summary["p95"]}')
+            lines.append(f"{metric}_count{{{tag}}} {summary['n']}")
+    return "\n".join(lines) + "\n"
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a periodic sleep (``loop_lag_ms``)."""
+
+    def __init__(self, metrics, interval=0.1):
+        self.metrics = metrics
+        self.interval = interval
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return self._task
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.metrics.observe("loop_lag_ms", (loop.time() - expected) * 1000)
+
+
+class MetricsServer:
+    """Local HTTP endpoint: ``/metrics`` (Prometheus text) and ``/metrics.json``.
+
+    ``registries`` maps a rover name to its Metrics; serving enables them.
+    """
+
+    def __init__(self, registries, host="127.0.0.1", port=9108):
+        self.registries = registries
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self._server = None
+
+    async def start(self):
+        for metrics in self.registries.values():
+            metrics.enable(self)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        return self._server
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        for metrics in self.registries.values():
+            metrics.disable(self)
+
+    async def _handle(self, reader, writer):
+        try:
+            request = await asyncio.wait_for(reader.readline(), 5)
+            while (await asyncio.wait_for(reader.readline(), 5)).strip():
+                pass  # Skip the headers
+            parts = request.decode("latin-1").split()
+            path = parts[1] if len(parts) > 1 else "/"
+            if path == "/metrics":
+                status, kind = "200 OK", "text/plain; version=0.0.4"
+                body = prometheus_text(self.registries)
+            elif path == "/metrics.json":
+                status, kind = "200 OK", "application/json"
+                body = json.dumps({label: metrics.snapshot()
+                                   for label, metrics in self.registries.items()})
+            else:
+                status, kind, body = "404 Not Found", "text/plain", "Not found\n"
+            data = body.encode()
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {kind}\r\n"
+                f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data
+            )
+            await writer.drain()
+            self.requests += 1
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,153 @@
+"""Scripted missions: timed command sequences.
+
+Every step is due at a fixed offset from the mission start, so a late
+step never shifts the ones after it::
+
+    mission = Mission(controller)
+    mission.drive("forward", 2.0).arm(120).wait(0.5).center_camera().flag()
+    report = await mission.run()
+
+or from a text script (``python -m rover --mission FILE``)::
+
+    # Out, drop the flag, back
+    speed normal
+    drive forward 2
+    arm 120
+    wait 0.5
+    flag
+    drive backward 2
+
+A drive repeats its move every ``repeat`` seconds (well within the
+rover's deadman) and ends with a stop at exactly its end time. The stop
+is also sent if the mission is cancelled.
+"""
+import asyncio
+import shlex
+
+from rover.controller import SPEEDS
+from rover.metrics import Timing
+from rover.protocol import DIRECTIONS
+from rover.ticker import sleep_until
+
+
+class Mission:
+    """A timed sequence of commands for one RoverController."""
+
+    def __init__(self, controller, repeat=0.1):
+        self.controller = controller
+        self.repeat = repeat
+        self.steps = []  # (offset s, label, command name, args), in time order
+        self.duration = 0.0  # Offset where the next step goes
+        self.lateness = Timing()
+        self.log = []  # (label, offset s, late ms) of executed steps
+
+    def _add(self, offset, label, name, *args):
+        self.steps.append((offset, label, name, args))
+
+    def drive(self, direction, seconds, speed=None):
+        """Move in ``direction`` for ``seconds`` (at the controller's speed_factor by default)."""
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown direction {direction!r}; expected one of {DIRECTIONS}")
+        label = f"drive {direction}"
+        count = max(1, int(round(seconds / self.repeat)))
+        for i in range(count):
+            self._add(self.duration + i * self.repeat, label, "move", direction, speed)
+        self.duration += seconds
+        self._add(self.duration, "stop", "stop")
+        return self
+
+    def arm(self, angle, joint=1):
+        self._add(self.duration, f"arm {angle}", "set_arm", angle, joint)
+        return self
+
+    def camera(self, angle):
+        self._add(self.duration, f"camera {angle}", "set_camera", angle)
+        return self
+
+    def center_camera(self):
+        return self.camera(0)
+
+    def flag(self):
+        self._add(self.duration, "flag", "drop_flag")
+        return self
+
+    def speed(self, name):
+        """Switch the speed preset (see SPEEDS) for the following drives."""
+        if name not in SPEEDS:
+            raise ValueError(f"Unknown speed {name!r}; expected one of {tuple(SPEEDS)}")
+        self._add(self.duration, f"speed {name}", "set_speed", name)
+        return self
+
+    def wait(self, seconds):
+        self.duration += seconds
+        return self
+
+    @classmethod
+    def parse(cls, controller, text, repeat=0.1):
+        """Build a mission from script lines (see the module docstring)."""
+        mission = cls(controller, repeat)
+        for number, line in enumerate(text.splitlines(), 1):
+            words = shlex.split(line, comments=True)
+            if not words:
+                continue
+            verb, args = words[0], words[1:]
+            try:
+                if verb == "drive":
+                    speed = float(args[2]) if len(args) > 2 else None
+                    mission.drive(args[0], float(args[1]), speed)
+                elif verb == "arm":
+                    mission.arm(int(args[0]), int(args[1]) if len(args) > 1 else 1)
+                elif verb == "camera":
+                    mission.camera(int(args[0]))
+                elif verb == "center":
+                    mission.center_camera()
+                elif verb == "flag":
+                    mission.flag()
+                elif verb == "speed":
+                    mission.speed(args[0])
+                elif verb == "wait":
+                    mission.wait(float(args[0]))
+                else:
+                    raise ValueError(f"unknown step {verb!r}")
+            except (IndexError, ValueError) as e:
+                raise ValueError(f"Mission line {number}: {line.strip()!r}: {e}") from None
+        return mission
+
+    @classmethod
+    def load(cls, controller, path, repeat=0.1):
+        with open(path) as f:
+            return cls.parse(controller, f.read(), repeat)
+
+    def _execute(self, name, args):
+        controller = self.controller
+        if name == "move":
+            direction, speed = args
+            controller.move(direction, speed)
+        else:
+            getattr(controller, name)(*args)
+
+    async def run(self):
+        """Execute every step at its time; returns ``report()``."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        self.log = []
+        last_label = None
+        try:
+            for offset, label, name, args in self.steps:
+                await sleep_until(started + offset)
+                late_ms = (loop.time() - started - offset) * 1000
+                self._execute(name, args)
+                self.lateness.observe(late_ms)
+                if label != last_label:
+                    self.controller.log(f"Mission {offset:6.2f}s: {label}")
+                    last_label = label
+                self.log.append((label, offset, late_ms))
+        except asyncio.CancelledError:
+            self.controller.stop()
+            self.controller.log("Mission cancelled - stopping")
+            raise
+        return self.report()
+
+    def report(self):
+        return {"steps": len(self.log), "duration_s": self.duration,
+                "late_ms": self.lateness.summary()}
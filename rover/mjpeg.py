@@ -0,0 +1,273 @@
+import http.client
+import threading
+import time
+from urllib.parse import urlsplit
+
+import cv2
+import numpy as np
+
+from rover.capture import FrameSlot
+
+# Reduced-size decode flags: libjpeg scales in the DCT domain, which is far
+# cheaper than decoding the full image and resizing it afterwards
+REDUCED_DECODE_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+class MultipartParser:
+    """Incremental parser for a multipart/x-mixed-replace MJPEG stream.
+
+    Bytes are appended to one reusable buffer as they arrive. Parts are
+    delimited by Content-Length when the sender provides it (the ESP32
+    camera server does) and by the next boundary otherwise. Only the newest
+    completed part is ever copied out; older ones are counted and skipped.
+    """
+
+    def __init__(self, boundary):
+        boundary = boundary.strip().strip('"')
+        if boundary.startswith("--"):
+            boundary = boundary[2:]
+        self.delimiter = b"--" + boundary.encode("latin-1")
+        self.parts_skipped = 0
+        self._buffer = bytearray()
+        self._pos = 0
+        self._headers = None  # Headers of the part whose body is pending
+        self._body_start = 0
+        self._body_length = -1
+        self._latest = None
+
+    def feed(self, data):
+        """Consume a chunk of the stream; returns how many parts completed."""
+        if self._pos:
+            # Drop everything already parsed before growing the buffer
+            del self._buffer[:self._pos]
+            self._body_start -= self._pos
+            self._pos = 0
+        self._buffer += data
+
+        buffer = self._buffer
+        completed = 0
+        newest = None
+        while True:
+            if self._headers is None:
+                start = buffer.find(self.delimiter, self._pos)
+                if start < 0:
+                    # Keep just enough of the tail to match a split delimiter
+                    self._pos = max(self._pos, len(buffer) - len(self.delimiter))
+                    break
+                header_end = buffer.find(b"\r\n\r\n", start)
+                if header_end < 0:
+                    self._pos = start
+                    break
+                self._headers = self._parse_headers(
+                    buffer[start + len(self.delimiter):header_end]
+                )
+                self._body_start = header_end + 4
+                try:
+                    self._body_length = int(self._headers.get("content-length", -1))
+                except ValueError:
+                    self._body_length = -1  # Unusable; the next boundary ends the part
+                self._pos = self._body_start
+
+            if self._body_length >= 0:
+                end = self._body_start + self._body_length
+                if len(buffer) < end:
+                    break
+                next_pos = end
+            else:
+                end = buffer.find(b"\r\n" + self.delimiter, self._body_start)
+                if end < 0:
+                    break  # Body still arriving; keep it from _body_start on
+                next_pos = end + 2
+
+            if newest is not None:
+                self.parts_skipped += 1
+            newest = (self._headers, self._body_start, end)
+            completed += 1
+            self._headers = None
+            self._pos = next_pos
+
+        if newest is not None:
+            headers, start, end = newest
+            self._latest = (headers, bytes(buffer[start:end]))
+        return completed
+
+    def take_latest(self):
+        """Return (headers, jpeg_bytes) of the newest unread part, or None."""
+        latest, self._latest = self._latest, None
+        return latest
+
+    @staticmethod
+    def _parse_headers(raw):
+        headers = {}
+        for line in bytes(raw).split(b"\r\n"):
+            name, sep, value = line.partition(b":")
+            if sep:
+                headers[name.strip().lower().decode("latin-1")] = (
+                    value.strip().decode("latin-1")
+                )
+        return headers
+
+
+def choose_decode_scale(source_size, display_size):
+    """Largest reduced-decode factor that still covers the display size."""
+    src_width, src_height = source_size
+    width, height = display_size
+    if width <= 0 or height <= 0:
+        return 1
+    for factor in (8, 4, 2):
+        if src_width // factor >= width and src_height // factor >= height:
+            return factor
+    return 1
+
+
+class MjpegCapture(threading.Thread):
+    """Reads an MJPEG-over-HTTP stream (e.g. the ESP32-CAM) on its own thread.
+
+    Behaves like CaptureThread: the newest decoded frame is published into
+    ``slot`` (and ``bus``, if set). Every chunk read from the socket is
+    parsed immediately, but a JPEG is only decoded if it is the newest one
+    available, so a slow decoder skips stale frames rather than falling
+    behind the stream.
+
+    ``last_frame_timing`` is (X-Timestamp of the newest part, local
+    time.time() it arrived) for measuring how old frames are on arrival;
+    the camera's clock need not match ours (see rover/bitrate.py).
+    """
+
+    READ_SIZE = 64 * 1024
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self, url, timeout=5.0):
+        super().__init__(name="mjpeg-capture", daemon=True)
+        self.url = url
+        self.timeout = timeout
+        self.slot = FrameSlot()
+        self.status = "opening"
+        self.frames_received = 0
+        self.frames_captured = 0  # Decoded and published
+        self.bytes_received = 0
+        self.decode_failures = 0
+        self.last_error = None
+        self.last_decode_ms = 0.0
+        self.last_headers = {}
+        self.last_frame_timing = None
+        self.bus = None
+        self.source_size = None
+        self.decode_scale = 1
+        self._display_size = (0, 0)
+        self._parser = None
+        self._conn = None
+        self._stop_event = threading.Event()
+
+    @property
+    def frames_dropped(self):
+        skipped = self._parser.parts_skipped if self._parser is not None else 0
+        return skipped + self.slot.dropped
+
+    def stats(self):
+        """Snapshot of the stream counters."""
+        return {
+            "status": self.status,
+            "captured": self.frames_captured,
+            "dropped": self.frames_dropped,
+            "received": self.frames_received,
+            "bytes": self.bytes_received,
+            "decode_scale": self.decode_scale,
+            "decode_ms": self.last_decode_ms,
+        }
+
+    def set_display_size(self, width, height):
+        """Let the decoder shrink frames that are larger than the view."""
+        self._display_size = (width, height)
+
+    def _connect(self):
+        parts = urlsplit(self.url)
+        conn_cls = (http.client.HTTPSConnection if parts.scheme == "https"
+                    else http.client.HTTPConnection)
+        self._conn = conn_cls(parts.hostname, parts.port, timeout=self.timeout)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        self._conn.request("GET", path)
+        response = self._conn.getresponse()
+        if response.status != 200:
+            raise ConnectionError(f"HTTP {response.status} from {self.url}")
+
+        content_type = response.getheader("Content-Type", "")
+        _, _, boundary = content_type.partition("boundary=")
+        if not boundary:
+            raise ConnectionError(f"Not a multipart stream: {content_type!r}")
+        self._parser = MultipartParser(boundary.split(";")[0])
+        return response
+
+    def _decode(self, jpeg):
+        scale = 1
+        if self.source_size is not None:
+            scale = choose_decode_scale(self.source_size, self._display_size)
+        start = time.perf_counter()
+        frame = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8),
+                             REDUCED_DECODE_FLAGS[scale])
+        self.last_decode_ms = (time.perf_counter() - start) * 1000
+        if frame is None:
+            return None
+        self.decode_scale = scale
+        self.source_size = (frame.shape[1] * scale, frame.shape[0] * scale)
+        return frame
+
+    def _stream(self, response):
+        while not self._stop_event.is_set():
+            data = response.read1(self.READ_SIZE)
+            if not data:
+                raise ConnectionError("Stream closed by camera")
+            self.bytes_received += len(data)
+            completed = self._parser.feed(data)
+            if not completed:
+                continue
+            self.frames_received += completed
+
+            headers, jpeg = self._parser.take_latest()
+            try:
+                self.last_frame_timing = (float(headers["x-timestamp"]), time.time())
+            except (KeyError, ValueError):
+                pass
+            frame = self._decode(jpeg)
+            if frame is None:
+                self.decode_failures += 1
+                continue
+            self.last_headers = headers
+            self.frames_captured += 1
+            timestamp = time.monotonic()
+            self.slot.put(frame, timestamp)
+            if self.bus is not None:
+                self.bus.put(frame, timestamp)
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                response = self._connect()
+                self.status = "running"
+                self._stream(response)
+            except (OSError, ValueError, http.client.HTTPException) as e:
+                self.last_error = e
+                self.status = "reconnecting"
+                self._stop_event.wait(self.RECONNECT_DELAY)
+            finally:
+                if self._conn is not None:
+                    self._conn.close()
+        self.status = "stopped"
+
+    def stop(self, timeout=1.0):
+        """Ask the thread to exit and wait briefly for it."""
+        self._stop_event.set()
+        if self._conn is not None and self._conn.sock is not None:
+            try:
+                self._conn.sock.shutdown(2)  # Unblock a pending read
+            except OSError:
+                pass
+        if self.is_alive():
+            self.join(timeout)
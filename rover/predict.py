@@ -0,0 +1,172 @@
+"""Client-side prediction of the rover's motion ahead of delayed telemetry.
+
+The rover reports no position, so its pose is dead-reckoned from the
+commands that were sent: every move or drive is assumed to take effect one-way
+latency after it left the client, and to last until the next move (or
+until the rover's deadman stops it). Telemetry and video show the rover
+as it was one-way latency ago; a command sent now lands one-way latency
+from now. ``displayed_pose`` and ``predicted_pose`` give those two views
+so the operator can see where the rover is heading before the video
+catches up.
+"""
+import collections
+import math
+
+# Wheel speeds (right, left) per direction, mirroring the firmware's motor
+# mixing (server/board.cpp); 1.0 is full speed forward
+WHEELS = {
+    "stop": (0.0, 0.0),
+    "forward": (1.0, 1.0),
+    "backward": (-1.0, -1.0),
+    "left": (1.0, -1.0),
+    "right": (-1.0, 1.0),
+    "forward_left": (1.0, 0.5),
+    "forward_right": (0.5, 1.0),
+    "backward_left": (-1.0, -0.5),
+    "backward_right": (-0.5, -1.0),
+}
+
+
+def drive_wheels(throttle, steering):
+    """Wheel speeds (right, left) of an analog drive, as the firmware mixes them."""
+    def clamp(value):
+        return max(-1.0, min(1.0, value))
+    return clamp(throttle - steering), clamp(throttle + steering)
+
+
+def advance(pose, linear, angular, dt):
+    """Pose (x, y, heading) after driving a constant arc for ``dt`` seconds."""
+    x, y, heading = pose
+    if dt <= 0:
+        return pose
+    if abs(angular) < 1e-9:
+        return (x + linear * dt * math.cos(heading),
+                y + linear * dt * math.sin(heading), heading)
+    new_heading = heading + angular * dt
+    radius = linear / angular
+    return (x + radius * (math.sin(new_heading) - math.sin(heading)),
+            y - radius * (math.cos(new_heading) - math.cos(heading)),
+            new_heading)
+
+
+class PosePredictor:
+    """Dead-reckons rover pose and camera angle from sent commands.
+
+    ``max_speed`` (m/s) and ``turn_rate`` (rad/s) are the rover's speeds at
+    command speed 1.0. ``deadman`` (seconds) is the rover's deadman
+    timeout, after which a move that was not refreshed stops.
+
+    Feed it with ``command_sent`` for every command that goes out and
+    ``command_acked`` with the sequence number the rover echoes in its
+    telemetry; ``set_rtt`` updates the latency estimate.
+    """
+
+    HISTORY = 10.0  # Seconds of motion kept before folding into the base pose
+
+    def __init__(self, max_speed=0.5, turn_rate=1.5, deadman=None):
+        self.max_speed = max_speed
+        self.turn_rate = turn_rate
+        self.deadman = deadman
+        self.rtt = 0.0  # Seconds
+        self.camera_angle = None  # Last camera angle sent
+        self.confirmed_camera_angle = None  # Last camera angle the rover applied
+        self.last_ack_rtt = None
+        self._in_flight = collections.deque()  # (seq, sent_at, msg) in send order
+        self._segments = []  # (effective_at, linear, angular), in time order
+        self._base_time = None
+        self._base_pose = (0.0, 0.0, 0.0)
+
+    @property
+    def latency(self):
+        """One-way latency estimate in seconds."""
+        return self.rtt / 2
+
+    @property
+    def in_flight(self):
+        """Commands sent but not yet confirmed by the rover."""
+        return len(self._in_flight)
+
+    def set_rtt(self, rtt_ms):
+        if rtt_ms is not None:
+            self.rtt = rtt_ms / 1000
+
+    def command_sent(self, msg, now):
+        """Record a command that just went out (``now`` is time.monotonic())."""
+        self._in_flight.append((msg.get("seq"), now, msg))
+        cmd = msg.get("cmd")
+        if cmd == "camera":
+            self.camera_angle = msg.get("angle")
+            return
+        if cmd == "drive":
+            right, left = drive_wheels(float(msg.get("throttle", 0)),
+                                       float(msg.get("steering", 0)))
+            speed = 1.0
+        elif cmd == "move" and msg.get("dir") in WHEELS:
+            right, left = WHEELS[msg["dir"]]
+            speed = float(msg.get("speed", 1))
+        else:
+            return
+        linear = (right + left) / 2 * self.max_speed * speed
+        angular = (right - left) / 2 * self.turn_rate * speed
+        effective = now + self.latency
+        if self._base_time is None:
+            self._base_time = effective
+        # Sends are monotonic but latency estimates move; keep order
+        if self._segments and effective < self._segments[-1][0]:
+            effective = self._segments[-1][0]
+        self._segments.append((effective, linear, angular))
+        self._fold(now)
+
+    def command_acked(self, seq, now):
+        """The rover applied command ``seq`` (and everything sent before it).
+
+        Returns the round-trip time of that command in ms, or None if it was
+        not in flight (already confirmed, or sent before a reconnect).
+        """
+        if not any(entry[0] == seq for entry in self._in_flight):
+            return None
+        while self._in_flight:
+            entry_seq, sent_at, msg = self._in_flight.popleft()
+            if msg.get("cmd") == "camera":
+                self.confirmed_camera_angle = msg.get("angle")
+            if entry_seq == seq:
+                self.last_ack_rtt = (now - sent_at) * 1000
+                return self.last_ack_rtt
+        return None
+
+    def reset(self):
+        """Forget commands in flight (e.g. after the link was lost)."""
+        self._in_flight.clear()
+
+    def _fold(self, now):
+        """Merge segments that ended long ago into the base pose."""
+        cutoff = now - self.HISTORY
+        while len(self._segments) > 1 and self._segments[1][0] < cutoff:
+            self._base_pose = self.pose_at(self._segments[1][0])
+            self._base_time = self._segments[1][0]
+            self._segments.pop(0)
+
+    def pose_at(self, t):
+        """Estimated (x, y, heading) at monotonic time ``t``."""
+        pose = self._base_pose
+        if self._base_time is None or t <= self._base_time:
+            return pose
+        start = self._base_time
+        for index, (effective, linear, angular) in enumerate(self._segments):
+            if effective >= t:
+                break
+            start = max(start, effective)
+            end = self._segments[index + 1][0] if index + 1 < len(self._segments) else t
+            end = min(end, t)
+            if self.deadman is not None:
+                end = min(end, effective + self.deadman)
+            pose = advance(pose, linear, angular, end - start)
+        return pose
+
+    def displayed_pose(self, now):
+        """Where the rover was when the telemetry/video now on screen left it."""
+        return self.pose_at(now - self.latency)
+
+    def predicted_pose(self, now):
+        """Where the rover will be when a command sent now reaches it."""
+        return self.pose_at(now + self.latency)
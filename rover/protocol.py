@@ -0,0 +1,203 @@
+"""Wire formats for talking to the rover.
+
+Two encodings are supported and picked per connection:
+
+* ``json`` - the original text messages, understood by every firmware.
+* ``bin1`` - fixed-layout little-endian struct frames. Every frame starts
+  with a version byte, a message type and a uint32 sequence number::
+
+      <B version> <B type> <I seq> <payload>
+
+  Telemetry payload (12 bytes per frame in total, vs ~70 bytes of JSON):
+  battery uint8 %, pitch/roll int16 centi-degrees, arm angle uint8,
+  optionally followed by a uint32 ``ack`` (16 bytes) - the sequence number
+  of the last command the rover applied. Command frames carry the
+  client's command sequence number in the header ``seq``; the analog
+  ``drive`` frame carries throttle and steering as int16 thousandths.
+
+In JSON, commands carry ``seq`` and ``t`` (client clock, ms) and telemetry
+echoes them back as ``ack`` and ``ack_t``.
+
+The client offers ``bin1`` with a JSON ``hello`` right after connecting and
+falls back to JSON when the rover does not answer (older firmware simply
+ignores the unknown command).
+"""
+import asyncio
+import json
+import struct
+
+BINARY_PROTOCOL = "bin1"
+VERSION = 1
+
+# Message types
+TELEMETRY = 0x01
+MOVE = 0x10
+ARM = 0x11
+CAMERA = 0x12
+FLAG = 0x13
+DRIVE = 0x14
+
+HEADER = struct.Struct("<BBI")
+TELEMETRY_FRAME = struct.Struct("<BBIBhhB")
+TELEMETRY_ACK = struct.Struct("<I")  # Optional trailer after TELEMETRY_FRAME
+MOVE_FRAME = struct.Struct("<BBIBB")
+ARM_FRAME = struct.Struct("<BBIBh")
+CAMERA_FRAME = struct.Struct("<BBIh")
+FLAG_FRAME = struct.Struct("<BBIB")
+DRIVE_FRAME = struct.Struct("<BBIhh")  # Throttle, steering in thousandths
+
+# Index in this tuple is the direction code on the wire
+DIRECTIONS = (
+    "stop", "forward", "backward", "left", "right",
+    "forward_left", "forward_right", "backward_left", "backward_right",
+)
+DIRECTION_CODES = {name: code for code, name in enumerate(DIRECTIONS)}
+FLAG_ACTIONS = {"drop": 1}
+
+
+class ProtocolError(ValueError):
+    """Raised for binary frames that cannot be decoded."""
+
+
+class JsonCodec:
+    """The original JSON text protocol."""
+
+    name = "json"
+
+    def encode_command(self, msg):
+        return json.dumps(msg)
+
+
+class BinaryCodec:
+    """Encodes commands as ``bin1`` frames with a running sequence number.
+
+    The frame ``seq`` is the command's own ``seq`` when it has one, so the
+    rover's ack refers to the same number in both wire formats. Commands
+    without a binary layout are sent as JSON text, which the rover keeps
+    accepting after negotiation.
+    """
+
+    name = BINARY_PROTOCOL
+
+    def __init__(self):
+        self.tx_seq = 0
+
+    def encode_command(self, msg):
+        cmd = msg.get("cmd")
+        seq = self.tx_seq = int(msg.get("seq", self.tx_seq + 1)) & 0xFFFFFFFF
+        if cmd == "move" and msg.get("dir") in DIRECTION_CODES:
+            speed = min(max(int(round(float(msg.get("speed", 1)) * 100)), 0), 255)
+            return MOVE_FRAME.pack(VERSION, MOVE, seq, DIRECTION_CODES[msg["dir"]], speed)
+        if cmd == "arm":
+            return ARM_FRAME.pack(VERSION, ARM, seq, int(msg.get("joint", 1)),
+                                  int(msg["angle"]))
+        if cmd == "camera":
+            return CAMERA_FRAME.pack(VERSION, CAMERA, seq, int(msg["angle"]))
+        if cmd == "flag" and msg.get("action") in FLAG_ACTIONS:
+            return FLAG_FRAME.pack(VERSION, FLAG, seq, FLAG_ACTIONS[msg["action"]])
+        if cmd == "drive":
+            return DRIVE_FRAME.pack(VERSION, DRIVE, seq, _milli(msg.get("throttle", 0)),
+                                    _milli(msg.get("steering", 0)))
+        return json.dumps(msg)
+
+
+def _milli(value):
+    return min(max(int(round(float(value) * 1000)), -1000), 1000)
+
+
+def decode_telemetry(data):
+    """Decode a binary telemetry frame into (seq, battery, pitch, roll, arm).
+
+    A single unpack into a tuple - no per-field dict is built.
+    """
+    if len(data) < TELEMETRY_FRAME.size:
+        raise ProtocolError(f"Short telemetry frame ({len(data)} bytes)")
+    version, msg_type, seq, battery, pitch, roll, arm = TELEMETRY_FRAME.unpack_from(data)
+    if version != VERSION or msg_type != TELEMETRY:
+        raise ProtocolError(f"Unexpected frame version {version} type {msg_type:#x}")
+    return seq, battery, pitch / 100, roll / 100, arm
+
+
+def telemetry_ack(data):
+    """Sequence number of the last applied command in a telemetry frame.
+
+    Returns None for frames from firmware that does not send acks.
+    """
+    if len(data) < TELEMETRY_FRAME.size + TELEMETRY_ACK.size:
+        return None
+    return TELEMETRY_ACK.unpack_from(data, TELEMETRY_FRAME.size)[0]
+
+
+def encode_telemetry(seq, battery, pitch, roll, arm, ack=None):
+    """Build a binary telemetry frame (used by the mock rover and tests)."""
+    frame = TELEMETRY_FRAME.pack(
+        VERSION, TELEMETRY, seq & 0xFFFFFFFF,
+        min(max(int(battery), 0), 255),
+        int(round(pitch * 100)), int(round(roll * 100)),
+        min(max(int(arm), 0), 255),
+    )
+    if ack is not None:
+        frame += TELEMETRY_ACK.pack(ack & 0xFFFFFFFF)
+    return frame
+
+
+def decode_command(data):
+    """Decode a binary command frame back into its JSON-style dict (with ``seq``)."""
+    if len(data) < HEADER.size:
+        raise ProtocolError(f"Short command frame ({len(data)} bytes)")
+    version, msg_type, seq = HEADER.unpack_from(data)
+    if version != VERSION:
+        raise ProtocolError(f"Unsupported frame version {version}")
+    try:
+        if msg_type == MOVE:
+            _, _, _, direction, speed = MOVE_FRAME.unpack_from(data)
+            return {"cmd": "move", "dir": DIRECTIONS[direction], "speed": speed / 100, "seq": seq}
+        if msg_type == ARM:
+            _, _, _, joint, angle = ARM_FRAME.unpack_from(data)
+            return {"cmd": "arm", "joint": joint, "angle": angle, "seq": seq}
+        if msg_type == CAMERA:
+            _, _, _, angle = CAMERA_FRAME.unpack_from(data)
+            return {"cmd": "camera", "angle": angle, "seq": seq}
+        if msg_type == FLAG:
+            return {"cmd": "flag", "action": "drop", "seq": seq}
+        if msg_type == DRIVE:
+            _, _, _, throttle, steering = DRIVE_FRAME.unpack_from(data)
+            return {"cmd": "drive", "throttle": throttle / 1000, "steering": steering / 1000,
+                    "seq": seq}
+    except (struct.error, IndexError) as e:
+        raise ProtocolError(f"Malformed command frame: {e}") from e
+    raise ProtocolError(f"Unknown command type {msg_type:#x}")
+
+
+async def negotiate(ws, offer=(BINARY_PROTOCOL, "json"), timeout=0.5):
+    """Agree on a wire format right after connecting.
+
+    Returns ``(codec, early_messages)``: messages that arrived before the
+    rover's answer (e.g. the telemetry it sends on connect) are handed
+    back so the caller can process them normally.
+    """
+    early_messages = []
+    if BINARY_PROTOCOL not in offer:
+        return JsonCodec(), early_messages
+
+    await ws.send(json.dumps({"cmd": "hello", "proto": list(offer)}))
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return JsonCodec(), early_messages
+        try:
+            message = await asyncio.wait_for(ws.recv(), remaining)
+        except asyncio.TimeoutError:
+            return JsonCodec(), early_messages
+        if isinstance(message, str):
+            try:
+                reply = json.loads(message)
+            except ValueError:
+                reply = None
+            if isinstance(reply, dict) and "proto" in reply:
+                if reply["proto"] == BINARY_PROTOCOL:
+                    return BinaryCodec(), early_messages
+                return JsonCodec(), early_messages
+        early_messages.append(message)
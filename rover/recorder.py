@@ -0,0 +1,194 @@
+"""Flight recorder: every telemetry message and command, on disk.
+
+File layout (little-endian)::
+
+    header  <4s magic "X0FR"> <B version> <d wall-clock start, unix seconds>
+    record  <d seconds since start> <B kind> <B format> <I length> <payload>
+
+``kind`` is TELEMETRY (received from the rover) or COMMAND (sent to it);
+``format`` says whether the payload is UTF-8 JSON text or a raw binary
+frame. Telemetry is stored exactly as it came off the wire, so a replay
+goes through the same decode path as a live session.
+"""
+import asyncio
+import json
+import queue
+import struct
+import threading
+import time
+
+import numpy as np
+
+from rover.protocol import decode_telemetry
+
+MAGIC = b"X0FR"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sBd")
+RECORD_HEADER = struct.Struct("<dBBI")
+
+TELEMETRY = 1
+COMMAND = 2
+TEXT = 0
+BINARY = 1
+
+
+class FlightRecorder(threading.Thread):
+    """Appends telemetry and commands to a recording file in the background.
+
+    ``record_*`` only timestamps the message and puts it on a queue, so the
+    caller (the GUI thread) never touches the disk; the recorder thread
+    serializes and writes records in batches.
+    """
+
+    def __init__(self, path, batch_interval=0.25, batch_size=512):
+        super().__init__(name="flight-recorder", daemon=True)
+        self.path = path
+        self.batch_interval = batch_interval
+        self.batch_size = batch_size
+        self.records_written = 0
+        self.bytes_written = 0
+        self.write_errors = 0
+        self.start_time = time.monotonic()
+        self._start_wall = time.time()
+        self._queue = queue.SimpleQueue()
+        self._stop_event = threading.Event()
+
+    def record_telemetry(self, message):
+        """Queue a telemetry message exactly as received (str or bytes)."""
+        self._queue.put((time.monotonic() - self.start_time, TELEMETRY, message))
+
+    def record_command(self, msg):
+        """Queue an outgoing command dict."""
+        self._queue.put((time.monotonic() - self.start_time, COMMAND, msg))
+
+    @staticmethod
+    def _encode(elapsed, kind, message):
+        if isinstance(message, dict):
+            message = json.dumps(message)
+        if isinstance(message, str):
+            payload, fmt = message.encode("utf-8"), TEXT
+        else:
+            payload, fmt = bytes(message), BINARY
+        return RECORD_HEADER.pack(elapsed, kind, fmt, len(payload)) + payload
+
+    def _drain(self, batch):
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._encode(*self._queue.get_nowait()))
+            except queue.Empty:
+                break
+
+    def run(self):
+        with open(self.path, "wb") as f:
+            f.write(FILE_HEADER.pack(MAGIC, VERSION, self._start_wall))
+            while True:
+                stopping = self._stop_event.wait(self.batch_interval)
+                batch = []
+                self._drain(batch)
+                while batch:
+                    data = b"".join(batch)
+                    try:
+                        f.write(data)
+                        f.flush()
+                    except OSError:
+                        self.write_errors += 1
+                    else:
+                        self.records_written += len(batch)
+                        self.bytes_written += len(data)
+                    batch = []
+                    self._drain(batch)
+                if stopping:
+                    break
+
+    def stop(self, timeout=2.0):
+        """Write out everything still queued and close the file."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
+
+
+def read_records(path):
+    """Load a recording; returns (start wall time, list of records).
+
+    Each record is (seconds since start, kind, payload) with text payloads
+    decoded to str. The file is read in one go and parsed with
+    ``unpack_from`` over a memoryview, which keeps hour-long recordings
+    quick to load.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < FILE_HEADER.size:
+        raise ValueError(f"{path} is not a flight recording")
+    magic, version, start_wall = FILE_HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} flight recording")
+
+    view = memoryview(data)
+    records = []
+    offset = FILE_HEADER.size
+    end = len(data)
+    while offset + RECORD_HEADER.size <= end:
+        elapsed, kind, fmt, length = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size
+        if offset + length > end:
+            break  # Truncated final record (e.g. the app was killed)
+        payload = view[offset:offset + length]
+        payload = str(payload, "utf-8") if fmt == TEXT else bytes(payload)
+        records.append((elapsed, kind, payload))
+        offset += length
+    return start_wall, records
+
+
+def telemetry_arrays(path):
+    """Telemetry of a recording as numpy columns, for post-mission analysis.
+
+    Returns a dict of equally long arrays: ``t`` (seconds since start),
+    ``battery``, ``pitch``, ``roll`` (NaN where a message lacked the field).
+    """
+    _, records = read_records(path)
+    rows = []
+    for elapsed, kind, payload in records:
+        if kind != TELEMETRY:
+            continue
+        if isinstance(payload, bytes):
+            _, battery, pitch, roll, _ = decode_telemetry(payload)
+        else:
+            message = json.loads(payload)
+            imu = message.get("imu") or {}
+            battery, pitch, roll = message.get("battery"), imu.get("pitch"), imu.get("roll")
+        rows.append((elapsed,
+                     np.nan if battery is None else battery,
+                     np.nan if pitch is None else pitch,
+                     np.nan if roll is None else roll))
+    columns = np.array(rows, dtype=np.float64).reshape(-1, 4) if rows else np.empty((0, 4))
+    return {
+        "t": columns[:, 0],
+        "battery": columns[:, 1],
+        "pitch": columns[:, 2],
+        "roll": columns[:, 3],
+    }
+
+
+async def replay(path, on_message, speed=1.0, on_command=None):
+    """Feed a recording's telemetry back through ``on_message``.
+
+    ``speed`` scales time (2.0 plays twice as fast); 0 replays as fast as
+    possible. Recorded commands are passed to ``on_command`` if given.
+    Deadlines are taken from the monotonic clock so timing does not drift
+    over a long session.
+    """
+    _, records = read_records(path)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    for index, (elapsed, kind, payload) in enumerate(records):
+        if speed > 0:
+            delay = started + elapsed / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        elif index % 256 == 0:
+            await asyncio.sleep(0)  # Let the UI breathe during a full-speed replay
+        if kind == TELEMETRY:
+            on_message(payload)
+        elif on_command is not None:
+            on_command(json.loads(payload) if isinstance(payload, str) else payload)
+    return len(records)
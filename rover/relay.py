@@ -0,0 +1,231 @@
+"""Relay hub: one link to the rover, any number of downstream observers.
+
+The rover firmware broadcasts every telemetry message to every connected
+WebSocket client, so each extra laptop costs the ESP32 radio time. The
+hub instead rides on one RoverController's link and serves the rover
+protocol itself, so other GUIs, dashboards and loggers connect to the
+hub (``--url ws://<relay>:8766``) exactly as they would to the rover.
+
+* Fan-out: every rover message is passed on as the very same str/bytes
+  object to all clients of that format; a binary frame is converted to
+  JSON at most once, for the JSON clients.
+* Backpressure: each client has a short queue of pending messages. A
+  client that cannot keep up loses the oldest ones (counted in
+  ``dropped``) instead of slowing the others or growing memory.
+* Command authority: only one client drives. With ``remote_control``
+  the first client to send a command (or ``{"cmd": "authority", "action":
+  "claim"}``) holds it until it releases it or disconnects, which also
+  stops the rover; everyone else's commands are refused. Without it the
+  hub is observe-only and the host controller keeps sole control.
+  Forwarded commands are renumbered by the host controller, so the
+  ``ack`` in telemetry follows its numbering, not the client's.
+
+Pings are answered by the hub, so a client's RTT is to the hub.
+"""
+import asyncio
+import collections
+import json
+
+import websockets
+
+from rover.protocol import (
+    BINARY_PROTOCOL, ProtocolError, decode_command, decode_telemetry, telemetry_ack
+)
+
+# Commands passed on to the rover; anything else (e.g. a client's deadman
+# setting) is for the hub's own session and never forwarded
+_FORWARDED_COMMANDS = ("move", "drive", "arm", "camera", "flag")
+
+
+def telemetry_json(frame):
+    """A binary telemetry frame as the equivalent JSON text message."""
+    _, battery, pitch, roll, arm = decode_telemetry(frame)
+    telemetry = {"battery": battery, "imu": {"pitch": pitch, "roll": roll},
+                 "arm": {"joint1": arm}}
+    ack = telemetry_ack(frame)
+    if ack is not None:
+        telemetry["ack"] = ack
+    return json.dumps(telemetry)
+
+
+class RelayClient:
+    """One downstream connection and its bounded queue of pending messages."""
+
+    def __init__(self, websocket, queue_size):
+        self.websocket = websocket
+        address = websocket.remote_address or ("?", 0)
+        self.name = f"{address[0]}:{address[1]}"
+        self.binary = False
+        self.sent = 0
+        self.dropped = 0
+        self.refused = 0
+        self._queue = collections.deque(maxlen=queue_size)
+        self._ready = asyncio.Event()
+
+    def push(self, message):
+        if len(self._queue) == self._queue.maxlen:
+            self.dropped += 1  # The deque drops the oldest one
+        self._queue.append(message)
+        self._ready.set()
+
+    async def write(self):
+        """Send queued messages as fast as the client takes them."""
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            while self._queue:
+                try:
+                    await self.websocket.send(self._queue.popleft())
+                except websockets.exceptions.ConnectionClosed:
+                    return  # The receive loop notices too and cleans up
+                self.sent += 1
+
+    def stats(self):
+        return {"name": self.name, "protocol": BINARY_PROTOCOL if self.binary else "json",
+                "sent": self.sent, "dropped": self.dropped, "refused": self.refused,
+                "queued": len(self._queue)}
+
+
+class RelayHub:
+    """Serves a RoverController's rover link to downstream clients."""
+
+    def __init__(self, controller, host="0.0.0.0", port=8766, remote_control=False,
+                 queue_size=16):
+        self.controller = controller
+        self.host = host
+        self.port = port
+        self.remote_control = remote_control
+        self.queue_size = queue_size
+        self.clients = set()
+        self.authority = None  # RelayClient currently allowed to drive
+        self.published = 0
+        self.forwarded = 0
+        self.refused = 0
+        self.dropped = 0  # Of clients that have since disconnected
+        self._last_message = None  # Sent to clients as they join
+        self._server = None
+
+    def stats(self):
+        return {
+            "clients": len(self.clients),
+            "published": self.published,
+            "forwarded": self.forwarded,
+            "refused": self.refused,
+            "dropped": self.dropped + sum(client.dropped for client in self.clients),
+            "authority": self.holder(),
+        }
+
+    def holder(self):
+        """Who may drive: a client's name, "host" when observe-only, or None."""
+        if not self.remote_control:
+            return "host"
+        return self.authority.name if self.authority is not None else None
+
+    async def start(self):
+        self._server = await websockets.serve(self._serve, self.host, self.port)
+        self.controller.on_message = self.publish
+        metrics = self.controller.metrics
+        metrics.gauge("relay_clients", lambda: len(self.clients))
+        metrics.rate("relay_published_per_s", lambda: self.published)
+        metrics.gauge("relay_dropped", lambda: self.stats()["dropped"])
+        self.controller.log(f"Relay listening on ws://{self.host}:{self.port}")
+        return self._server
+
+    async def close(self):
+        if self.controller.on_message == self.publish:
+            self.controller.on_message = None
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def publish(self, message):
+        """Queue one rover message for every client (shared, not copied)."""
+        self.published += 1
+        self._last_message = message
+        as_json = None
+        for client in self.clients:
+            if client.binary or not isinstance(message, bytes):
+                client.push(message)
+            else:
+                if as_json is None:
+                    as_json = self._as_json(message)  # Once, for all JSON clients
+                client.push(as_json)
+
+    @staticmethod
+    def _as_json(message):
+        try:
+            return telemetry_json(message)
+        except ProtocolError:
+            return message  # Not telemetry; pass it on unchanged
+
+    async def _serve(self, websocket):
+        client = RelayClient(websocket, self.queue_size)
+        writer = asyncio.ensure_future(client.write())
+        self.clients.add(client)
+        try:
+            async for message in websocket:
+                await self._handle(client, message)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            writer.cancel()
+            self.clients.discard(client)
+            self.dropped += client.dropped
+            if client is self.authority:
+                self.authority = None
+                self.controller.log(f"Relay: {client.name} disconnected while driving - stopping")
+                self.controller.stop()
+
+    async def _handle(self, client, message):
+        try:
+            data = decode_command(message) if isinstance(message, bytes) else json.loads(message)
+        except (ProtocolError, ValueError):
+            return
+        if not isinstance(data, dict):
+            return
+        cmd = data.get("cmd")
+        if cmd == "hello":
+            # Same negotiation as the rover; then catch the client up
+            proto = data.get("proto")
+            client.binary = isinstance(proto, list) and BINARY_PROTOCOL in proto
+            await client.websocket.send(
+                json.dumps({"proto": BINARY_PROTOCOL if client.binary else "json"})
+            )
+            message = self._last_message
+            if message is not None:
+                as_is = client.binary or not isinstance(message, bytes)
+                client.push(message if as_is else self._as_json(message))
+        elif cmd == "ping":
+            client.push(json.dumps({"pong": data.get("t")}))
+        elif cmd == "authority":
+            if data.get("action") == "release":
+                if client is self.authority:
+                    self.authority = None
+                    self.controller.log(f"Relay: {client.name} released command authority")
+            else:
+                self._claim(client)
+            client.push(json.dumps({"authority": client is self.authority,
+                                    "holder": self.holder()}))
+        elif cmd not in _FORWARDED_COMMANDS:
+            return  # Includes a missing or non-string cmd
+        elif client is self.authority or self._claim(client):
+            # Sent like the controller's own commands: only while connected,
+            # renumbered in the controller's seq space and kept alive/stopped
+            # with its drive state
+            if self.controller.forward(data) is not None:
+                self.forwarded += 1
+        else:
+            self.refused += 1
+            client.refused += 1
+            if client.refused == 1:
+                client.push(json.dumps({"authority": False, "holder": self.holder()}))
+
+    def _claim(self, client):
+        """Give ``client`` authority if nobody holds it (and remote control is on)."""
+        if not self.remote_control or not self.controller.connected:
+            return False
+        if self.authority is None:
+            self.authority = client
+            self.controller.log(f"Relay: {client.name} has command authority")
+        return client is self.authority
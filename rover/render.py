@@ -0,0 +1,43 @@
+import cv2
+import numpy as np
+
+
+class FrameScaler:
+    """Scales BGR frames to a display size into a reused output buffer.
+
+    The buffer is only reallocated when the display size changes, so a
+    steady stream of frames costs one cv2.resize and no allocations.
+    """
+
+    def __init__(self):
+        self._buffer = None
+
+    def _buffer_for(self, width, height):
+        if self._buffer is None or self._buffer.shape[:2] != (height, width):
+            self._buffer = np.empty((height, width, 3), dtype=np.uint8)
+        return self._buffer
+
+    def scale(self, frame, width, height, writable=False):
+        """Return ``frame`` resized to width x height.
+
+        When no resize is needed the frame itself is returned, unless
+        ``writable`` is set, in which case it is copied into the buffer so
+        the caller can draw on it without touching the source frame.
+        """
+        src_height, src_width = frame.shape[:2]
+        if (src_width, src_height) == (width, height):
+            if not writable:
+                return frame
+            buffer = self._buffer_for(width, height)
+            np.copyto(buffer, frame)
+            return buffer
+
+        buffer = self._buffer_for(width, height)
+        # INTER_AREA avoids aliasing when shrinking; INTER_LINEAR is cheaper
+        # and looks the same when enlarging
+        if width < src_width and height < src_height:
+            interpolation = cv2.INTER_AREA
+        else:
+            interpolation = cv2.INTER_LINEAR
+        cv2.resize(frame, (width, height), dst=buffer, interpolation=interpolation)
+        return buffer
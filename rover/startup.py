@@ -0,0 +1,24 @@
+import time
+
+
+class StartupTimer:
+    """Records how long after launch each startup milestone was reached."""
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.marks = {}
+
+    def mark(self, name):
+        """Record a milestone once; returns True the first time it is seen."""
+        if name in self.marks:
+            return False
+        self.marks[name] = time.perf_counter() - self.start
+        return True
+
+    def has(self, *names):
+        return all(name in self.marks for name in names)
+
+    def report(self):
+        """One-line summary such as 'ui_ready 0.42s | first_frame 0.91s'."""
+        ordered = sorted(self.marks.items(), key=lambda item: item[1])
+        return " | ".join(f"{name} {elapsed:.2f}s" for name, elapsed in ordered)
@@ -0,0 +1,68 @@
+import time
+
+from rover.timeseries import RingSeries
+
+
+class TelemetryState:
+    """In-memory store of the latest telemetry values.
+
+    Ingestion (``update``) only records values and remembers which fields
+    actually changed; presentation code pulls those changes with
+    ``take_changes`` at its own pace, so the message rate never dictates
+    how often widgets are repainted.
+    """
+
+    FIELDS = ("battery", "pitch", "roll", "arm")
+    JSON_KEYS = ("battery", "imu", "arm")  # A JSON message with none of these is no telemetry
+    HISTORY = 180000  # Samples kept for the plots: 30 minutes at 100 Hz
+
+    def __init__(self, history=HISTORY):
+        self.values = dict.fromkeys(self.FIELDS)
+        self.messages = 0
+        self.last_update = None  # time.monotonic() of the last message
+        self._changed = set()
+        # One row per message, columns in FIELDS order (NaN = not reported)
+        self.history = RingSeries(history, len(self.FIELDS))
+
+    @classmethod
+    def is_telemetry(cls, message):
+        """Whether a decoded JSON message carries telemetry (not e.g. a command ack)."""
+        return isinstance(message, dict) and any(key in message for key in cls.JSON_KEYS)
+
+    def update(self, telemetry):
+        """Merge one decoded JSON telemetry message into the store."""
+        imu = telemetry.get("imu")
+        if not isinstance(imu, dict):
+            imu = {}  # Missing or malformed
+        arm = telemetry.get("arm")
+        if not isinstance(arm, (dict, int, float)):
+            arm = None  # A number, or {"joint1": angle} from the JSON firmware
+        self.update_fields(telemetry.get("battery"), imu.get("pitch"),
+                           imu.get("roll"), arm)
+
+    def update_fields(self, battery, pitch, roll, arm):
+        """Merge telemetry values directly (the binary protocol path)."""
+        self.messages += 1
+        self.last_update = time.monotonic()
+        self._set("battery", battery)
+        self._set("pitch", pitch)
+        self._set("roll", roll)
+        self._set("arm", arm)
+        # Only numbers are plotted (JSON firmware reports the arm as {"joint1": angle})
+        self.history.append(self.last_update, *(
+            value if isinstance(value, (int, float)) else None
+            for value in (battery, pitch, roll, arm)
+        ))
+
+    def _set(self, field, value):
+        if value is not None and self.values[field] != value:
+            self.values[field] = value
+            self._changed.add(field)
+
+    def take_changes(self):
+        """Return {field: value} for fields changed since the last call."""
+        if not self._changed:
+            return {}
+        changes = {field: self.values[field] for field in self._changed}
+        self._changed.clear()
+        return changes
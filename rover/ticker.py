@@ -0,0 +1,79 @@
+"""Periodic work on monotonic deadlines.
+
+A loop of ``await asyncio.sleep(interval)`` (or a repeating QTimer)
+drifts: every tick starts ``interval`` after the previous one *woke*,
+so whatever made one tick late delays all the following ones. ``Ticker``
+computes each deadline from the start time instead, and ``sleep_until``
+gets there precisely even on qasync, whose long timers are Qt coarse
+timers (they may fire up to 5% early or late).
+"""
+import asyncio
+
+from rover.metrics import Timing
+
+FINE_WINDOW = 0.02  # Seconds; the last stretch before a deadline is slept separately
+
+
+async def sleep_until(deadline):
+    """Sleep until the loop's monotonic clock reaches ``deadline``."""
+    loop = asyncio.get_running_loop()
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return
+        # Coarse sleep up to the fine window, then a short precise one; if a
+        # timer fires early the loop simply sleeps the rest
+        await asyncio.sleep(remaining - FINE_WINDOW if remaining > 2 * FINE_WINDOW else remaining)
+
+
+class Ticker:
+    """Calls ``callback()`` every ``interval`` seconds on the event loop.
+
+    Ticks are due at start + n * interval. A late tick does not push the
+    later ones back; if the loop stalled for more than a whole interval
+    the missed ticks are skipped (counted in ``skipped``) rather than run
+    back to back. Lateness of every tick is kept in ``lateness`` (ms) and,
+    when ``metrics`` is given, observed there as ``<name>_late_ms``.
+    """
+
+    def __init__(self, callback, interval, metrics=None, name="tick"):
+        self.callback = callback
+        self.interval = interval
+        self.metrics = metrics
+        self.name = name
+        self.lateness = Timing()
+        self.ticks = 0
+        self.skipped = 0
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return self._task
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def stats(self):
+        return {"ticks": self.ticks, "skipped": self.skipped,
+                "late_ms": self.lateness.summary()}
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while True:
+            deadline += self.interval
+            await sleep_until(deadline)
+            late = loop.time() - deadline
+            if late >= self.interval:
+                missed = int(late // self.interval)
+                self.skipped += missed
+                deadline += missed * self.interval
+                late -= missed * self.interval
+            self.lateness.observe(late * 1000)
+            if self.metrics is not None:
+                self.metrics.observe(f"{self.name}_late_ms", late * 1000)
+            self.ticks += 1
+            self.callback()
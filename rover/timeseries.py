@@ -0,0 +1,118 @@
+"""Telemetry history on preallocated numpy ring buffers, and downsampling.
+
+A 30 minute window at 100 Hz is 180 000 samples per field - far more
+than a plot a few hundred pixels wide can show. ``minmax_downsample``
+keeps each bucket's extremes (spikes stay visible), ``lttb`` the points
+that best preserve the line's shape; either brings the window down to
+about two points per pixel before anything is drawn.
+"""
+import numpy as np
+
+
+class RingSeries:
+    """Fixed-capacity time series with one or more value columns.
+
+    Appending writes into preallocated arrays (no allocation per sample);
+    once full, the oldest samples are overwritten. Times must not go
+    backwards.
+    """
+
+    def __init__(self, capacity, columns=1):
+        self.capacity = capacity
+        self.times = np.zeros(capacity)
+        self.values = np.full((capacity, columns), np.nan)
+        self.count = 0  # Total appended, including overwritten ones
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, t, *values):
+        index = self.count % self.capacity
+        self.times[index] = t
+        self.values[index] = values  # numpy stores None as NaN
+        self.count += 1
+
+    def clear(self):
+        self.count = 0
+
+    def window(self, start=None, end=None):
+        """(times, values) in time order with start <= t <= end, as copies."""
+        size = len(self)
+        if size < self.capacity:
+            segments = [(0, size)]
+        else:
+            head = self.count % self.capacity  # Oldest sample
+            segments = [(head, self.capacity), (0, head)]
+        times, values = [], []
+        for lo, hi in segments:
+            seg = self.times[lo:hi]
+            first = lo + (np.searchsorted(seg, start, "left") if start is not None else 0)
+            last = lo + (np.searchsorted(seg, end, "right") if end is not None else hi - lo)
+            times.append(self.times[first:last])
+            values.append(self.values[first:last])
+        return np.concatenate(times), np.concatenate(values)
+
+
+def minmax_downsample(t, y, buckets):
+    """Keep the minimum and maximum of ``buckets`` equal-count slices, in time order.
+
+    NaN samples (missing values) are dropped first.
+    """
+    keep = ~np.isnan(y)
+    t, y = t[keep], y[keep]
+    if len(y) <= 2 * buckets:
+        return t, y
+    size = len(y) // buckets
+    usable = size * buckets
+    blocks = y[:usable].reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    lo = offsets + blocks.argmin(axis=1)
+    hi = offsets + blocks.argmax(axis=1)
+    indices = np.sort(np.concatenate([lo, hi, np.arange(usable, len(y))]))
+    return t[indices], y[indices]
+
+
+def lttb(t, y, threshold):
+    """Largest-Triangle-Three-Buckets downsampling to ``threshold`` points.
+
+    Smoother-looking than min/max but loops over the buckets in Python,
+    so it costs tens of ms on a full 30 minute window.
+    """
+    keep = ~np.isnan(y)
+    t, y = t[keep], y[keep]
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return t, y
+    bucket = (n - 2) / (threshold - 2)
+    edges = (np.arange(threshold - 1) * bucket).astype(int) + 1  # Last edge is n - 1
+    out = np.empty(threshold, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        # Average point of the next bucket
+        avg_t = t[hi:next_hi].mean()
+        avg_y = y[hi:next_hi].mean()
+        # Point of this bucket forming the largest triangle with the last kept one
+        area = np.abs((t[previous] - avg_t) * (y[lo:hi] - y[previous])
+                      - (t[previous] - t[lo:hi]) * (avg_y - y[previous]))
+        previous = lo + int(area.argmax())
+        out[i + 1] = previous
+    return t[out], y[out]
+
+
+def event_rate(times, start, end, buckets):
+    """Events per second in ``buckets`` equal time slices: (bucket centres, rates)."""
+    counts, edges = np.histogram(times, bins=buckets, range=(start, end))
+    width = (end - start) / buckets
+    return (edges[:-1] + edges[1:]) / 2, counts / width
+
+
+DOWNSAMPLERS = {"minmax": lambda t, y, points: minmax_downsample(t, y, points // 2),
+                "lttb": lttb}
+
+
+def downsample(t, y, points, method="minmax"):
+    """Reduce one series to about ``points`` points with the named method."""
+    return DOWNSAMPLERS[method](t, y, points)
@@ -0,0 +1,113 @@
+import itertools
+
+
+def iou(a, b):
+    """Intersection over union of two (x1, y1, x2, y2) boxes."""
+    w = min(a[2], b[2]) - max(a[0], b[0])
+    h = min(a[3], b[3]) - max(a[1], b[1])
+    if w <= 0 or h <= 0:
+        return 0.0
+    inter = w * h
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+class Track:
+    """One object followed across inference runs."""
+
+    __slots__ = ("track_id", "box", "velocity", "conf", "name", "timestamp", "hits", "missed")
+
+    def __init__(self, track_id, box, conf, name, timestamp):
+        self.track_id = track_id
+        self.box = tuple(float(c) for c in box)
+        self.velocity = (0.0, 0.0, 0.0, 0.0)  # Pixels per second, per coordinate
+        self.conf = conf
+        self.name = name
+        self.timestamp = timestamp
+        self.hits = 1
+        self.missed = 0
+
+    def box_at(self, timestamp):
+        """The box extrapolated to ``timestamp`` at constant velocity."""
+        dt = timestamp - self.timestamp
+        return tuple(c + v * dt for c, v in zip(self.box, self.velocity))
+
+    def update(self, box, conf, timestamp, smoothing):
+        predicted = self.box_at(timestamp)
+        new_box = tuple(smoothing * p + (1 - smoothing) * m for p, m in zip(predicted, box))
+        dt = timestamp - self.timestamp
+        if dt > 0:
+            self.velocity = tuple(
+                smoothing * v + (1 - smoothing) * (new - old) / dt
+                for v, new, old in zip(self.velocity, new_box, self.box)
+            )
+        self.box = new_box
+        self.conf = conf
+        self.timestamp = timestamp
+        self.hits += 1
+        self.missed = 0
+
+
+class IoUTracker:
+    """Greedy IoU tracker that keeps boxes steady between inference runs.
+
+    Each result is matched to the existing tracks of the same class by IoU
+    against the tracks' predicted boxes, highest first. Matched boxes are
+    smoothed with that prediction, unmatched ones start new tracks, and a
+    track survives ``max_missed`` runs without a match so a target does not
+    blink out for one missed frame. ``tracks_at`` gives every track's box
+    extrapolated to a frame's timestamp for the frames in between runs.
+    """
+
+    def __init__(self, iou_threshold=0.3, max_missed=3, smoothing=0.4, min_hits=1):
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.smoothing = smoothing
+        self.min_hits = min_hits
+        self.tracks = []
+        self._ids = itertools.count(1)
+
+    def __len__(self):
+        return len(self.tracks)
+
+    def reset(self):
+        self.tracks = []
+
+    def update(self, detections, timestamp):
+        """Fold in one result: an iterable of (box, conf, name)."""
+        detections = list(detections)
+        predicted = [track.box_at(timestamp) for track in self.tracks]
+        pairs = sorted(
+            ((iou(box, det[0]), ti, di)
+             for ti, box in enumerate(predicted)
+             for di, det in enumerate(detections)
+             if self.tracks[ti].name == det[2]),
+            reverse=True,
+        )
+        matched_tracks, matched_dets = set(), set()
+        for score, ti, di in pairs:
+            if score < self.iou_threshold:
+                break
+            if ti in matched_tracks or di in matched_dets:
+                continue
+            box, conf, _ = detections[di]
+            self.tracks[ti].update(box, conf, timestamp, self.smoothing)
+            matched_tracks.add(ti)
+            matched_dets.add(di)
+
+        survivors = []
+        for ti, track in enumerate(self.tracks):
+            if ti not in matched_tracks:
+                track.missed += 1
+                if track.missed > self.max_missed:
+                    continue
+            survivors.append(track)
+        for di, (box, conf, name) in enumerate(detections):
+            if di not in matched_dets:
+                survivors.append(Track(next(self._ids), box, conf, name, timestamp))
+        self.tracks = survivors
+
+    def tracks_at(self, timestamp=None):
+        """(track, box) for confirmed tracks, extrapolated to ``timestamp`` if given."""
+        return [(track, track.box if timestamp is None else track.box_at(timestamp))
+                for track in self.tracks if track.hits >= self.min_hits]
@@ -0,0 +1,175 @@
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+
+import cv2
+
+from rover.detection import draw_detections
+
+
+class VideoRecorder(threading.Thread):
+    """Records camera frames to segmented video files on its own thread.
+
+    ``submit`` never blocks: frames go through a bounded queue and are
+    dropped (and counted) when the writer falls behind, so recording can
+    never stall the capture or display path. Each frame's capture time is
+    written to ``index.csv`` as seconds since ``start_time`` - pass the
+    flight recorder's start time to put video and telemetry on the same
+    timeline.
+
+    ``overlay`` controls detections: "burn" draws them into the video,
+    "sidecar" writes them to ``detections.jsonl`` keyed by segment/frame,
+    "none" ignores them.
+
+    When free disk space drops below ``min_free_mb`` the recorder first
+    halves the recorded frame rate (repeatedly) and finally pauses until
+    space is available again.
+    """
+
+    def __init__(self, directory, start_time=None, fps=25.0, fourcc="MJPG",
+                 segment_seconds=300, overlay="sidecar", queue_size=32,
+                 min_free_mb=500):
+        super().__init__(name="video-recorder", daemon=True)
+        self.directory = directory
+        self.start_time = time.monotonic() if start_time is None else start_time
+        self.fps = fps
+        self.fourcc = fourcc
+        self.segment_seconds = segment_seconds
+        self.overlay = overlay
+        self.min_free_bytes = min_free_mb * 1024 * 1024
+        self.frames_written = 0
+        self.frames_dropped = 0  # Queue full: the writer could not keep up
+        self.frames_skipped = 0  # Deliberately skipped to save disk
+        self.segments = 0
+        self.status = "starting"
+        self.last_error = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stop_event = threading.Event()
+        self._writer = None
+        self._segment_started = None
+        self._segment_frame = 0
+        self._frame_size = None
+        self._keep_every = 1  # Degradation: record every Nth frame
+        self._submitted = 0
+        self._next_disk_check = 0.0
+
+    def stats(self):
+        """Snapshot of the recorder counters."""
+        return {
+            "status": self.status,
+            "written": self.frames_written,
+            "dropped": self.frames_dropped,
+            "skipped": self.frames_skipped,
+            "segments": self.segments,
+            "keep_every": self._keep_every,
+        }
+
+    def submit(self, frame, timestamp, detections=None):
+        """Queue a frame (captured at monotonic ``timestamp``) for recording."""
+        self._submitted += 1
+        if self._submitted % self._keep_every:
+            self.frames_skipped += 1
+            return
+        try:
+            self._queue.put_nowait((frame, timestamp, detections))
+        except queue.Full:
+            self.frames_dropped += 1
+
+    def _check_disk(self, now):
+        if now < self._next_disk_check:
+            return self.status != "paused"
+        self._next_disk_check = now + 1.0
+        free = shutil.disk_usage(self.directory).free
+        if free >= self.min_free_bytes:
+            if self.status in ("degraded", "paused") and free >= 2 * self.min_free_bytes:
+                self._keep_every = 1
+                self.status = "recording"
+            elif self.status == "paused":
+                self.status = "degraded"
+            return True
+        if self._keep_every < 8:
+            self._keep_every *= 2
+            self.status = "degraded"
+            return True
+        self.status = "paused"
+        return False
+
+    def _open_segment(self, frame_size):
+        if self._writer is not None:
+            self._writer.release()
+        path = os.path.join(self.directory, f"segment_{self.segments:03d}.avi")
+        self._writer = cv2.VideoWriter(
+            path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, frame_size
+        )
+        if not self._writer.isOpened():
+            raise OSError(f"Could not open video writer for {path}")
+        self._frame_size = frame_size
+        self._segment_started = time.monotonic()
+        self._segment_frame = 0
+        self.segments += 1
+
+    def _write(self, frame, timestamp, detections, index, sidecar):
+        frame_size = (frame.shape[1], frame.shape[0])
+        if (self._writer is None or frame_size != self._frame_size or
+                time.monotonic() - self._segment_started >= self.segment_seconds):
+            self._open_segment(frame_size)
+
+        if detections and self.overlay == "burn":
+            frame = frame.copy()
+            draw_detections(frame, detections)
+        self._writer.write(frame)
+
+        segment = self.segments - 1
+        t = timestamp - self.start_time
+        index.write(f"{segment},{self._segment_frame},{t:.6f}\n")
+        if detections and self.overlay == "sidecar":
+            sidecar.write(json.dumps({
+                "segment": segment, "frame": self._segment_frame, "t": round(t, 6),
+                "detections": [[d.x1, d.y1, d.x2, d.y2, round(d.conf, 3), d.name]
+                               for d in detections],
+            }) + "\n")
+        self._segment_frame += 1
+        self.frames_written += 1
+
+    def run(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            index = open(os.path.join(self.directory, "index.csv"), "w")
+            sidecar = open(os.path.join(self.directory, "detections.jsonl"), "w")
+        except OSError as e:
+            self.last_error = e
+            self.status = "failed"
+            return
+
+        index.write("segment,frame,t\n")
+        self.status = "recording"
+        with index, sidecar:
+            while not (self._stop_event.is_set() and self._queue.empty()):
+                try:
+                    frame, timestamp, detections = self._queue.get(timeout=0.2)
+                except queue.Empty:
+                    continue
+                try:
+                    if not self._check_disk(time.monotonic()):
+                        self.frames_skipped += 1
+                        continue
+                    self._write(frame, timestamp, detections, index, sidecar)
+                except OSError as e:
+                    # Keep going: a full disk may free up, a bad segment is skipped
+                    self.last_error = e
+                    self.frames_dropped += 1
+                    if self._writer is not None:
+                        self._writer.release()
+                        self._writer = None
+            if self._writer is not None:
+                self._writer.release()
+        self.status = "stopped"
+
+    def stop(self, timeout=3.0):
+        """Finish writing what is queued and close the files."""
+        self._stop_event.set()
+        if self.is_alive():
+            self.join(timeout)
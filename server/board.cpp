@@ -36,6 +36,38 @@ int batteryLevel = 100;
 float pitch = 0.0;
 float roll = 0.0;
 
+// Binary protocol "bin1" (frame layouts documented in rover/protocol.py).
+// Every frame: <uint8 version><uint8 type><uint32 seq><payload>, little-endian.
+const uint8_t PROTO_VERSION = 1;
+const uint8_t MSG_TELEMETRY = 0x01;
+const uint8_t MSG_MOVE = 0x10;
+const uint8_t MSG_ARM = 0x11;
+const uint8_t MSG_CAMERA = 0x12;
+const uint8_t MSG_FLAG = 0x13;
+const uint8_t MSG_DRIVE = 0x14;
+const char* DIRECTIONS[] = {
+  "stop", "forward", "backward", "left", "right",
+  "forward_left", "forward_right", "backward_left", "backward_right"
+};
+const uint8_t DIRECTION_COUNT = sizeof(DIRECTIONS) / sizeof(DIRECTIONS[0]);
+
+// Per-client wire format, chosen by the client's "hello" after connecting
+bool binaryClient[WEBSOCKETS_SERVER_CLIENT_MAX] = {false};
+uint32_t telemetrySeq = 0;
+
+// Last applied command, echoed in telemetry ("ack"/"ack_t", binary trailer)
+// so the client can tell confirmed commands from ones still in flight
+uint32_t lastCommandSeq = 0;
+double lastCommandT = 0;
+
+// Deadman: stop driving when no move command arrives for deadmanMs.
+// Disabled (0) until a client sends {"cmd":"deadman","ms":N}.
+const unsigned long TELEMETRY_INTERVAL_MS = 100;
+unsigned long deadmanMs = 0;
+unsigned long lastMoveMs = 0;
+unsigned long lastTelemetryMs = 0;
+bool moving = false;
+
 void setup() {
   Serial.begin(115200);
   
@@ -79,8 +111,16 @@ void loop() {
   if (millis() - lastBatteryUpdate > 10000) { // Every 10 seconds
     lastBatteryUpdate = millis();
     batteryLevel = max(0, batteryLevel - 1); // Decrease by 1% every 10 seconds
-    
-    // Send telemetry update
+  }
+  
+  if (moving && deadmanMs > 0 && millis() - lastMoveMs > deadmanMs) {
+    Serial.println("Deadman: no move command in time, stopping");
+    stopMotors();
+    sendTelemetry();
+  }
+  
+  // Regular telemetry also carries the command acks back to the client
+  if (millis() - lastTelemetryMs >= TELEMETRY_INTERVAL_MS && webSocket.connectedClients() > 0) {
     sendTelemetry();
   }
   
@@ -93,6 +133,7 @@ void webSocketEvent(uint8_t num, WStype_t type, uint8_t * payload, size_t length
   switch(type) {
     case WStype_DISCONNECTED:
       Serial.printf("[%u] Disconnected!\n", num);
+      binaryClient[num] = false;
       stopMotors();
       break;
       
@@ -106,7 +147,11 @@ void webSocketEvent(uint8_t num, WStype_t type, uint8_t * payload, size_t length
       break;
       
     case WStype_TEXT:
-      handleCommand((char*)payload);
+      handleCommand(num, (char*)payload);
+      break;
+      
+    case WStype_BIN:
+      handleBinaryCommand(payload, length);
       break;
       
     case WStype_ERROR:
@@ -118,7 +163,7 @@ void webSocketEvent(uint8_t num, WStype_t type, uint8_t * payload, size_t length
   }
 }
 
-void handleCommand(char* payload) {
+void handleCommand(uint8_t num, char* payload) {
   StaticJsonDocument<256> doc;
   DeserializationError error = deserializeJson(doc, payload);
   
@@ -129,46 +174,53 @@ void handleCommand(char* payload) {
   }
   
   const char* cmd = doc["cmd"];
+  if (cmd == nullptr) {
+    return;
+  }
+  if (doc.containsKey("seq")) {
+    lastCommandSeq = doc["seq"];
+    lastCommandT = doc["t"] | 0.0;
+  }
   
-  if (strcmp(cmd, "move") == 0) {
+  if (strcmp(cmd, "hello") == 0) {
+    // Protocol negotiation: switch this client to binary frames if offered
+    binaryClient[num] = false;
+    for (JsonVariant proto : doc["proto"].as<JsonArray>()) {
+      if (strcmp(proto | "", "bin1") == 0) {
+        binaryClient[num] = true;
+      }
+    }
+    String reply = binaryClient[num] ? "{\"proto\":\"bin1\"}" : "{\"proto\":\"json\"}";
+    webSocket.sendTXT(num, reply);
+  }
+  else if (strcmp(cmd, "ping") == 0) {
+    // Heartbeat: echo the client's timestamp so it can measure round-trip time
+    StaticJsonDocument<64> reply;
+    reply["pong"] = doc["t"];
+    String output;
+    serializeJson(reply, output);
+    webSocket.sendTXT(num, output);
+  }
+  else if (strcmp(cmd, "deadman") == 0) {
+    deadmanMs = constrain((long)(doc["ms"] | 0), 0L, 10000L);
+    Serial.printf("Deadman timeout set to %lu ms\n", deadmanMs);
+  }
+  else if (strcmp(cmd, "move") == 0) {
     const char* dir = doc["dir"];
     float speed = doc["speed"] | currentSpeed; // Use current speed if not specified
-    
-    if (strcmp(dir, "forward") == 0) {
-      moveForward(speed);
-    } else if (strcmp(dir, "backward") == 0) {
-      moveBackward(speed);
-    } else if (strcmp(dir, "left") == 0) {
-      turnLeft(speed);
-    } else if (strcmp(dir, "right") == 0) {
-      turnRight(speed);
-    } else if (strcmp(dir, "forward_left") == 0) {
-      moveForwardLeft(speed);
-    } else if (strcmp(dir, "forward_right") == 0) {
-      moveForwardRight(speed);
-    } else if (strcmp(dir, "backward_left") == 0) {
-      moveBackwardLeft(speed);
-    } else if (strcmp(dir, "backward_right") == 0) {
-      moveBackwardRight(speed);
-    } else if (strcmp(dir, "stop") == 0) {
-      stopMotors();
-    }
+    applyMove(dir, speed);
   } 
+  else if (strcmp(cmd, "drive") == 0) {
+    applyDrive(doc["throttle"] | 0.0f, doc["steering"] | 0.0f);
+  }
   else if (strcmp(cmd, "arm") == 0) {
     int joint = doc["joint"];
     int angle = doc["angle"];
-    
-    if (joint == 1) { // Main arm joint
-      armAngle = constrain(angle, 0, 180);
-      armServo.write(armAngle);
-      sendTelemetry();
-    }
+    applyArm(joint, angle);
   } 
   else if (strcmp(cmd, "camera") == 0) {
     int angle = doc["angle"];
-    cameraAngle = constrain(angle, 0, 180);
-    cameraServo.write(cameraAngle);
-    sendTelemetry();
+    applyCamera(angle);
   } 
   else if (strcmp(cmd, "flag") == 0) {
     const char* action = doc["action"];
@@ -178,7 +230,121 @@ void handleCommand(char* payload) {
   }
 }
 
+void handleBinaryCommand(uint8_t* payload, size_t length) {
+  if (length < 6 || payload[0] != PROTO_VERSION) {
+    Serial.println("Ignoring malformed binary frame");
+    return;
+  }
+  uint8_t type = payload[1];
+  memcpy(&lastCommandSeq, payload + 2, sizeof(lastCommandSeq));
+  lastCommandT = 0;  // Binary frames carry no client time; the client keeps it
+  const uint8_t* body = payload + 6;  // Skip version, type and seq
+  
+  if (type == MSG_MOVE && length >= 8) {
+    if (body[0] < DIRECTION_COUNT) {
+      applyMove(DIRECTIONS[body[0]], body[1] / 100.0);
+    }
+  }
+  else if (type == MSG_ARM && length >= 9) {
+    int16_t angle;
+    memcpy(&angle, body + 1, sizeof(angle));
+    applyArm(body[0], angle);
+  }
+  else if (type == MSG_CAMERA && length >= 8) {
+    int16_t angle;
+    memcpy(&angle, body, sizeof(angle));
+    applyCamera(angle);
+  }
+  else if (type == MSG_FLAG && length >= 7) {
+    dropFlag();
+  }
+  else if (type == MSG_DRIVE && length >= 10) {
+    int16_t throttle, steering;  // Thousandths
+    memcpy(&throttle, body, sizeof(throttle));
+    memcpy(&steering, body + 2, sizeof(steering));
+    applyDrive(throttle / 1000.0, steering / 1000.0);
+  }
+}
+
+void applyMove(const char* dir, float speed) {
+  if (dir == nullptr) {
+    return;
+  }
+  lastMoveMs = millis();
+  moving = strcmp(dir, "stop") != 0;
+  if (strcmp(dir, "forward") == 0) {
+    moveForward(speed);
+  } else if (strcmp(dir, "backward") == 0) {
+    moveBackward(speed);
+  } else if (strcmp(dir, "left") == 0) {
+    turnLeft(speed);
+  } else if (strcmp(dir, "right") == 0) {
+    turnRight(speed);
+  } else if (strcmp(dir, "forward_left") == 0) {
+    moveForwardLeft(speed);
+  } else if (strcmp(dir, "forward_right") == 0) {
+    moveForwardRight(speed);
+  } else if (strcmp(dir, "backward_left") == 0) {
+    moveBackwardLeft(speed);
+  } else if (strcmp(dir, "backward_right") == 0) {
+    moveBackwardRight(speed);
+  } else if (strcmp(dir, "stop") == 0) {
+    stopMotors();
+  }
+}
+
+// Analog differential drive: throttle and steering in -1..1 (positive =
+// forward, right), mixed into a signed speed per side
+void applyDrive(float throttle, float steering) {
+  float right = constrain(throttle - steering, -1.0f, 1.0f);
+  float left = constrain(throttle + steering, -1.0f, 1.0f);
+  lastMoveMs = millis();
+  if (right == 0 && left == 0) {
+    stopMotors();
+    return;
+  }
+  moving = true;
+  setWheel(motorA1, motorA2, right);
+  setWheel(motorB1, motorB2, left);
+}
+
+void setWheel(int forwardPin, int backwardPin, float value) {
+  int pwm = (int)(255 * fabs(value));
+  analogWrite(forwardPin, value > 0 ? pwm : 0);
+  analogWrite(backwardPin, value < 0 ? pwm : 0);
+}
+
+void applyArm(int joint, int angle) {
+  if (joint == 1) { // Main arm joint
+    armAngle = constrain(angle, 0, 180);
+    armServo.write(armAngle);
+    sendTelemetry();
+  }
+}
+
+void applyCamera(int angle) {
+  cameraAngle = constrain(angle, 0, 180);
+  cameraServo.write(cameraAngle);
+  sendTelemetry();
+}
+
 void sendTelemetry() {
+  telemetrySeq++;
+  lastTelemetryMs = millis();
+  
+  // Binary frame: <version><type><seq><battery u8><pitch i16><roll i16><arm u8><ack u32>
+  uint8_t frame[16];
+  int16_t pitchCenti = (int16_t)(pitch * 100);
+  int16_t rollCenti = (int16_t)(roll * 100);
+  frame[0] = PROTO_VERSION;
+  frame[1] = MSG_TELEMETRY;
+  memcpy(frame + 2, &telemetrySeq, sizeof(telemetrySeq));
+  frame[6] = (uint8_t)constrain(batteryLevel, 0, 255);
+  memcpy(frame + 7, &pitchCenti, sizeof(pitchCenti));
+  memcpy(frame + 9, &rollCenti, sizeof(rollCenti));
+  frame[11] = (uint8_t)constrain(armAngle, 0, 255);
+  memcpy(frame + 12, &lastCommandSeq, sizeof(lastCommandSeq));
+  
   StaticJsonDocument<256> doc;
   doc["battery"] = batteryLevel;
   
@@ -187,10 +353,23 @@ void sendTelemetry() {
   imu["roll"] = roll;
   
   doc["arm"] = armAngle;
+  doc["ack"] = lastCommandSeq;
+  doc["ack_t"] = lastCommandT;
   
   String output;
   serializeJson(doc, output);
-  webSocket.broadcastTXT(output);
+  
+  // Each client gets the format it negotiated
+  for (uint8_t num = 0; num < WEBSOCKETS_SERVER_CLIENT_MAX; num++) {
+    if (!webSocket.clientIsConnected(num)) {
+      continue;
+    }
+    if (binaryClient[num]) {
+      webSocket.sendBIN(num, frame, sizeof(frame));
+    } else {
+      webSocket.sendTXT(num, output);
+    }
+  }
 }
 
 // Movement functions
@@ -259,6 +438,7 @@ void moveBackwardRight(float speed) {
 }
 
 void stopMotors() {
+  moving = false;
   analogWrite(motorA1, 0);
   analogWrite(motorA2, 0);
   analogWrite(motorB1, 0);
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+from rover.bitrate import LADDER, BitrateController, FrameAge, control_url
+
+
+class FakeCapture:
+    frames_received = 0
+    bytes_received = 0
+    last_frame_timing = None
+
+
+def controller(**options):
+    bitrate = BitrateController(FakeCapture(), "http://cam/control", target_ms=300,
+                                expected_fps=20, **options)
+    bitrate.requests = []
+    bitrate._request = lambda var, value: bitrate.requests.append((var, value))
+    return bitrate
+
+
+def frames(bitrate, *ages_ms):
+    """Feed frames that arrive ``ages_ms`` later than the best one."""
+    for index, age in enumerate((0,) + ages_ms):
+        bitrate.capture.last_frame_timing = (float(index), index + 0.1 + age / 1000)
+        bitrate.sample()
+
+
+@pytest.mark.parametrize("stream, control", [
+    ("http://192.168.4.1:81/stream", "http://192.168.4.1/control"),
+    ("http://localhost:8080/stream", "http://localhost:8080/control"),
+])
+def test_control_url(stream, control):
+    assert control_url(stream) == control
+
+
+def test_frame_age_is_relative_to_the_best_case():
+    age = FrameAge()
+    assert age.update(10.0, 10.5) == 0
+    assert age.update(11.0, 11.8) == pytest.approx(300)
+    assert age.update(12.0, 12.4) == 0  # A new best case
+
+
+def test_steps_down_when_frames_are_late_or_starved():
+    bitrate = controller()
+    frames(bitrate, 50, 450)
+    assert bitrate.decide(100.0, 40, 100000, 2.0) == (2, "frame age 450 ms")
+    frames(bitrate, 10)
+    level, reason = bitrate.decide(100.0, 10, 100000, 2.0)
+    assert (level, reason) == (2, "5.0 fps")
+
+
+def test_steps_up_only_after_the_hold():
+    bitrate = controller(hold_s=6.0)
+    frames(bitrate, 20)
+    assert bitrate.decide(bitrate._last_change + 5, 40, 1, 2.0) == (1, None)
+    assert bitrate.decide(bitrate._last_change + 7, 40, 1, 2.0)[0] == 1  # No frames yet
+    frames(bitrate, 20)
+    assert bitrate.decide(bitrate._last_change + 7, 40, 1, 2.0)[0] == 0
+
+
+def test_apply_sends_only_what_changed_and_doubles_the_hold_after_a_bad_step_up():
+    async def run():
+        bitrate = controller(hold_s=6.0)
+        bitrate.fps, bitrate.kbps = 20.0, 500.0
+        assert await bitrate.apply(0, "frame age 20 ms")
+        assert bitrate.requests == [("quality", 10)]
+        frames(bitrate, 400, 400)
+        level, _ = bitrate.decide(bitrate._last_change + 5, 40, 1, 2.0)
+        return bitrate, level
+
+    bitrate, level = asyncio.run(run())
+    assert level == 1
+    assert bitrate.hold_s == 12.0
+    assert [(old, new) for _, old, new, _ in bitrate.adjustments] == [(1, 0)]
+
+
+def test_failed_camera_request_keeps_the_level():
+    async def run():
+        bitrate = controller()
+        bitrate.fps, bitrate.kbps = 20.0, 500.0
+
+        def fail(var, value):
+            raise OSError("timed out")
+
+        bitrate._request = fail
+        logs = []
+        bitrate.on_log = logs.append
+        ok = await bitrate.apply(len(LADDER) - 1, "test")
+        return bitrate, ok, logs
+
+    bitrate, ok, logs = asyncio.run(run())
+    assert not ok and bitrate.level == 1 and bitrate.failures == 1
+    assert "could not set" in logs[0]
+
+
+def test_camera_reboot_resets_the_age_baseline():
+    bitrate = controller()
+    frames(bitrate, 0)
+    bitrate.capture.last_frame_timing = (0.5, 500.0)  # Camera clock went backwards
+    bitrate.sample()
+    assert bitrate._ages[-1] == 0
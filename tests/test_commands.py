@@ -0,0 +1,79 @@
+import asyncio
+
+from rover.commands import CommandScheduler
+
+
+def test_pending_commands_coalesce_per_channel():
+    async def run():
+        sent = []
+
+        async def send(msg):
+            sent.append(msg)
+
+        scheduler = CommandScheduler(send, max_rate=1000)
+        scheduler.submit({"cmd": "move", "dir": "forward"})
+        scheduler.submit({"cmd": "arm", "joint": 1, "angle": 10})
+        scheduler.submit({"cmd": "drive", "throttle": 0.5, "steering": 0})
+        scheduler.submit({"cmd": "arm", "joint": 2, "angle": 30})
+        scheduler.submit({"cmd": "arm", "joint": 1, "angle": 20})
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        scheduler.stop()
+        return sent, scheduler
+
+    sent, scheduler = asyncio.run(run())
+    # Oldest channel first, each with its newest value
+    assert sent == [
+        {"cmd": "drive", "throttle": 0.5, "steering": 0},
+        {"cmd": "arm", "joint": 1, "angle": 20},
+        {"cmd": "arm", "joint": 2, "angle": 30},
+    ]
+    assert scheduler.coalesced == 2
+    assert scheduler.queue_depth == 0
+
+
+def test_stop_and_flag_go_first_and_drop_the_queued_move():
+    async def run():
+        sent = []
+
+        async def send(msg):
+            sent.append(msg)
+
+        scheduler = CommandScheduler(send, max_rate=1000)
+        scheduler.submit({"cmd": "camera", "angle": 5})
+        scheduler.submit({"cmd": "move", "dir": "forward"})
+        scheduler.submit({"cmd": "flag", "action": "drop"})
+        scheduler.submit({"cmd": "drive", "throttle": 0, "steering": 0})
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        scheduler.stop()
+        return sent, scheduler
+
+    sent, scheduler = asyncio.run(run())
+    assert sent == [
+        {"cmd": "flag", "action": "drop"},
+        {"cmd": "drive", "throttle": 0, "steering": 0},
+        {"cmd": "camera", "angle": 5},
+    ]
+    assert scheduler.urgent_sent == 2
+    assert scheduler.coalesced == 1
+
+
+def test_rate_limit_spaces_out_pending_commands():
+    async def run():
+        times = []
+
+        async def send(msg):
+            times.append(asyncio.get_running_loop().time())
+
+        scheduler = CommandScheduler(send, max_rate=20)
+        scheduler.start()
+        for joint in range(1, 4):
+            scheduler.submit({"cmd": "arm", "joint": joint, "angle": 0})
+        await asyncio.sleep(0.3)
+        scheduler.stop()
+        return times
+
+    times = asyncio.run(run())
+    assert len(times) == 3
+    assert all(b - a >= 0.045 for a, b in zip(times, times[1:]))
@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+import websockets
+
+from rover.controller import RoverController
+
+
+class FakeRover:
+    """WebSocket server recording the commands of each session."""
+
+    def __init__(self):
+        self.sessions = []
+        self.first_move = None
+        self.server = None
+
+    async def start(self):
+        self.first_move = asyncio.Event()
+        self.server = await websockets.serve(self._handle, "localhost", 0)
+        return f"ws://localhost:{self.server.sockets[0].getsockname()[1]}"
+
+    async def _handle(self, ws):
+        commands = []
+        self.sessions.append(commands)
+        async for message in ws:
+            msg = json.loads(message)
+            commands.append(msg)
+            if msg.get("cmd") == "move" and len(self.sessions) == 1:
+                self.first_move.set()
+                await ws.close()  # Drop the first session mid-drive
+
+    def close(self):
+        self.server.close()
+
+
+def moves(commands):
+    return [c for c in commands if c.get("cmd") == "move"]
+
+
+def test_no_move_after_reconnect():
+    async def run():
+        rover = FakeRover()
+        url = await rover.start()
+        controller = RoverController(url, protocol="json", deadman=0.3, min_backoff=0.05)
+        controller.start()
+        assert await controller.wait_connected(5)
+        controller.move("forward")
+        await asyncio.wait_for(rover.first_move.wait(), 5)
+        while len(rover.sessions) < 2 or not controller.connected:
+            await asyncio.sleep(0.02)
+        await asyncio.sleep(0.5)  # Several keepalive periods
+        await controller.close()
+        rover.close()
+        return rover.sessions
+
+    sessions = asyncio.run(run())
+    assert moves(sessions[0])[0]["dir"] == "forward"
+    assert [c["cmd"] for c in sessions[1]] == ["deadman"]
+
+
+def test_non_telemetry_json_is_not_stored():
+    controller = RoverController(protocol="json")
+    logged = []
+    controller.on_log = logged.append
+    for message in ("[1, 2]", "42", '"text"', '{"proto": "json"}',
+                    '{"ack": 3, "cmd": "move", "rx": 1.5}'):
+        controller.handle_message(message)
+    assert controller.telemetry.messages == 0
+    assert controller.telemetry.history.count == 0
+    assert len(logged) == 3  # The list, number and string are reported as bad
+
+    controller.handle_message('{"battery": 80, "imu": {"pitch": 1.0, "roll": -2.0}}')
+    assert controller.telemetry.messages == 1
+    assert controller.telemetry.values["battery"] == 80
+
+
+def test_forward_renumbers_and_tracks_drive():
+    controller = RoverController(protocol="json")
+    assert controller.forward({"cmd": "move", "dir": "forward", "seq": 900}) is None
+
+    controller.connection.ws = object()  # Pretend a session is up
+    controller.move("left")
+    seq = controller.forward({"cmd": "move", "dir": "forward", "speed": 1, "seq": 900, "t": 5.0})
+    assert seq == controller.command_seq == 2
+    assert controller._drive == ("move", {"dir": "forward", "speed": 1})
+    sent, _ = list(controller.commands._pending.values())[-1]
+    assert sent["seq"] == 2 and sent["t"] != 5.0
+    assert controller.forward({"dir": "forward"}) is None
+    assert controller.command_seq == 2
@@ -0,0 +1,62 @@
+import numpy as np
+
+from rover.detection import DetectionConfig, DetectionPipeline, parse_results
+
+
+class FakeBox:
+    def __init__(self, xyxy, conf, cls):
+        self.xyxy = [xyxy]
+        self.conf = [conf]
+        self.cls = [cls]
+
+
+class FakeResult:
+    names = {0: "person", 1: "dog"}
+
+    def __init__(self, *boxes):
+        self.boxes = boxes
+
+
+FRAME = np.zeros((480, 640, 3), dtype=np.uint8)
+
+
+def tracked_pipeline(**options):
+    pipeline = DetectionPipeline(DetectionConfig(**options))
+    pipeline.prepare(FRAME, 0.0)  # First run: full frame
+    pipeline.finish(parse_results([FakeResult(FakeBox((300, 200, 340, 240), 0.9, 0))]), 0.0)
+    return pipeline
+
+
+def test_roi_crop_around_tracks_maps_back_to_the_frame():
+    pipeline = tracked_pipeline()
+    image, offset, full = pipeline.prepare(FRAME, 0.0)
+    # 40 px box grown to the 160 px minimum, centred on the track
+    assert not full
+    assert offset == (240, 140)
+    assert image.shape == (160, 160, 3)
+    assert pipeline.last_roi == (240, 140, 400, 300)
+    detections = parse_results([FakeResult(FakeBox((65, 65, 105, 105), 0.8, 0))], offset)
+    assert (detections[0].x1, detections[0].y1) == (305, 205)
+    pipeline.finish(detections, 0.1)
+    assert [d.track_id for d in pipeline.detections()] == [1]
+
+
+def test_full_frame_every_full_every_runs():
+    pipeline = tracked_pipeline(full_every=3)
+    assert pipeline.prepare(FRAME, 0.0)[2] is False
+    assert pipeline.prepare(FRAME, 0.0)[2] is True
+    assert pipeline.roi_runs == 1
+
+
+def test_large_roi_falls_back_to_the_full_frame():
+    pipeline = tracked_pipeline(roi_min_size=600)
+    image, offset, full = pipeline.prepare(FRAME, 0.0)
+    assert full and offset == (0, 0) and image is FRAME
+
+
+def test_class_filter():
+    pipeline = DetectionPipeline(DetectionConfig(classes=["dog"], track=False))
+    pipeline.finish(parse_results([FakeResult(FakeBox((0, 0, 10, 10), 0.9, 0),
+                                              FakeBox((5, 5, 20, 20), 0.7, 1))]), 0.0)
+    assert [d.name for d in pipeline.detections()] == ["dog"]
+    assert pipeline.model_options(FakeResult())["classes"] == [1]
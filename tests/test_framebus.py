@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from rover.framebus import FrameBus
+
+
+def frame(value, shape=(4, 6, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_take_returns_newest_frame_as_readonly_view():
+    with FrameBus.create(slots=3, max_shape=(4, 6, 3)) as bus:
+        assert bus.take() is None
+        for value in range(5):
+            assert bus.put(frame(value), timestamp=float(value))
+        seq, timestamp, view = bus.take()
+        assert (seq, timestamp) == (5, 4.0)
+        assert (view == 4).all() and not view.flags.writeable
+        assert bus.take(after=seq) is None
+        del view  # Views must go before the bus is closed
+
+        reader = FrameBus.attach(bus.name)
+        assert reader.take()[0] == 5
+        assert not reader.valid(2)  # Overwritten: only `slots` frames are kept
+        reader.close()
+
+
+def test_smaller_frames_fit_and_larger_are_rejected():
+    with FrameBus.create(slots=2, max_shape=(4, 6, 3)) as bus:
+        assert bus.put(frame(1, (2, 3)))
+        assert bus.take()[2].shape == (2, 3)
+        assert not bus.put(frame(1, (8, 6, 3)))
+        assert (bus.rejected, bus.rejected_shape) == (1, (8, 6, 3))
+
+
+def test_close_with_live_views():
+    bus = FrameBus.create(slots=2, max_shape=(4, 6, 3))
+    bus.put(frame(7))
+    view = bus.take()[2]
+    with pytest.raises(BufferError):
+        bus.close()  # The view keeps the mapping
+    assert int(view.sum()) == 7 * view.size
+    assert not bus.put(frame(8))
+    with pytest.raises(FileNotFoundError):
+        FrameBus.attach(bus.name)  # But the name is gone
+    del view
+    bus.close()
+    bus.close()
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from rover.gamepad import DriveStreamer, VirtualGamepad, apply_deadzone
+
+
+@pytest.mark.parametrize("value, expected", [
+    (0.05, 0.0), (-0.1, 0.0), (0.55, 0.5), (-0.55, -0.5), (1.0, 1.0),
+])
+def test_deadzone(value, expected):
+    assert apply_deadzone(value, 0.1) == pytest.approx(expected)
+
+
+class FakeController:
+    def __init__(self):
+        self.drives = []
+
+    def drive(self, throttle, steering):
+        self.drives.append((throttle, steering))
+        return True
+
+
+def run(steps, **options):
+    """Poll a streamer at 100 Hz, applying ``steps`` (callables) 50 ms apart."""
+    controller, pad = FakeController(), VirtualGamepad()
+    streamer = DriveStreamer(controller, pad, rate=100, smoothing=0, **options)
+
+    async def drive():
+        streamer.start()
+        for step in steps:
+            step(pad, streamer)
+            await asyncio.sleep(0.05)
+        streamer.stop()
+
+    asyncio.run(drive())
+    return controller.drives, streamer
+
+
+def test_unchanged_stick_is_suppressed():
+    drives, streamer = run([
+        lambda pad, _: pad.set_axis(1, -1.0),  # Full forward
+        lambda pad, _: pad.set_axis(0, 0.05),  # Inside the deadzone
+        lambda pad, _: pad.set_axis(0, 0.54),
+        lambda pad, _: pad.set_axis(1, 0.0) or pad.set_axis(0, 0.0),
+    ])
+    assert drives == [(1.0, 0.0), (1.0, 0.5), (0.0, 0.0)]
+    assert streamer.suppressed > 0
+
+
+def test_centred_stick_sends_nothing():
+    drives, _ = run([lambda pad, _: None])
+    assert drives == []
+
+
+def test_held_stick_is_resent_after_a_stop_elsewhere():
+    drives, _ = run([
+        lambda pad, _: pad.set_axis(1, -0.54),
+        lambda _, streamer: streamer.stopped_elsewhere(),
+    ])
+    assert drives == [(0.5, 0.0), (0.5, 0.0)]
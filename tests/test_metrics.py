@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+from rover.metrics import Metrics, MetricsServer, Timing, format_hud, prometheus_text
+
+
+def test_timings_only_while_enabled():
+    metrics = Metrics()
+    with metrics.time("render_ms"):
+        pass
+    metrics.observe("decode_ms", 3.0)
+    assert metrics.snapshot()["timings"] == {}
+    metrics.enable("hud")
+    metrics.enable("exporter")
+    metrics.observe("decode_ms", 3.0)
+    metrics.disable("hud")
+    assert metrics.enabled  # The exporter still wants them
+    metrics.disable("exporter")
+    assert not metrics.enabled
+    assert metrics.snapshot()["timings"]["decode_ms"]["n"] == 1
+
+
+def test_timing_summary_over_the_window():
+    timing = Timing(size=4)
+    assert timing.summary() is None
+    for ms in (100, 1, 2, 3, 4):  # The 100 has been overwritten
+        timing.observe(ms)
+    summary = timing.summary()
+    assert (summary["n"], summary["last"], summary["max"]) == (5, 4, 4)
+    assert summary["p50"] == 2.5
+
+
+def test_gauges_and_rates():
+    metrics = Metrics()
+    metrics.RATE_INTERVAL = 0
+    count = [0]
+    metrics.gauge("rtt_ms", lambda: 12.5)
+    metrics.gauge("broken", lambda: 1 / 0)
+    metrics.rate("frames_per_s", lambda: count[0])
+    first = metrics.snapshot()
+    assert first["gauges"] == {"rtt_ms": 12.5, "broken": None}
+    assert first["rates"] == {"frames_per_s": None}  # Needs two samples
+    count[0] = 1000
+    assert metrics.snapshot()["rates"]["frames_per_s"] > 0
+    assert any(line.startswith("rtt_ms") and "12.5" in line
+               for line in format_hud(metrics.snapshot()))
+
+
+def test_prometheus_text():
+    metrics = Metrics()
+    metrics.enable("test")
+    metrics.gauge("video-kbps", lambda: 640)
+    metrics.gauge("state", lambda: "connected")  # Not a number: left out
+    metrics.observe("send_ms", 2.0)
+    text = prometheus_text({"alpha": metrics})
+    assert 'rover_video_kbps{rover="alpha"} 640\n' in text
+    assert 'rover_send_ms{rover="alpha",quantile="0.95"} 2.0\n' in text
+    assert 'rover_send_ms_count{rover="alpha"} 1\n' in text
+    assert "state" not in text
+
+
+def test_server_endpoints():
+    async def fetch(port, path):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+        response = await reader.read()
+        writer.close()
+        head, _, body = response.decode().partition("\r\n\r\n")
+        return head.split("\r\n")[0], body
+
+    async def run():
+        metrics = Metrics()
+        metrics.gauge("battery", lambda: 80)
+        server = MetricsServer({"alpha": metrics}, port=0)
+        await server.start()
+        port = server._server.sockets[0].getsockname()[1]
+        assert metrics.enabled
+        results = [await fetch(port, path) for path in ("/metrics", "/metrics.json", "/x")]
+        server.close()
+        assert not metrics.enabled
+        return results
+
+    (status, text), (_, raw), (missing, _) = asyncio.run(run())
+    assert status == "HTTP/1.1 200 OK" and 'rover_battery{rover="alpha"} 80' in text
+    assert json.loads(raw)["alpha"]["gauges"] == {"battery": 80}
+    assert missing == "HTTP/1.1 404 Not Found"
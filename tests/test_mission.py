@@ -0,0 +1,36 @@
+import pytest
+
+from rover.mission import Mission
+
+
+def test_parse_builds_timed_steps():
+    mission = Mission.parse(None, """
+        # Out and back
+        speed fast
+        drive forward 0.3
+        arm 120
+        wait 0.5
+        flag
+        drive backward 0.2 0.5
+    """)
+    assert mission.duration == pytest.approx(1.0)
+    labels = [label for _, label, _, _ in mission.steps]
+    assert labels.count("drive forward") == 3
+    assert labels[-1] == "stop"
+    offset, _, name, args = mission.steps[-2]
+    assert (name, args) == ("move", ("backward", 0.5))
+    assert offset == pytest.approx(0.9)
+
+
+@pytest.mark.parametrize("line, error", [
+    ("drive fowrad 2", "Unknown direction"),
+    ("drive forward", "index"),
+    ("drive forward fast", "could not convert"),
+    ("speed warp", "Unknown speed"),
+    ("jump 3", "unknown step"),
+])
+def test_parse_errors_name_the_line(line, error):
+    with pytest.raises(ValueError) as info:
+        Mission.parse(None, f"wait 1\n\n{line}\n")
+    assert str(info.value).startswith(f"Mission line 3: {line!r}:")
+    assert error in str(info.value)
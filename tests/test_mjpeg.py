@@ -0,0 +1,43 @@
+from rover.mjpeg import MultipartParser
+
+
+def part(body, length=True, boundary=b"frame"):
+    headers = b"Content-Type: image/jpeg\r\n"
+    if length:
+        headers += b"Content-Length: %d\r\n" % len(body)
+    return b"--" + boundary + b"\r\n" + headers + b"\r\n" + body + b"\r\n"
+
+
+def test_boundary_split_across_chunks():
+    parser = MultipartParser("frame")
+    stream = part(b"\xff\xd8one\xff\xd9") + part(b"\xff\xd8two\xff\xd9")
+    split = len(part(b"\xff\xd8one\xff\xd9")) + 4  # Inside the second "--frame"
+    assert parser.feed(stream[:split]) == 1
+    assert parser.take_latest()[1] == b"\xff\xd8one\xff\xd9"
+    assert parser.feed(stream[split:]) == 1
+    headers, jpeg = parser.take_latest()
+    assert jpeg == b"\xff\xd8two\xff\xd9"
+    assert headers["content-length"] == str(len(jpeg))
+    assert parser.take_latest() is None
+
+
+def test_byte_by_byte_without_content_length():
+    parser = MultipartParser('"--frame"')
+    stream = part(b"first", length=False) + part(b"second", length=False) + b"--frame\r\n"
+    completed = sum(parser.feed(stream[i:i + 1]) for i in range(len(stream)))
+    assert completed == 2
+    assert parser.take_latest() == ({"content-type": "image/jpeg"}, b"second")
+
+
+def test_only_the_newest_part_is_kept():
+    parser = MultipartParser("frame")
+    assert parser.feed(b"".join(part(b"jpeg%d" % i) for i in range(3))) == 3
+    assert parser.take_latest()[1] == b"jpeg2"
+    assert parser.parts_skipped == 2
+
+
+def test_bad_content_length_falls_back_to_the_boundary():
+    parser = MultipartParser("frame")
+    stream = (b"--frame\r\nContent-Length: 12ab\r\n\r\nbroken\r\n" + part(b"next"))
+    assert parser.feed(stream) == 2
+    assert parser.take_latest()[1] == b"next"
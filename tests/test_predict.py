@@ -0,0 +1,50 @@
+import math
+
+import pytest
+
+from rover.predict import PosePredictor, advance, drive_wheels
+
+
+def test_advance_straight_and_arc():
+    assert advance((0, 0, 0), 1.0, 0.0, 2.0) == pytest.approx((2.0, 0.0, 0.0))
+    # Half a circle of radius 1 ends two metres to the side, facing back
+    x, y, heading = advance((0, 0, 0), math.pi, math.pi, 1.0)
+    assert (x, y, heading) == pytest.approx((0.0, 2.0, math.pi), abs=1e-9)
+
+
+def test_drive_wheels_clamps():
+    assert drive_wheels(1.0, 0.5) == (0.5, 1.0)
+    assert drive_wheels(-1.0, -0.5) == (-0.5, -1.0)
+
+
+def test_moves_take_effect_after_one_way_latency():
+    predictor = PosePredictor(max_speed=1.0, turn_rate=1.0)
+    predictor.set_rtt(200)
+    predictor.command_sent({"cmd": "move", "dir": "forward", "seq": 1}, 10.0)
+    predictor.command_sent({"cmd": "move", "dir": "stop", "seq": 2}, 11.0)
+    assert predictor.pose_at(10.1) == pytest.approx((0, 0, 0))
+    assert predictor.pose_at(10.6)[0] == pytest.approx(0.5)
+    assert predictor.pose_at(20.0)[0] == pytest.approx(1.0)
+    # At 10.5 the screen shows 10.4, and a command sent now lands at 10.6
+    assert predictor.displayed_pose(10.5)[0] == pytest.approx(0.3)
+    assert predictor.predicted_pose(10.5)[0] == pytest.approx(0.5)
+
+
+def test_deadman_ends_an_unrefreshed_move():
+    predictor = PosePredictor(max_speed=1.0, deadman=0.5)
+    predictor.command_sent({"cmd": "drive", "throttle": 1.0, "steering": 0}, 0.0)
+    assert predictor.pose_at(5.0)[0] == pytest.approx(0.5)
+
+
+def test_acks_confirm_everything_sent_before():
+    predictor = PosePredictor()
+    predictor.command_sent({"cmd": "camera", "angle": 30, "seq": 1}, 1.0)
+    predictor.command_sent({"cmd": "move", "dir": "left", "seq": 2}, 1.1)
+    predictor.command_sent({"cmd": "camera", "angle": 60, "seq": 3}, 1.2)
+    assert predictor.command_acked(2, 1.5) == pytest.approx(400)
+    assert predictor.confirmed_camera_angle == 30
+    assert predictor.camera_angle == 60
+    assert predictor.in_flight == 1
+    assert predictor.command_acked(2, 1.6) is None
+    predictor.reset()
+    assert predictor.command_acked(3, 1.7) is None
@@ -0,0 +1,51 @@
+import pytest
+
+from rover.protocol import (
+    BinaryCodec, ProtocolError, decode_command, decode_telemetry, encode_telemetry,
+    telemetry_ack
+)
+
+
+@pytest.mark.parametrize("msg", [
+    {"cmd": "move", "dir": "left", "speed": 0.5, "seq": 7},
+    {"cmd": "arm", "joint": 2, "angle": 135, "seq": 8},
+    {"cmd": "camera", "angle": -20, "seq": 9},
+    {"cmd": "flag", "action": "drop", "seq": 10},
+    {"cmd": "drive", "throttle": 0.25, "steering": -1.0, "seq": 11},
+])
+def test_command_round_trip(msg):
+    frame = BinaryCodec().encode_command(msg)
+    assert isinstance(frame, bytes)
+    assert decode_command(frame) == msg
+
+
+def test_codec_numbers_commands_without_seq():
+    codec = BinaryCodec()
+    first = decode_command(codec.encode_command({"cmd": "camera", "angle": 10}))
+    second = decode_command(codec.encode_command({"cmd": "camera", "angle": 20}))
+    assert (first["seq"], second["seq"]) == (1, 2)
+
+
+def test_commands_without_layout_stay_json():
+    assert BinaryCodec().encode_command({"cmd": "ping", "t": 1.5}) == '{"cmd": "ping", "t": 1.5}'
+
+
+def test_telemetry_round_trip():
+    frame = encode_telemetry(42, 87, 1.25, -3.5, 120, ack=9)
+    assert decode_telemetry(frame) == (42, 87, 1.25, -3.5, 120)
+    assert telemetry_ack(frame) == 9
+    assert telemetry_ack(encode_telemetry(42, 87, 0, 0, 0)) is None
+
+
+@pytest.mark.parametrize("frame", [b"\x01", b"\x02\x10\x00\x00\x00\x00\x00\x00",
+                                   b"\x01\x7f\x00\x00\x00\x00"])
+def test_bad_command_frames(frame):
+    with pytest.raises(ProtocolError):
+        decode_command(frame)
+
+
+def test_bad_telemetry_frames():
+    with pytest.raises(ProtocolError):
+        decode_telemetry(encode_telemetry(1, 50, 0, 0, 0)[:-1])
+    with pytest.raises(ProtocolError):
+        decode_telemetry(b"\x01\x10" + encode_telemetry(1, 50, 0, 0, 0)[2:])
@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from rover.protocol import encode_telemetry
+from rover.recorder import (
+    COMMAND, TELEMETRY, FlightRecorder, read_records, replay, telemetry_arrays
+)
+
+
+def record(path):
+    recorder = FlightRecorder(str(path), batch_interval=0.01)
+    recorder.start()
+    recorder.record_telemetry(json.dumps({"battery": 90, "imu": {"pitch": 1.0}}))
+    recorder.record_command({"cmd": "move", "dir": "forward", "seq": 1})
+    recorder.record_telemetry(encode_telemetry(2, 89, 0.5, -0.25, 100, ack=1))
+    recorder.stop()
+    return recorder
+
+
+def test_write_and_read_back(tmp_path):
+    path = tmp_path / "flight.x0fr"
+    recorder = record(path)
+    assert recorder.records_written == 3 and recorder.write_errors == 0
+    _, records = read_records(path)
+    assert [kind for _, kind, _ in records] == [TELEMETRY, COMMAND, TELEMETRY]
+    assert json.loads(records[1][2]) == {"cmd": "move", "dir": "forward", "seq": 1}
+    assert records[2][2] == encode_telemetry(2, 89, 0.5, -0.25, 100, ack=1)
+    times = [elapsed for elapsed, _, _ in records]
+    assert times == sorted(times)
+
+
+def test_telemetry_arrays(tmp_path):
+    path = tmp_path / "flight.x0fr"
+    record(path)
+    arrays = telemetry_arrays(path)
+    assert arrays["battery"].tolist() == [90, 89]
+    assert arrays["pitch"].tolist() == [1.0, 0.5]
+    assert np.isnan(arrays["roll"][0]) and arrays["roll"][1] == -0.25
+
+
+def test_truncated_record_is_dropped(tmp_path):
+    path = tmp_path / "flight.x0fr"
+    record(path)
+    path.write_bytes(path.read_bytes()[:-3])
+    assert len(read_records(path)[1]) == 2
+
+
+def test_not_a_recording(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"something else entirely")
+    with pytest.raises(ValueError):
+        read_records(path)
+
+
+def test_replay_feeds_messages_and_commands(tmp_path):
+    path = tmp_path / "flight.x0fr"
+    record(path)
+    messages, commands = [], []
+    count = asyncio.run(replay(path, messages.append, speed=0, on_command=commands.append))
+    assert count == 3
+    assert isinstance(messages[0], str) and isinstance(messages[1], bytes)
+    assert commands == [{"cmd": "move", "dir": "forward", "seq": 1}]
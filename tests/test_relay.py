@@ -0,0 +1,117 @@
+import asyncio
+import json
+
+import websockets
+
+from rover.metrics import Metrics
+from rover.protocol import encode_telemetry
+from rover.relay import RelayClient, RelayHub
+
+
+class FakeController:
+    """The parts of RoverController the hub uses."""
+
+    def __init__(self):
+        self.connected = True
+        self.metrics = Metrics()
+        self.on_message = None
+        self.forwarded = []
+        self.stops = 0
+
+    def forward(self, msg):
+        self.forwarded.append(msg)
+        return len(self.forwarded)
+
+    def stop(self):
+        self.stops += 1
+
+    def log(self, text):
+        pass
+
+
+async def until(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def start_hub(**options):
+    controller = FakeController()
+    hub = RelayHub(controller, host="127.0.0.1", port=0, **options)
+    server = await hub.start()
+    return controller, hub, f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+
+async def hello(ws, proto=("json",)):
+    await ws.send(json.dumps({"cmd": "hello", "proto": list(proto)}))
+    return json.loads(await ws.recv())
+
+
+def test_fan_out_converts_binary_telemetry_once_for_json_clients():
+    async def run():
+        controller, hub, url = await start_hub()
+        async with websockets.connect(url) as plain, websockets.connect(url) as binary:
+            assert await hello(plain) == {"proto": "json"}
+            assert await hello(binary, ("bin1", "json")) == {"proto": "bin1"}
+            frame = encode_telemetry(5, 77, 1.5, 0.0, 90, ack=3)
+            controller.on_message(frame)
+            received = json.loads(await plain.recv()), await binary.recv()
+        await hub.close()
+        return received, hub
+
+    (as_json, as_binary), hub = asyncio.run(run())
+    assert as_json == {"battery": 77, "imu": {"pitch": 1.5, "roll": 0.0},
+                       "arm": {"joint1": 90}, "ack": 3}
+    assert as_binary == encode_telemetry(5, 77, 1.5, 0.0, 90, ack=3)
+    assert hub.published == 1
+
+
+def test_one_client_drives_and_only_rover_commands_are_forwarded():
+    async def run():
+        controller, hub, url = await start_hub(remote_control=True)
+        async with websockets.connect(url) as driver, websockets.connect(url) as other:
+            await hello(driver)
+            await hello(other)
+            await driver.send(json.dumps({"cmd": "move", "dir": "forward", "seq": 99}))
+            await until(lambda: hub.authority is not None)
+            for junk in ({"foo": 1}, {"cmd": 5}, {"cmd": "deadman", "ms": 10}, [1, 2]):
+                await driver.send(json.dumps(junk))
+            await other.send(json.dumps({"cmd": "arm", "joint": 1, "angle": 10}))
+            refusal = json.loads(await other.recv())
+            await driver.send(json.dumps({"cmd": "camera", "angle": 20}))
+            await until(lambda: len(controller.forwarded) == 2)
+        await until(lambda: hub.authority is None)
+        await hub.close()
+        return controller, hub, refusal
+
+    controller, hub, refusal = asyncio.run(run())
+    assert [msg["cmd"] for msg in controller.forwarded] == ["move", "camera"]
+    assert refusal["authority"] is False and refusal["holder"].startswith("127.0.0.1:")
+    assert (hub.forwarded, hub.refused) == (2, 1)
+    assert controller.stops == 1  # The driver left while holding authority
+
+
+def test_observe_only_hub_refuses_commands():
+    async def run():
+        controller, hub, url = await start_hub()
+        async with websockets.connect(url) as ws:
+            await ws.send(json.dumps({"cmd": "move", "dir": "left"}))
+            reply = json.loads(await ws.recv())
+        await hub.close()
+        return controller, reply
+
+    controller, reply = asyncio.run(run())
+    assert reply == {"authority": False, "holder": "host"}
+    assert controller.forwarded == []
+
+
+def test_slow_client_loses_the_oldest_messages():
+    class Socket:
+        remote_address = ("10.0.0.2", 4000)
+
+    client = RelayClient(Socket(), queue_size=2)
+    for message in ("a", "b", "c"):
+        client.push(message)
+    assert list(client._queue) == ["b", "c"]
+    assert client.stats()["dropped"] == 1
@@ -0,0 +1,30 @@
+import math
+
+from rover.telemetry import TelemetryState
+
+
+def test_update_reports_only_changes():
+    state = TelemetryState(history=8)
+    state.update({"battery": 80, "imu": {"pitch": 1.5, "roll": -2.0}, "arm": {"joint1": 90}})
+    assert state.take_changes() == {"battery": 80, "pitch": 1.5, "roll": -2.0,
+                                    "arm": {"joint1": 90}}
+    state.update({"battery": 80, "imu": {"pitch": 2.0, "roll": -2.0}})
+    assert state.take_changes() == {"pitch": 2.0}
+    assert state.take_changes() == {}
+    assert state.messages == 2
+
+
+def test_malformed_imu_and_arm_are_ignored():
+    state = TelemetryState(history=8)
+    state.update({"battery": 50, "imu": 5, "arm": [1, 2]})
+    state.update({"imu": [0.1, 0.2], "arm": "up"})
+    assert state.take_changes() == {"battery": 50}
+    _, values = state.history.window()
+    assert values[0, 0] == 50
+    assert all(math.isnan(v) for v in values[1])
+
+
+def test_is_telemetry():
+    assert TelemetryState.is_telemetry({"imu": {}})
+    assert not TelemetryState.is_telemetry({"ack": 3})
+    assert not TelemetryState.is_telemetry([1, 2])
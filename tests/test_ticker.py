@@ -0,0 +1,59 @@
+import asyncio
+import time
+
+from rover.metrics import Metrics
+from rover.ticker import Ticker, sleep_until
+
+
+def test_sleep_until_is_never_early():
+    async def run():
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + 0.07
+        await sleep_until(deadline)
+        return loop.time() - deadline
+
+    assert asyncio.run(run()) >= 0
+
+
+def test_ticks_stay_on_the_start_grid_after_a_late_one():
+    async def run():
+        loop = asyncio.get_running_loop()
+        times = []
+
+        def tick():
+            times.append(loop.time())
+            if len(times) == 2:
+                time.sleep(0.015)  # Makes the next tick late, but not the rest
+
+        metrics = Metrics()
+        metrics.enable("test")
+        ticker = Ticker(tick, 0.02, metrics, name="keys")
+        started = loop.time()
+        ticker.start()
+        await asyncio.sleep(0.21)
+        ticker.stop()
+        return started, times, ticker, metrics
+
+    started, times, ticker, metrics = asyncio.run(run())
+    assert ticker.skipped == 0
+    # No drift: tick n is due at start + n * interval, whatever came before
+    assert times[-1] - (started + len(times) * 0.02) < 0.015
+    assert len(times) >= 8
+    assert metrics.snapshot()["timings"]["keys_late_ms"]["n"] == ticker.ticks
+
+
+def test_a_stall_skips_missed_ticks():
+    async def run():
+        ticks = []
+        ticker = Ticker(lambda: ticks.append(1), 0.01)
+        ticker.start()
+        await asyncio.sleep(0.025)
+        time.sleep(0.05)  # Stall the loop for five intervals
+        await asyncio.sleep(0.03)
+        ticker.stop()
+        return ticks, ticker
+
+    ticks, ticker = asyncio.run(run())
+    assert ticker.skipped >= 3
+    assert ticker.ticks == len(ticks)
+    assert ticker.stats()["late_ms"]["max"] < 10
@@ -0,0 +1,65 @@
+import numpy as np
+
+from rover.timeseries import RingSeries, downsample, event_rate
+
+
+def test_window_before_wraparound():
+    series = RingSeries(5, columns=2)
+    for t in range(3):
+        series.append(t, t * 10, None)
+    times, values = series.window()
+    assert len(series) == 3
+    assert times.tolist() == [0, 1, 2]
+    assert values[:, 0].tolist() == [0, 10, 20]
+    assert np.isnan(values[:, 1]).all()
+
+
+def test_wraparound_keeps_the_newest_in_order():
+    series = RingSeries(4)
+    for t in range(10):
+        series.append(t, t * 2)
+    times, values = series.window()
+    assert len(series) == 4
+    assert times.tolist() == [6, 7, 8, 9]
+    assert values[:, 0].tolist() == [12, 14, 16, 18]
+
+
+def test_window_bounds_across_the_wrap():
+    series = RingSeries(4)
+    for t in range(6):  # Slots hold 4, 5, 2, 3
+        series.append(t, t)
+    assert series.window(3, 4)[0].tolist() == [3, 4]
+    assert series.window(start=4)[0].tolist() == [4, 5]
+    assert series.window(end=2)[0].tolist() == [2]
+    assert series.window(10)[0].tolist() == []
+
+
+def test_window_returns_copies():
+    series = RingSeries(3)
+    series.append(0, 1)
+    times, values = series.window()
+    values[0, 0] = 99
+    assert series.window()[1][0, 0] == 1
+    series.clear()
+    assert len(series) == 0 and series.window()[0].size == 0
+
+
+def test_downsampling_keeps_spikes_and_endpoints():
+    t = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[123], y[700] = 5.0, -3.0
+    y[10] = np.nan
+    for method in ("minmax", "lttb"):
+        times, values = downsample(t, y, 100, method)
+        assert len(values) <= 150  # minmax passes the last partial bucket through
+        assert 5.0 in values and -3.0 in values
+        assert np.all(np.diff(times) >= 0)  # In time order (flat buckets repeat a point)
+        assert not np.isnan(values).any()
+    times, values = downsample(t, y, 100, "lttb")
+    assert (times[0], times[-1]) == (0, 999)
+
+
+def test_event_rate():
+    centres, rates = event_rate(np.array([0.1, 0.2, 0.3, 1.5]), 0.0, 2.0, 2)
+    assert centres.tolist() == [0.5, 1.5]
+    assert rates.tolist() == [3.0, 1.0]
@@ -0,0 +1,35 @@
+import pytest
+
+from rover.tracking import IoUTracker, iou
+
+
+def test_iou():
+    assert iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert iou((0, 0, 10, 10), (5, 0, 15, 10)) == pytest.approx(1 / 3)
+    assert iou((0, 0, 10, 10), (10, 10, 20, 20)) == 0.0
+
+
+def test_tracks_keep_their_id_and_extrapolate():
+    tracker = IoUTracker(smoothing=0)
+    tracker.update([((0, 0, 20, 20), 0.9, "person")], 0.0)
+    tracker.update([((10, 0, 30, 20), 0.8, "person")], 1.0)
+    (track, box), = tracker.tracks_at(1.5)
+    assert track.track_id == 1 and track.hits == 2
+    assert box == pytest.approx((15, 0, 35, 20))  # Moving 10 px/s to the right
+
+
+def test_classes_do_not_match_each_other():
+    tracker = IoUTracker()
+    tracker.update([((0, 0, 20, 20), 0.9, "person")], 0.0)
+    tracker.update([((0, 0, 20, 20), 0.9, "dog")], 0.1)
+    assert sorted(track.name for track in tracker.tracks) == ["dog", "person"]
+
+
+def test_missed_tracks_survive_max_missed_runs():
+    tracker = IoUTracker(max_missed=2)
+    tracker.update([((0, 0, 20, 20), 0.9, "person")], 0.0)
+    tracker.update([], 0.1)
+    tracker.update([], 0.2)
+    assert len(tracker) == 1
+    tracker.update([], 0.3)
+    assert len(tracker) == 0
@@ -0,0 +1,288 @@
+import math
+
+from PyQt5.QtWidgets import QWidget, QSizePolicy, QPlainTextEdit
+from PyQt5.QtCore import Qt, QRectF, QPointF
+from PyQt5.QtGui import QImage, QPainter, QColor, QPen, QPolygonF, QFont, QFontMetrics
+
+from rover.detection import draw_detections
+from rover.metrics import Metrics
+from rover.render import FrameScaler
+
+
+class VideoView(QWidget):
+    """Paints camera frames straight from a numpy buffer.
+
+    Frames are scaled once with cv2 into a reused buffer and wrapped in a
+    QImage without copying; paintEvent draws that image as-is, so there is
+    no per-frame QImage copy, QPixmap conversion or Qt-side resampling.
+
+    ``set_overlay`` draws text lines (the performance HUD) over the video;
+    paints are timed into ``metrics`` as ``paint_ms``.
+    """
+
+    def __init__(self, text="", parent=None):
+        super().__init__(parent)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self._scaler = FrameScaler()
+        self._buffer = None  # Keeps the memory behind _image alive
+        self._image = None
+        self._message = text
+        self._overlay = None
+        self.metrics = Metrics()  # Replaced by the owner's registry
+
+    def set_overlay(self, lines):
+        """Show text lines in the top-left corner; None hides them."""
+        self._overlay = lines
+        self.update()
+
+    def set_message(self, text):
+        """Show a status message instead of video."""
+        self._image = None
+        self._buffer = None
+        self._message = text
+        self.update()
+
+    def set_frame(self, frame, detections=None):
+        """Display a BGR frame, optionally with detection boxes drawn on it."""
+        width, height = self.width(), self.height()
+        if width <= 0 or height <= 0:
+            return
+        scaled = self._scaler.scale(frame, width, height, writable=bool(detections))
+        if detections:
+            src_height, src_width = frame.shape[:2]
+            draw_detections(scaled, detections, width / src_width, height / src_height)
+
+        self._buffer = scaled
+        self._image = QImage(scaled.data, width, height, scaled.strides[0],
+                             QImage.Format_BGR888)
+        self.update()
+
+    def paintEvent(self, event):
+        with self.metrics.time("paint_ms"):
+            self._paint()
+
+    def _paint(self):
+        """Draw the current frame (or the status message), the HUD and the border."""
+        painter = QPainter(self)
+        if self._image is not None:
+            painter.drawImage(0, 0, self._image)
+        else:
+            painter.fillRect(self.rect(), QColor(34, 34, 34))
+            painter.setPen(QColor(255, 255, 255))
+            painter.drawText(self.rect(), Qt.AlignCenter, self._message)
+        if self._overlay:
+            self._paint_overlay(painter)
+
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(QColor(68, 68, 68), 2))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRoundedRect(QRectF(self.rect()).adjusted(1, 1, -1, -1), 5, 5)
+        painter.end()
+
+    def _paint_overlay(self, painter):
+        font = QFont("Monospace", 9)
+        font.setStyleHint(QFont.TypeWriter)
+        painter.setFont(font)
+        metrics = QFontMetrics(font)
+        line_height = metrics.height()
+        width = max(metrics.horizontalAdvance(line) for line in self._overlay) + 16
+        painter.fillRect(8, 8, width, line_height * len(self._overlay) + 8, QColor(0, 0, 0, 170))
+        painter.setPen(QColor(0, 255, 120))
+        for index, line in enumerate(self._overlay):
+            painter.drawText(16, 12 + metrics.ascent() + index * line_height, line)
+
+
+class LogView(QPlainTextEdit):
+    """Append-only, read-only log display.
+
+    Each new line is appended as one text block and Qt drops the oldest
+    blocks beyond ``capacity``, so an update never re-lays out the whole
+    history.
+    """
+
+    def __init__(self, capacity=500, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(capacity)
+        self.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.setUndoRedoEnabled(False)
+
+    def append_line(self, line):
+        """Append a line, keeping the view pinned to the newest entry."""
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 4
+        self.appendPlainText(line)
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+
+class PredictionView(QWidget):
+    """Top-down sketch of where the rover is versus where it is heading.
+
+    The grey rover is the pose the (delayed) telemetry and video show; the
+    green outline is the predicted pose once a command sent now arrives,
+    with the camera direction drawn from it. The view follows the grey
+    rover, ``scale`` pixels per metre.
+    """
+
+    def __init__(self, scale=60.0, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(140)
+        self.scale = scale
+        self._displayed = None
+        self._predicted = None
+        self._camera = None
+        self._confirmed_camera = None
+        self._text = "Prediction: waiting for link"
+
+    def set_state(self, displayed, predicted, camera_angle, confirmed_camera_angle, text):
+        """Poses are (x, y, heading) in metres/radians; angles in degrees."""
+        self._displayed = displayed
+        self._predicted = predicted
+        self._camera = camera_angle
+        self._confirmed_camera = confirmed_camera_angle
+        self._text = text
+        self.update()
+
+    def _rover_shape(self, pose, origin):
+        x, y, heading = pose
+        cx = self.width() / 2 + (x - origin[0]) * self.scale
+        cy = self.height() / 2 - (y - origin[1]) * self.scale
+        points = []
+        for angle, radius in ((0.0, 14), (2.5, 10), (-2.5, 10)):
+            points.append(QPointF(cx + radius * math.cos(heading + angle),
+                                  cy - radius * math.sin(heading + angle)))
+        return QPolygonF(points), QPointF(cx, cy)
+
+    def _camera_ray(self, painter, center, heading, angle, color):
+        if angle is None:
+            return
+        direction = heading + math.radians(angle)
+        painter.setPen(QPen(color, 1, Qt.DashLine))
+        painter.drawLine(center, QPointF(center.x() + 40 * math.cos(direction),
+                                         center.y() - 40 * math.sin(direction)))
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(34, 34, 34))
+        painter.setRenderHint(QPainter.Antialiasing)
+
+        # Half-metre grid that moves with the rover
+        origin = self._displayed[:2] if self._displayed is not None else (0.0, 0.0)
+        step = self.scale / 2
+        painter.setPen(QPen(QColor(55, 55, 55), 1))
+        offset_x = (self.width() / 2 - origin[0] * self.scale) % step
+        offset_y = (self.height() / 2 + origin[1] * self.scale) % step
+        x = offset_x
+        while x < self.width():
+            painter.drawLine(QPointF(x, 0), QPointF(x, self.height()))
+            x += step
+        y = offset_y
+        while y < self.height():
+            painter.drawLine(QPointF(0, y), QPointF(self.width(), y))
+            y += step
+
+        if self._displayed is not None:
+            shape, center = self._rover_shape(self._displayed, origin)
+            painter.setPen(QPen(QColor(150, 150, 150), 1))
+            painter.setBrush(QColor(110, 110, 110))
+            painter.drawPolygon(shape)
+            self._camera_ray(painter, center, self._displayed[2],
+                             self._confirmed_camera, QColor(150, 150, 150))
+        if self._predicted is not None:
+            shape, center = self._rover_shape(self._predicted, origin)
+            painter.setPen(QPen(QColor(90, 200, 130), 2))
+            painter.setBrush(Qt.NoBrush)
+            painter.drawPolygon(shape)
+            self._camera_ray(painter, center, self._predicted[2],
+                             self._camera, QColor(90, 200, 130))
+
+        painter.setPen(QColor(220, 220, 220))
+        painter.drawText(self.rect().adjusted(6, 4, -6, -4), Qt.AlignLeft | Qt.AlignTop,
+                         self._text)
+        painter.setPen(QPen(QColor(68, 68, 68), 2))
+        painter.setBrush(Qt.NoBrush)
+        painter.drawRoundedRect(QRectF(self.rect()).adjusted(1, 1, -1, -1), 5, 5)
+        painter.end()
+
+
+class TimeSeriesPlot(QWidget):
+    """Scrolling line plot of already-downsampled series.
+
+    The owner decides when to redraw (a throttled timer, not every
+    message) and hands over at most a few points per pixel via
+    ``set_series``; painting is then one polyline per series.
+    """
+
+    MARGIN_LEFT = 44
+    MARGIN = 6
+
+    def __init__(self, title, y_range=None, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(90)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.title = title
+        self.y_range = y_range  # Fixed (low, high), or None to fit the data
+        self._start = 0.0
+        self._end = 1.0
+        self._series = []
+
+    def plot_width(self):
+        """Pixels available for the data (what downsampling should aim for)."""
+        return max(1, self.width() - self.MARGIN_LEFT - self.MARGIN)
+
+    def set_series(self, start, end, series):
+        """``series`` is [(label, QColor, times, values)] covering start..end."""
+        self._start = start
+        self._end = end
+        self._series = series
+        self.update()
+
+    def _value_range(self):
+        if self.y_range is not None:
+            return self.y_range
+        lows = [y.min() for _, _, _, y in self._series if len(y)]
+        highs = [y.max() for _, _, _, y in self._series if len(y)]
+        if not lows:
+            return 0.0, 1.0
+        low, high = float(min(lows)), float(max(highs))
+        pad = max((high - low) * 0.1, 0.5)
+        return low - pad, high + pad
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(34, 34, 34))
+        left, top = self.MARGIN_LEFT, self.MARGIN
+        width = self.plot_width()
+        height = max(1, self.height() - 2 * self.MARGIN)
+        low, high = self._value_range()
+
+        font = QFont()
+        font.setPointSize(8)
+        painter.setFont(font)
+        painter.setPen(QPen(QColor(60, 60, 60), 1))
+        painter.drawRect(left, top, width, height)
+        painter.setPen(QColor(150, 150, 150))
+        painter.drawText(QRectF(0, top, left - 4, 14), Qt.AlignRight, f"{high:.3g}")
+        painter.drawText(QRectF(0, top + height - 14, left - 4, 14), Qt.AlignRight, f"{low:.3g}")
+
+        span = (self._end - self._start) or 1.0
+        x_scale = width / span
+        y_scale = height / ((high - low) or 1.0)
+        painter.setRenderHint(QPainter.Antialiasing)
+        legend_x = left + 6
+        for label, color, times, values in self._series:
+            if len(times) > 1:
+                xs = left + (times - self._start) * x_scale
+                ys = top + height - (values - low) * y_scale
+                # 1px pen: fractional widths make Qt stroke the dense
+                # polyline as a path, ~100x slower
+                painter.setPen(QPen(color, 1))
+                painter.drawPolyline(QPolygonF([QPointF(x, y) for x, y in zip(xs, ys)]))
+            painter.setPen(color)
+            painter.drawText(legend_x, top + 12, label)
+            legend_x += QFontMetrics(font).horizontalAdvance(label) + 12
+        painter.setPen(QColor(150, 150, 150))
+        painter.drawText(QRectF(left, top, width - 4, 14), Qt.AlignRight, self.title)
+        painter.end()